@@ -0,0 +1,23 @@
+# Imports
+
+import argparse
+
+from src.Config import load_config
+import src.Pipeline as Pipeline
+from src.Sharding import add_shard_argument
+from setup_vars import BASE_PATH
+
+# Same as `python -m src crawl --companies`, see src/Pipeline.py and src/Config.py for the options
+
+def main():
+    parser = argparse.ArgumentParser(description="Download Sales Navigator employees of companies.")
+    parser.add_argument("--config", help="JSON config file")
+    add_shard_argument(parser)
+    args = parser.parse_args()
+
+    config = load_config(args.config, default_base_path=BASE_PATH)
+    Pipeline.crawl_companies(config, args.shard)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
+import os
 import pathlib
 from typing import Union
 
 PathLike = Union[pathlib.Path, str]
 
-BASE_PATH = pathlib.Path(__file__).resolve().parents[3] # Race prediction
+# Race prediction, unless SCRAPE_LINKEDIN_BASE_PATH points elsewhere
+BASE_PATH = pathlib.Path(
+    os.environ.get("SCRAPE_LINKEDIN_BASE_PATH") or pathlib.Path(__file__).resolve().parents[3]
+)
 DAT_PATH = BASE_PATH / "Data"
 LINKEDIN_PATH = DAT_PATH / "LinkedIn"
 OUTPUT_DAT_PATH = LINKEDIN_PATH / "Data"
@@ -0,0 +1,358 @@
+# Imports
+
+# stdlib
+import argparse
+import functools
+import random
+import time
+from typing import Any, Mapping, Optional
+import unicodedata
+
+# Own
+
+try:
+    from ProfileReader import PUNCTUATION_TABLE
+except ModuleNotFoundError:
+    from src.ProfileReader import PUNCTUATION_TABLE
+
+# Globals
+
+# canonical school -> aliases. Every alias (and the canonical name itself) is cleaned with
+# school_tokens, so "Univ. of Georgia" and "University of Georgia" are the same alias.
+# Aliases of several words are found anywhere in a school name; one-word aliases ("Penn",
+# "Duke", "Cal") only match the whole name, or "Penn Foster High School" would be Penn.
+SCHOOL_ALIASES = {
+    "Georgia Institute of Technology": ["Georgia Tech", "GA Tech", "Gatech", "Georgia Inst. of Tech."],
+    "University of Georgia": ["UGA"],
+    "Georgia State University": ["GSU", "Georgia State"],
+    "Emory University": ["Emory", "Goizueta Business School", "Emory College of Arts and Sciences"],
+    "Kennesaw State University": ["KSU", "Kennesaw State"],
+    "Massachusetts Institute of Technology": ["MIT"],
+    "Harvard University": ["Harvard", "Harvard Business School", "Harvard College", "Harvard Law School"],
+    "Stanford University": ["Stanford", "Stanford Graduate School of Business"],
+    "University of Pennsylvania": ["UPenn", "Penn", "The Wharton School", "Wharton School of the University of Pennsylvania"],
+    "Columbia University": ["Columbia", "Columbia University in the City of New York", "Columbia Business School"],
+    "New York University": ["NYU", "NYU Stern School of Business", "New York University Stern School of Business"],
+    "University of California, Berkeley": ["UC Berkeley", "Berkeley", "Cal", "University of California Berkeley"],
+    "University of California, Los Angeles": ["UCLA", "University of California Los Angeles"],
+    "University of Southern California": ["USC"],
+    "University of Michigan": ["UMich", "University of Michigan Ann Arbor", "Michigan Ross"],
+    "University of Texas at Austin": ["UT Austin", "The University of Texas at Austin", "University of Texas Austin"],
+    "University of Florida": ["UF"],
+    "Florida State University": ["FSU"],
+    "Auburn University": ["Auburn"],
+    "Clemson University": ["Clemson"],
+    "University of Alabama": ["Alabama", "The University of Alabama"],
+    "Ohio State University": ["The Ohio State University", "OSU"],
+    "Pennsylvania State University": ["Penn State", "Penn State University", "The Pennsylvania State University"],
+    "University of North Carolina at Chapel Hill": ["UNC", "UNC Chapel Hill", "University of North Carolina Chapel Hill"],
+    "Duke University": ["Duke"],
+    "Vanderbilt University": ["Vanderbilt"],
+    "Cornell University": ["Cornell"],
+    "Yale University": ["Yale"],
+    "Princeton University": ["Princeton"],
+    "University of Chicago": ["UChicago", "University of Chicago Booth School of Business", "Chicago Booth"],
+    "Northwestern University": ["Northwestern", "Kellogg School of Management"],
+    "Southern New Hampshire University": ["SNHU"],
+    "University of Phoenix": ["University of Phoenix Online"],
+}
+
+# school words that are abbreviated interchangeably
+SCHOOL_TOKEN_ABBREVIATIONS = {
+    "univ": "university",
+    "uni": "university",
+    "inst": "institute",
+    "coll": "college",
+    "tech": "technology",
+    "intl": "international",
+    "natl": "national",
+    "&": "and",
+}
+
+# degree phrase -> level. An abbreviation after " - " (LinkedIn's "Bachelor of Science - BS")
+# decides if it is known; otherwise the longest phrase found in the degree wins, so "Doctor of
+# Medicine" is professional while a bare "Doctor" is a doctorate.
+DEGREE_LEVELS = {
+    "high school": "high_school",
+    "high school diploma": "high_school",
+    "ged": "high_school",
+    "certificate": "certificate",
+    "certification": "certificate",
+    "diploma": "certificate",
+    "associate": "associate",
+    "associates": "associate",
+    "associate of arts": "associate",
+    "associate of science": "associate",
+    "aa": "associate",
+    "as": "associate",
+    "aas": "associate",
+    "bachelor": "bachelor",
+    "bachelors": "bachelor",
+    "bachelor of arts": "bachelor",
+    "bachelor of science": "bachelor",
+    "ba": "bachelor",
+    "bs": "bachelor",
+    "bsc": "bachelor",
+    "ab": "bachelor",
+    "bba": "bachelor",
+    "bfa": "bachelor",
+    "bsba": "bachelor",
+    "bsn": "bachelor",
+    "beng": "bachelor",
+    "bse": "bachelor",
+    "master": "master",
+    "masters": "master",
+    "master of arts": "master",
+    "master of science": "master",
+    "ma": "master",
+    "ms": "master",
+    "msc": "master",
+    "mba": "master",
+    "emba": "master",
+    "meng": "master",
+    "mph": "master",
+    "mpa": "master",
+    "mpp": "master",
+    "mfa": "master",
+    "msw": "master",
+    "med": "master",
+    "macc": "master",
+    "doctor": "doctorate",
+    "doctorate": "doctorate",
+    "doctor of philosophy": "doctorate",
+    "phd": "doctorate",
+    "edd": "doctorate",
+    "dba": "doctorate",
+    "doctor of medicine": "professional",
+    "doctor of dental surgery": "professional",
+    "doctor of dental medicine": "professional",
+    "doctor of pharmacy": "professional",
+    "doctor of osteopathic medicine": "professional",
+    "doctor of veterinary medicine": "professional",
+    "juris doctor": "professional",
+    "md": "professional",
+    "jd": "professional",
+    "dds": "professional",
+    "dmd": "professional",
+    "dvm": "professional",
+    "pharmd": "professional",
+    "do": "professional",
+}
+
+CAMPUS_SEPARATORS = (" - ", " – ", " — ")
+ABBREVIATION_SEPARATOR = " - "
+
+# Functions
+
+def fold_accents(text: str) -> str:
+    """"Universität" -> "Universitat", "École" -> "Ecole". Letters without an ASCII base (e.g.
+    CJK) are kept as they are.
+    """
+    return "".join(
+        char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char)
+    )
+
+def name_tokens(name: str) -> list[str]:
+    """Lowercase words without accents or punctuation. Periods go too, so "Univ." and "Univ",
+    or "B.S." and "BS", agree.
+    """
+    return fold_accents(name).casefold().translate(PUNCTUATION_TABLE).replace(".", "").split()
+
+def school_tokens(school: str) -> list[str]:
+    # "University of X - Y" is campus Y of X
+    for separator in CAMPUS_SEPARATORS:
+        school = school.split(separator, 1)[0]
+
+    tokens = [SCHOOL_TOKEN_ABBREVIATIONS.get(token, token) for token in name_tokens(school)]
+    if tokens and tokens[0] == "the":
+        tokens = tokens[1:]
+
+    return tokens
+
+# Classes
+
+class TokenMatcher():
+    """Aho-Corasick automaton over words: finds every dictionary phrase occurring in a token
+    sequence in one pass, and keeps the longest one (leftmost on ties).
+    """
+
+    def __init__(self, phrases: Mapping[tuple[str, ...], Any]):
+        self.goto = [{}]
+        self.fail = [0]
+        # the longest phrase ending at a node: its own, or the one at the end of its fail link
+        self.out = [None]
+
+        for phrase, value in phrases.items():
+            if not phrase:
+                continue
+
+            node = 0
+            for token in phrase:
+                next_node = self.goto[node].get(token)
+                if next_node is None:
+                    next_node = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(None)
+                    self.goto[node][token] = next_node
+                node = next_node
+            self.out[node] = (len(phrase), value)
+
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for token, child in self.goto[node].items():
+                fail = self.fail[node]
+                while fail and token not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[child] = self.goto[fail].get(token, 0)
+                if self.out[child] is None:
+                    self.out[child] = self.out[self.fail[child]]
+                queue.append(child)
+
+    def longest_match(self, tokens: list[str]) -> Optional[tuple[int, int, Any]]:
+        """(start, end, value) of the longest phrase in tokens, or None."""
+        best = None
+        node = 0
+        for i, token in enumerate(tokens):
+            while node and token not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(token, 0)
+
+            match = self.out[node]
+            if match is not None and (best is None or match[0] > best[1] - best[0]):
+                length, value = match
+                best = (i + 1 - length, i + 1, value)
+
+        return best
+
+class Canonicalizer():
+    """Canonical school names and degree levels for education records. The alias and degree
+    dictionaries are compiled into TokenMatchers once; use default_canonicalizer() to share
+    one per process.
+    """
+
+    def __init__(
+        self,
+        school_aliases: Mapping[str, list[str]]=SCHOOL_ALIASES,
+        degree_levels: Mapping[str, str]=DEGREE_LEVELS
+    ):
+        phrases, whole_names = {}, {}
+        for canonical, aliases in school_aliases.items():
+            key = " ".join(school_tokens(canonical))
+            for alias in [canonical] + list(aliases):
+                tokens = tuple(school_tokens(alias))
+                (phrases if len(tokens) > 1 else whole_names).setdefault(tokens, key)
+        self.schools = TokenMatcher(phrases)
+        self.whole_school_names = whole_names
+        self.known_schools = set(phrases.values()) | set(whole_names.values())
+
+        self.degree_phrases = {
+            tuple(name_tokens(phrase)): level for phrase, level in degree_levels.items()
+        }
+        self.degrees = TokenMatcher(self.degree_phrases)
+
+        # per instance, a cache on the methods would keep every Canonicalizer alive
+        self.canonical_school = functools.lru_cache(maxsize=2 ** 16)(self._canonical_school)
+        self.degree_level = functools.lru_cache(maxsize=2 ** 14)(self._degree_level)
+
+    def _canonical_school(self, school: Optional[str]) -> Optional[str]:
+        """The canonical name of a known school (matched by a one-word alias as the whole name,
+        by a longer alias anywhere in the name, e.g. "Scheller College of Business at Georgia
+        Tech"), otherwise the cleaned name. Both are lowercase keys, e.g. "university of
+        georgia".
+        """
+        if not school:
+            return None
+
+        tokens = school_tokens(school)
+        whole_name = self.whole_school_names.get(tuple(tokens))
+        if whole_name is not None:
+            return whole_name
+
+        match = self.schools.longest_match(tokens)
+        if match is not None:
+            return match[2]
+
+        return " ".join(tokens) or None
+
+    def _degree_level(self, degree: Optional[str]) -> Optional[str]:
+        """high_school, certificate, associate, bachelor, master, doctorate or professional."""
+        if not degree:
+            return None
+
+        _, separator, abbreviation = degree.rpartition(ABBREVIATION_SEPARATOR)
+        if separator:
+            level = self.degree_phrases.get(tuple(name_tokens(abbreviation)))
+            if level is not None:
+                return level
+
+        match = self.degrees.longest_match(name_tokens(degree))
+
+        return None if match is None else match[2]
+
+    def annotate_education(self, educ_dict: dict) -> dict:
+        """Set canonical_school and degree_level on an education dict."""
+        educ_dict["canonical_school"] = self.canonical_school(educ_dict.get("school"))
+        educ_dict["degree_level"] = self.degree_level(educ_dict.get("degree"))
+
+        return educ_dict
+
+@functools.lru_cache(maxsize=None)
+def default_canonicalizer() -> Canonicalizer:
+    return Canonicalizer()
+
+# Benchmark
+
+def random_education(rng: random.Random) -> dict:
+    canonical = rng.choice(list(SCHOOL_ALIASES))
+    school = rng.choice([canonical] + SCHOOL_ALIASES[canonical])
+    school = rng.choice([
+        school,
+        school.replace("University", "Univ."),
+        f"{school} - {rng.choice(['Online', 'Main Campus', 'Atlanta'])}",
+        f"{rng.choice(['Springfield', 'Riverside', 'Lakeview'])} Community College",
+    ])
+    degree = rng.choice([
+        "Bachelor of Science - BS", "BA", "B.S.", "Master of Business Administration - MBA",
+        "Master of Science - MS", "Doctor of Philosophy - PhD", "Juris Doctor - J.D.",
+        "Associate of Arts - AA", "High School Diploma", "Certificate", None
+    ])
+
+    return {"school": school, "degree": degree}
+
+def benchmark(num_records: int=1_000_000, num_distinct: int=50_000, seed: int=0) -> dict:
+    rng = random.Random(seed)
+    distinct = [random_education(rng) for _ in range(num_distinct)]
+    records = [dict(rng.choice(distinct)) for _ in range(num_records)]
+
+    start = time.perf_counter()
+    canonicalizer = Canonicalizer()
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for record in records:
+        canonicalizer.annotate_education(record)
+    seconds = time.perf_counter() - start
+
+    return {
+        "records": num_records,
+        "build_seconds": round(build_seconds, 4),
+        "seconds": round(seconds, 3),
+        "records_per_second": round(num_records / seconds),
+        "known_school": sum(
+            record["canonical_school"] in canonicalizer.known_schools for record in records[:10000]
+        ) / min(num_records, 10000),
+        "with_degree_level": sum(record["degree_level"] is not None for record in records) / num_records
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark school and degree canonicalization.")
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--distinct", type=int, default=50_000)
+    args = parser.parse_args()
+
+    print(benchmark(num_records=args.records, num_distinct=args.distinct))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# Imports
+
+# stdlib
+from dataclasses import dataclass
+import time
+
+# 3rd-party
+from selenium.webdriver.common.by import By
+
+# Own
+
+try:
+    import LinkedinCrawler
+    import LinkedinParser
+    from ProfileReader import Person
+except ModuleNotFoundError:
+    import src.LinkedinCrawler as LinkedinCrawler
+    import src.LinkedinParser as LinkedinParser
+    from src.ProfileReader import Person
+
+# Type Definitons
+
+@dataclass
+class CaptureResult:
+    source: str
+    num_bytes: int
+    seconds: float
+
+@dataclass
+class CaptureComparison:
+    id: str
+    full_page_bytes: int = None
+    targeted_page_bytes: int = None
+    full_exp_bytes: int = None
+    targeted_exp_bytes: int = None
+    full_seconds: float = None
+    targeted_seconds: float = None
+    identical: bool = None
+    full_result: dict = None
+    targeted_result: dict = None
+
+# Functions
+
+def time_capture(capture_func, *args) -> CaptureResult:
+    start = time.perf_counter()
+    source = capture_func(*args)
+    seconds = time.perf_counter() - start
+
+    return CaptureResult(source=source, num_bytes=len(source.encode("utf-8")), seconds=seconds)
+
+def parse_sources(person: Person, page_source: str, exp_source: str) -> dict:
+    person = Person(
+        id=person.id, profile_url=person.profile_url, page_source=page_source, exp_source=exp_source
+    )
+
+    parser = LinkedinParser.PageParser(person=person, from_file=False)
+    result = parser.parse_page()
+    result["image_url"] = parser.get_headshot_link()
+
+    return result
+
+def compare_capture_modes(
+    crawler: "LinkedinCrawler.Crawler",
+    person: Person
+) -> CaptureComparison:
+    """Load a profile once and capture it both ways: the whole driver.page_source and the single
+    script call that returns only the parser's regions. Reports bytes pulled over the WebDriver
+    wire, capture latency, and whether the parsed output is identical.
+
+    Args:
+        crawler (LinkedinCrawler.Crawler): a logged in crawler
+        person (Person): the profile to compare on
+
+    Returns:
+        CaptureComparison
+    """
+    driver = crawler.driver
+    page_url = person.profile_url
+    res = CaptureComparison(id=person.id)
+
+    driver.get(page_url)
+    crawler.delay(900, 1100)
+    crawler.wait_until_element_located(By.ID, "experience")
+    full_page = time_capture(lambda: driver.page_source)
+    targeted_page = time_capture(crawler.capture_regions, LinkedinCrawler.PROFILE_PAGE_REGIONS)
+
+    driver.get(f"{page_url}/details/experience/")
+    crawler.delay(900, 1100)
+    crawler.wait_until_element_located(By.ID, "profile-content")
+    full_exp = time_capture(lambda: driver.page_source)
+    targeted_exp = time_capture(crawler.capture_regions, LinkedinCrawler.EXPERIENCE_PAGE_REGIONS)
+
+    res.full_page_bytes = full_page.num_bytes
+    res.targeted_page_bytes = targeted_page.num_bytes
+    res.full_exp_bytes = full_exp.num_bytes
+    res.targeted_exp_bytes = targeted_exp.num_bytes
+    res.full_seconds = full_page.seconds + full_exp.seconds
+    res.targeted_seconds = targeted_page.seconds + targeted_exp.seconds
+
+    res.full_result = parse_sources(person, full_page.source, full_exp.source)
+    res.targeted_result = parse_sources(person, targeted_page.source, targeted_exp.source)
+    res.identical = res.full_result == res.targeted_result
+
+    return res
+
+def summarize(comparisons: list[CaptureComparison]) -> dict:
+    full_bytes = sum(c.full_page_bytes + c.full_exp_bytes for c in comparisons)
+    targeted_bytes = sum(c.targeted_page_bytes + c.targeted_exp_bytes for c in comparisons)
+
+    return {
+        "profiles": len(comparisons),
+        "identical": sum(c.identical for c in comparisons),
+        "full_bytes": full_bytes,
+        "targeted_bytes": targeted_bytes,
+        "bytes_ratio": targeted_bytes / full_bytes if full_bytes else None,
+        "full_seconds": sum(c.full_seconds for c in comparisons),
+        "targeted_seconds": sum(c.targeted_seconds for c in comparisons),
+        "mismatched_ids": [c.id for c in comparisons if not c.identical]
+    }
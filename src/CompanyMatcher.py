@@ -0,0 +1,377 @@
+# Imports
+
+# stdlib
+import argparse
+from dataclasses import dataclass
+import random
+import string
+import time
+from typing import Mapping, Optional, Sequence
+
+# 3rd-party
+import numpy as np
+import pandas as pd
+
+# Own
+
+try:
+    from ProfileIndex import clean_company
+    from ProfileReader import normalize_company_name
+    from ProfileRecord import to_int
+except ModuleNotFoundError:
+    from src.ProfileIndex import clean_company
+    from src.ProfileReader import normalize_company_name
+    from src.ProfileRecord import to_int
+
+# Type Definitons
+
+@dataclass
+class CompanyMatches:
+    """One entry per input row. employer_index is -1 where nothing scored at least min_score."""
+    employer_index: np.ndarray
+    score: np.ndarray
+    by_company_id: np.ndarray
+
+# Globals
+
+NGRAM_SIZE = 3
+# n-grams shared by more employers than this ("inc", " co", ...) are too common to block on
+MAX_POSTINGS = 5000
+BATCH_SIZE = 20_000
+
+# Functions
+
+def ngrams(name: str, n: int=NGRAM_SIZE) -> set[str]:
+    if not name:
+        return set()
+
+    padded = f" {name} "
+
+    return {padded[i:i + n] for i in range(max(len(padded) - n + 1, 1))}
+
+def normalize_experience_company(company: Optional[str]) -> str:
+    company = clean_company(company)
+
+    return normalize_company_name(company) if company else ""
+
+def expand_postings(
+    starts: np.ndarray,
+    lengths: np.ndarray
+) -> np.ndarray:
+    """Positions of every posting in the ranges [start, start + length), concatenated."""
+    total = int(lengths.sum())
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+
+    return offsets + np.arange(total)
+
+# Classes
+
+class CompanyMatcher():
+    """Matches experience companies to the input employer list without comparing every pair.
+    Employer names are normalized with normalize_company_name and split into character
+    n-grams, which go into an inverted index. A company is only scored against the employers
+    it shares an n-gram with, and all candidates of a batch are scored at once with numpy
+    (Jaccard similarity of the n-gram sets). Repeated company strings are matched once, so the
+    cost follows the number of distinct company strings rather than rows.
+
+    If company ids are known for employers (e.g. from a CompanySearchCache), rows whose
+    experience company_id matches one are joined on the id first, with score 1, and only the
+    rows left over are scored.
+
+    Usage:
+        matcher = CompanyMatcher(employers)
+        matches = matcher.match(df["company"], df["company_id"])
+    """
+
+    def __init__(
+        self,
+        employers: Sequence[str],
+        employer_company_ids: Mapping[str, int]=None,
+        min_score: float=0.5,
+        ngram_size: int=NGRAM_SIZE,
+        max_postings: int=MAX_POSTINGS
+    ):
+        """
+        Args:
+            employers (Sequence[str]): input employer names, as given to the crawler
+            employer_company_ids (Mapping[str, int], optional): employer name -> LinkedIn company
+            id. Defaults to None.
+            min_score (float, optional): best matches below this are dropped. Defaults to 0.5.
+            ngram_size (int, optional): Defaults to 3.
+            max_postings (int, optional): n-grams in more employers than this are ignored, for
+            blocking and for scoring. Defaults to 5000.
+        """
+        self.employers = list(employers)
+        self.min_score = min_score
+        self.ngram_size = ngram_size
+
+        # many raw employers normalize to the same name, index each name once
+        names = {}
+        self.name_to_employer = []
+        for i, employer in enumerate(self.employers):
+            name = normalize_company_name(employer) if employer else ""
+            if name and name not in names:
+                names[name] = len(names)
+                self.name_to_employer.append(i)
+        self.name_to_employer = np.array(self.name_to_employer, dtype=np.int64)
+        self.num_names = len(names)
+
+        self.vocab = {}
+        gram_ids, name_ids = [], []
+        for name, name_id in names.items():
+            for gram in ngrams(name, ngram_size):
+                gram_ids.append(self.vocab.setdefault(gram, len(self.vocab)))
+                name_ids.append(name_id)
+        gram_ids = np.array(gram_ids, dtype=np.int64)
+        name_ids = np.array(name_ids, dtype=np.int64)
+
+        order = np.argsort(gram_ids, kind="stable")
+        self.postings = name_ids[order]
+        self.indptr = np.searchsorted(gram_ids[order], np.arange(len(self.vocab) + 1))
+        self.document_frequency = np.diff(self.indptr)
+        self.stop = self.document_frequency > max_postings
+
+        kept = ~self.stop[gram_ids]
+        self.name_lengths = np.bincount(name_ids[kept], minlength=self.num_names)
+
+        self.company_id_to_employer = {}
+        if employer_company_ids:
+            employer_index = {}
+            for i, employer in enumerate(self.employers):
+                employer_index.setdefault(employer, i)
+
+            for employer, company_id in employer_company_ids.items():
+                company_id = to_int(company_id)
+                if company_id is not None and employer in employer_index:
+                    self.company_id_to_employer.setdefault(company_id, employer_index[employer])
+
+    @classmethod
+    def from_search_cache(cls, employers: Sequence[str], cache, **kwargs) -> "CompanyMatcher":
+        """Use the company ids that Crawler.open_company_search resolved for the employers."""
+        company_ids = {}
+        for employer in employers:
+            entry = cache.get(normalize_company_name(employer)) if employer else None
+            if entry is not None and entry.found and entry.value.get("id"):
+                company_ids[employer] = entry.value["id"]
+
+        return cls(employers, employer_company_ids=company_ids, **kwargs)
+
+    def _query_grams(self, names: Sequence[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        query_of_gram, gram_ids = [], []
+        lengths = np.zeros(len(names), dtype=np.int64)
+        for q, name in enumerate(names):
+            for gram in ngrams(name, self.ngram_size):
+                gram_id = self.vocab.get(gram)
+                if gram_id is None:
+                    lengths[q] += 1
+                elif not self.stop[gram_id]:
+                    lengths[q] += 1
+                    query_of_gram.append(q)
+                    gram_ids.append(gram_id)
+
+        return (
+            np.array(query_of_gram, dtype=np.int64), np.array(gram_ids, dtype=np.int64), lengths
+        )
+
+    def _match_batch(self, names: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+        best = np.full(len(names), -1, dtype=np.int64)
+        best_score = np.zeros(len(names), dtype=np.float32)
+
+        query_of_gram, gram_ids, query_lengths = self._query_grams(names)
+        if len(gram_ids) == 0:
+            return best, best_score
+
+        # every (query, employer name) pair that shares an n-gram, once per shared n-gram
+        lengths = self.document_frequency[gram_ids]
+        candidates = self.postings[expand_postings(self.indptr[gram_ids], lengths)]
+        queries = np.repeat(query_of_gram, lengths)
+
+        pairs, shared = np.unique(queries * self.num_names + candidates, return_counts=True)
+        queries = pairs // self.num_names
+        candidates = pairs % self.num_names
+
+        # Jaccard <= shared / query length, so most pairs cannot reach min_score
+        possible = shared >= self.min_score * query_lengths[queries]
+        queries, candidates, shared = queries[possible], candidates[possible], shared[possible]
+        if len(queries) == 0:
+            return best, best_score
+
+        scores = shared / (query_lengths[queries] + self.name_lengths[candidates] - shared)
+
+        # pairs are sorted by query, then employer: take the highest score per query, lowest
+        # employer on ties
+        starts = np.flatnonzero(np.r_[True, queries[1:] != queries[:-1]])
+        group_best = np.maximum.reduceat(scores, starts)
+        is_best = scores == np.repeat(group_best, np.diff(np.r_[starts, len(scores)]))
+        first = np.flatnonzero(is_best)
+        first = first[np.r_[True, queries[first][1:] != queries[first][:-1]]]
+
+        queries, candidates, scores = queries[first], candidates[first], scores[first]
+        keep = scores >= self.min_score
+        best[queries[keep]] = self.name_to_employer[candidates[keep]]
+        best_score[queries[keep]] = scores[keep]
+
+        return best, best_score
+
+    def match(
+        self,
+        companies: Sequence[Optional[str]],
+        company_ids: Sequence=None,
+        batch_size: int=BATCH_SIZE
+    ) -> CompanyMatches:
+        """Best employer and score for every experience company.
+
+        Args:
+            companies (Sequence[Optional[str]]): experience companies, as parsed
+            company_ids (Sequence, optional): experience company_ids, same length. Defaults to
+            None.
+            batch_size (int, optional): distinct names scored at once. Defaults to 20000.
+
+        Returns:
+            CompanyMatches
+        """
+        companies = pd.Series(companies, dtype=object).reset_index(drop=True)
+        employer_index = np.full(len(companies), -1, dtype=np.int64)
+        score = np.zeros(len(companies), dtype=np.float32)
+
+        # join on company_id first, each distinct id looked up once
+        by_company_id = np.zeros(len(companies), dtype=bool)
+        if company_ids is not None and self.company_id_to_employer:
+            id_codes, unique_ids = pd.factorize(pd.Series(company_ids, dtype=object))
+            unique_employers = np.array(
+                [self.company_id_to_employer.get(to_int(company_id), -1) for company_id in unique_ids],
+                dtype=np.int64
+            )
+            has_id = id_codes >= 0
+            employer_index[has_id] = unique_employers[id_codes[has_id]]
+            by_company_id = employer_index >= 0
+            score[by_company_id] = 1.0
+
+        # and only score the names of the rows left over
+        rest = np.flatnonzero(~by_company_id)
+        codes, uniques = pd.factorize(companies.iloc[rest])
+        names = [normalize_experience_company(company) for company in uniques]
+
+        unique_best = np.full(len(names), -1, dtype=np.int64)
+        unique_score = np.zeros(len(names), dtype=np.float32)
+        for start in range(0, len(names), batch_size):
+            best, batch_score = self._match_batch(names[start:start + batch_size])
+            unique_best[start:start + batch_size] = best
+            unique_score[start:start + batch_size] = batch_score
+
+        has_name = codes >= 0
+        employer_index[rest[has_name]] = unique_best[codes[has_name]]
+        score[rest[has_name]] = unique_score[codes[has_name]]
+
+        return CompanyMatches(employer_index=employer_index, score=score, by_company_id=by_company_id)
+
+    def match_frame(
+        self,
+        df: pd.DataFrame,
+        company_col: str="company",
+        company_id_col: Optional[str]="company_id"
+    ) -> pd.DataFrame:
+        """df with matched_employer, match_score and matched_by_company_id columns added."""
+        company_ids = df[company_id_col] if company_id_col in df else None
+        matches = self.match(df[company_col], company_ids)
+
+        employers = np.array(self.employers + [None], dtype=object)
+        df = df.copy()
+        df["matched_employer"] = employers[matches.employer_index]
+        df["match_score"] = matches.score
+        df["matched_by_company_id"] = matches.by_company_id
+
+        return df
+
+# Benchmark
+
+def random_company_name(rng: random.Random) -> str:
+    words = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+        for _ in range(rng.randint(1, 3))
+    ]
+    suffix = rng.choice(["", " Inc", " LLC", " Corp", " & Co", " Group", " Holdings"])
+
+    return " ".join(words).title() + suffix
+
+def misspell(name: str, rng: random.Random) -> str:
+    if len(name) < 4:
+        return name
+
+    i = rng.randrange(len(name))
+
+    return name[:i] + rng.choice(string.ascii_lowercase) + name[i + 1:]
+
+def benchmark(
+    num_rows: int=2_000_000,
+    num_employers: int=50_000,
+    num_distinct: int=200_000,
+    known_ids: float=0.3,
+    seed: int=0
+) -> dict:
+    """Match num_rows synthetic experience companies (num_distinct distinct strings: employers,
+    misspelled employers with an employment type suffix, and unrelated companies) against
+    num_employers employers. A known_ids share of the employers has a company id, which the
+    rows of those employers carry.
+    """
+    rng = random.Random(seed)
+    employers = [random_company_name(rng) for _ in range(num_employers)]
+    employer_ids = {
+        employer: 1000 + i for i, employer in enumerate(employers) if rng.random() < known_ids
+    }
+
+    distinct = []
+    for _ in range(num_distinct):
+        kind = rng.random()
+        if kind < 0.4:
+            employer = rng.choice(employers)
+            distinct.append((employer, employer_ids.get(employer)))
+        elif kind < 0.8:
+            employer = rng.choice(employers)
+            distinct.append((f"{misspell(employer, rng)} · Full-time", employer_ids.get(employer)))
+        else:
+            distinct.append((random_company_name(rng), None))
+    rows = [rng.choice(distinct) for _ in range(num_rows)]
+    companies = [company for company, _ in rows]
+    company_ids = [company_id for _, company_id in rows]
+
+    start = time.perf_counter()
+    matcher = CompanyMatcher(employers, employer_company_ids=employer_ids)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matches = matcher.match(companies, company_ids)
+    match_seconds = time.perf_counter() - start
+
+    distinct_companies = len(set(companies))
+
+    return {
+        "rows": num_rows,
+        "distinct_companies": distinct_companies,
+        "employers": num_employers,
+        "build_seconds": round(build_seconds, 3),
+        "match_seconds": round(match_seconds, 3),
+        "rows_per_second": round(num_rows / match_seconds),
+        "distinct_per_second": round(distinct_companies / match_seconds),
+        "by_company_id": float(matches.by_company_id.mean()),
+        "matched": float((matches.employer_index >= 0).mean())
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark matching companies to employers.")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--employers", type=int, default=50_000)
+    parser.add_argument("--distinct", type=int, default=200_000)
+    parser.add_argument("--known-ids", type=float, default=0.3, help="share of employers with a company id")
+    args = parser.parse_args()
+
+    print(benchmark(
+        num_rows=args.rows,
+        num_employers=args.employers,
+        num_distinct=args.distinct,
+        known_ids=args.known_ids
+    ))
+
+
+if __name__ == "__main__":
+    main()
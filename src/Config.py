@@ -0,0 +1,176 @@
+# Imports
+
+# stdlib
+import dataclasses
+from dataclasses import dataclass, field
+import importlib.util
+import json
+from pathlib import Path
+from typing import Any, Optional, Union
+
+# Type Definitons
+
+PathLike = Union[Path, str]
+
+@dataclass
+class InputConfig:
+    csv: str = "ppp_pb_images/cung_lendio_second_tranche_employers/cung_employers_noimages.csv"
+    id_col: str = "id"
+    url_col: str = "linkedin_url"
+    company_col: str = "employer"
+
+@dataclass
+class OutputConfig:
+    page_sources: str = "CL_Page_Sources"
+    experience_sources: str = "CL_Experience_Sources"
+    profiles: str = "CL_Profiles"
+    headshots: str = "CL_Headshots"
+    sales_navigator: str = "CL_Sales_Navigator"
+    trace: str = "crawl_trace.jsonl"
+    deltas: str = "profile_deltas.db"
+    index: str = "profile_index.db"
+
+@dataclass
+class CrawlConfig:
+    credentials: str = "Data/LinkedIn/Credentials/profiles.json"
+    profiles_per_hour: int = 45
+    chunk_min: int = 10
+    chunk_max: int = 50
+    max_pages: int = 500
+    max_memory_mb: Optional[int] = 2048
+    delay_scale: float = 1.0
+    capture: str = "lightweight" # or "full"
+    stream_parse: bool = True
+    save_raw_sources: bool = True
+    compress_sources: bool = False
+    writer_queue: int = 64
+    # Sales Navigator employees
+    employee_sink: str = "csv" # or "parquet"
+
+@dataclass
+class ParseConfig:
+    workers: Optional[int] = None # all CPUs
+    chunk_size: int = 16
+    max_pending: int = 32
+    download_headshots: bool = True
+    output_format: str = "json" # {id}.json per person, or "jsonl" / "jsonl.gz" parts
+    records_per_file: int = 10_000 # for jsonl
+    record_deltas: bool = True
+    # recycle a parse worker once its RSS passes max_worker_rss_mb, see ParsePool
+    bounded_memory: bool = False
+    max_worker_rss_mb: Optional[int] = 1024
+
+@dataclass
+class PipelineConfig:
+    """Everything a crawl / parse / index run needs. Relative paths are relative to base_path.
+    Loaded from a JSON file with the same nesting, e.g.
+
+        {"base_path": "/data/race", "parse": {"workers": 8}, "input": {"csv": "people.csv"}}
+    """
+    base_path: str = None
+    input: InputConfig = field(default_factory=InputConfig)
+    output: OutputConfig = field(default_factory=OutputConfig)
+    crawl: CrawlConfig = field(default_factory=CrawlConfig)
+    parse: ParseConfig = field(default_factory=ParseConfig)
+
+    def path(self, relative: PathLike) -> Path:
+        return Path(self.base_path) / relative
+
+# Globals
+
+CHOICES = {
+    "crawl.capture": {"lightweight", "full"},
+    "crawl.employee_sink": {"csv", "parquet"},
+    "parse.output_format": {"json", "jsonl", "jsonl.gz"},
+}
+
+# (option, value) -> the optional package it needs
+OPTIONAL_DEPENDENCIES = {
+    ("crawl.employee_sink", "parquet"): "pyarrow",
+}
+
+# Functions
+
+def _convert(value: Any, current: Any) -> Any:
+    """Strings from --set take the type of the default they replace."""
+    if not isinstance(value, str) or isinstance(current, str):
+        return value
+    if value.lower() in {"none", "null"}:
+        return None
+    if isinstance(current, bool):
+        return value.lower() in {"1", "true", "yes", "on"}
+
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+def set_option(config: PipelineConfig, key: str, value: Any):
+    """Set a dotted option, e.g. set_option(config, "parse.workers", "8")."""
+    *sections, name = key.split(".")
+    target = config
+    for section in sections:
+        target = getattr(target, section)
+
+    if not dataclasses.is_dataclass(target) or name not in {f.name for f in dataclasses.fields(target)}:
+        raise KeyError(f"Unknown config option {key!r}.")
+
+    value = _convert(value, getattr(target, name))
+    if key in CHOICES and value not in CHOICES[key]:
+        raise ValueError(f"{key} must be one of {sorted(CHOICES[key])}, got {value!r}.")
+
+    setattr(target, name, value)
+
+def get_option(config: PipelineConfig, key: str) -> Any:
+    target = config
+    for name in key.split("."):
+        target = getattr(target, name)
+
+    return target
+
+def check_dependencies(config: PipelineConfig):
+    """Fail at load time, not hours into a crawl, if an option needs a package that is not
+    installed.
+    """
+    for (key, value), package in OPTIONAL_DEPENDENCIES.items():
+        if get_option(config, key) == value and importlib.util.find_spec(package) is None:
+            raise ImportError(f"{key}={value} needs {package}, pip install {package}.")
+
+def _apply(config: PipelineConfig, values: dict, prefix: str=""):
+    for key, value in values.items():
+        if isinstance(value, dict):
+            _apply(config, value, prefix=f"{prefix}{key}.")
+        else:
+            set_option(config, f"{prefix}{key}", value)
+
+def load_config(
+    path: Optional[PathLike]=None,
+    overrides: Optional[dict[str, Any]]=None,
+    base_path: Optional[PathLike]=None,
+    default_base_path: Optional[PathLike]=None
+) -> PipelineConfig:
+    """Defaults, then the JSON config file, then overrides ({"parse.workers": 8, ...}), then
+    base_path. If none of them set base_path, default_base_path (e.g. setup_vars.BASE_PATH) is
+    used.
+    """
+    config = PipelineConfig()
+    if path is not None:
+        with open(path, "r", encoding="utf-8") as f:
+            _apply(config, json.load(f))
+
+    for key, value in (overrides or {}).items():
+        set_option(config, key, value)
+
+    if base_path is not None:
+        config.base_path = str(base_path)
+    if config.base_path is None and default_base_path is not None:
+        config.base_path = str(default_base_path)
+    if config.base_path is None:
+        raise ValueError("No base_path, set it in the config file or with --base-path.")
+
+    check_dependencies(config)
+
+    return config
+
+def config_to_dict(config: PipelineConfig) -> dict:
+    return dataclasses.asdict(config)
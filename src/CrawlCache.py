@@ -0,0 +1,173 @@
+# Imports
+
+# stdlib
+from dataclasses import dataclass
+import json
+from pathlib import Path
+import re
+import sqlite3
+import time
+from typing import Any, Optional, Union
+
+# Type Definitons
+
+PathLike = Union[Path, str]
+
+@dataclass
+class CacheEntry:
+    value: Any
+    found: bool
+    updated_at: float
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    negative_hits: int = 0
+    misses: int = 0
+    writes: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.negative_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        if self.lookups == 0:
+            return 0.0
+
+        return (self.hits + self.negative_hits) / self.lookups
+
+# Globals
+
+SECONDS_IN_DAY = 24 * 3600
+LEAD_ID_PATTERN = re.compile(r"/sales/(?:lead|people)/([^,/?#]+)")
+
+# Functions
+
+def normalize_lead_id(sales_navigator_url: str) -> Optional[str]:
+    """The same lead shows up under many Sales Navigator urls, which differ in the search that
+    found them and in tracking parameters. The stable part is the id after /sales/lead/.
+
+    Args:
+        sales_navigator_url (str): e.g. https://linkedin.com/sales/lead/ACwAAA...,NAME_SEARCH,x2Yz
+
+    Returns:
+        Optional[str]: the lead id, or None if the url has none
+    """
+    if sales_navigator_url is None:
+        return None
+
+    match = LEAD_ID_PATTERN.search(sales_navigator_url)
+    if match is None:
+        return None
+
+    return match.group(1)
+
+# Classes
+
+class SqliteCache():
+    """A persistent key -> JSON value store with negative caching. A key can be cached as not
+    found (value None), which counts as a hit until negative_ttl seconds have passed, so that
+    leads that fail are retried eventually but not on every run.
+    """
+
+    table = "cache"
+
+    def __init__(self, path: PathLike, negative_ttl: Optional[float]=30 * SECONDS_IN_DAY):
+        """
+        Args:
+            path (PathLike): sqlite file, created if missing
+            negative_ttl (Optional[float], optional): seconds a "not found" entry stays valid.
+            None keeps it forever. Defaults to 30 days.
+        """
+        self.path = path
+        self.negative_ttl = negative_ttl
+        self.stats = CacheStats()
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                found INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __contains__(self, key: str) -> bool:
+        return self._lookup(key) is not None
+
+    def _lookup(self, key: str) -> Optional[CacheEntry]:
+        row = self.conn.execute(
+            f"SELECT value, found, updated_at FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, found, updated_at = row
+        entry = CacheEntry(
+            value=json.loads(value) if value is not None else None,
+            found=bool(found),
+            updated_at=updated_at
+        )
+
+        if not entry.found and self.negative_ttl is not None:
+            if time.time() - entry.updated_at > self.negative_ttl:
+                return None
+
+        return entry
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Returns the cached entry, or None on a miss. A cached "not found" is an entry with
+        found=False.
+        """
+        entry = self._lookup(key)
+
+        if entry is None:
+            self.stats.misses += 1
+        elif entry.found:
+            self.stats.hits += 1
+        else:
+            self.stats.negative_hits += 1
+
+        return entry
+
+    def put(self, key: str, value: Any):
+        """Cache value for key. None is stored as a negative ("not found") entry."""
+        self.conn.execute(
+            f"""
+            INSERT OR REPLACE INTO {self.table} (key, value, found, updated_at)
+            VALUES (?, ?, ?, ?)
+            """,
+            (key, json.dumps(value) if value is not None else None, value is not None, time.time())
+        )
+        self.conn.commit()
+        self.stats.writes += 1
+
+    def __len__(self) -> int:
+        return self.conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+class ProfileUrlCache(SqliteCache):
+    """Sales Navigator lead id -> public profile url, see Crawler.resolve_profile_urls."""
+
+    table = "profile_urls"
+
+class CompanySearchCache(SqliteCache):
+    """Normalized input company name -> {"name", "id"} of the Sales Navigator company it
+    autocompleted to, or a negative entry if LinkedIn had no suggestion. See
+    Crawler.open_company_search.
+    """
+
+    table = "company_searches"
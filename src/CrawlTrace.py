@@ -0,0 +1,199 @@
+# Imports
+
+# stdlib
+import argparse
+import contextlib
+import json
+import math
+from pathlib import Path
+import threading
+import time
+from typing import Optional, Union
+
+# Type Definitons
+
+PathLike = Union[Path, str]
+
+# Functions
+
+def percentile(sorted_values: list[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+
+    return sorted_values[rank - 1]
+
+def load_trace(trace_file: PathLike) -> list[dict]:
+    records = []
+    with open(trace_file, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+
+    return records
+
+def summarize_trace(records: list[dict]) -> dict[str, dict]:
+    """Aggregate span records into per-phase count, error count, total and percentiles.
+
+    Args:
+        records (list[dict]): span records, as written by Tracer
+
+    Returns:
+        dict[str, dict]: phase name -> summary statistics, in seconds
+    """
+    durations = dict()
+    errors = dict()
+    for record in records:
+        name = record["name"]
+        durations.setdefault(name, []).append(record["duration"])
+        errors.setdefault(name, dict())
+        if record["outcome"] != "ok":
+            error_class = record.get("error") or record["outcome"]
+            errors[name][error_class] = errors[name].get(error_class, 0) + 1
+
+    summary = dict()
+    for name, values in durations.items():
+        values.sort()
+        summary[name] = {
+            "count": len(values),
+            "errors": sum(errors[name].values()),
+            "error_classes": errors[name],
+            "total": sum(values),
+            "mean": sum(values) / len(values),
+            "p50": percentile(values, 50),
+            "p90": percentile(values, 90),
+            "p99": percentile(values, 99),
+            "max": values[-1]
+        }
+
+    return summary
+
+def format_summary(summary: dict[str, dict]) -> str:
+    header = f"{'phase':<45}{'count':>8}{'errors':>8}{'total':>10}{'p50':>9}{'p90':>9}{'p99':>9}"
+    lines = [header, "-" * len(header)]
+    for name in sorted(summary, key=lambda name: summary[name]["total"], reverse=True):
+        stats = summary[name]
+        lines.append(
+            f"{name:<45}{stats['count']:>8}{stats['errors']:>8}{stats['total']:>10.2f}"
+            f"{stats['p50']:>9.3f}{stats['p90']:>9.3f}{stats['p99']:>9.3f}"
+        )
+
+    return "\n".join(lines)
+
+# Classes
+
+class Tracer():
+    """Span-style timing for the crawler. Every span is appended to a JSONL trace file as
+    {name, parent, start, duration, outcome, error, ...attributes}. With no trace file the tracer
+    does nothing, so it can always be passed around.
+
+    Usage:
+        tracer = Tracer("crawl_trace.jsonl")
+        with tracer.span("visit_page", id=person.id) as span:
+            ...
+            span["pages"] = 2
+    """
+
+    def __init__(self, trace_file: PathLike=None):
+        self.trace_file = trace_file
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._file = None
+
+        if trace_file is not None:
+            self._file = open(trace_file, "a", encoding="utf-8", buffering=1)
+
+    @property
+    def enabled(self) -> bool:
+        return self._file is not None
+
+    def _stack(self) -> list[str]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+
+        return self._local.stack
+
+    def write(self, record: dict):
+        if not self.enabled:
+            return
+
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self._file.write(f"{line}\n")
+
+    def record(
+        self,
+        name: str,
+        duration: float,
+        outcome: str="ok",
+        error: str=None,
+        **attributes
+    ):
+        """Write a span that was timed elsewhere."""
+        stack = self._stack()
+        record = {
+            "name": name,
+            "parent": stack[-1] if stack else None,
+            "start": time.time() - duration,
+            "duration": duration,
+            "outcome": outcome,
+            "error": error
+        }
+        record.update(attributes)
+        self.write(record)
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes):
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        stack.append(name)
+
+        attributes = dict(attributes)
+        record = {"name": name, "parent": parent, "start": time.time()}
+        outcome = "ok"
+        error = None
+        start = time.perf_counter()
+        try:
+            yield attributes
+        except BaseException as e:
+            outcome = "error"
+            error = type(e).__name__
+            raise
+        finally:
+            record["duration"] = time.perf_counter() - start
+            record["outcome"] = outcome
+            record["error"] = error
+            record.update(attributes)
+            stack.pop()
+            self.write(record)
+
+    def close(self):
+        if self._file is not None:
+            with self._lock:
+                self._file.close()
+            self._file = None
+
+NULL_TRACER = Tracer()
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-phase percentiles from a crawl trace.")
+    parser.add_argument("trace_file", nargs="+", help="JSONL trace file(s) written by Tracer")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    records = []
+    for trace_file in args.trace_file:
+        records += load_trace(trace_file)
+
+    summary = summarize_trace(records)
+    if args.json:
+        print(json.dumps(summary, indent=4))
+    else:
+        print(format_summary(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# Imports
+
+# stdlib
+from dataclasses import dataclass
+import json
+import logging
+from pathlib import Path
+import random
+import time
+from typing import Any, Callable, Optional, Sequence, Union
+
+# Own
+
+try:
+    import LinkedinCrawler
+except ModuleNotFoundError:
+    import src.LinkedinCrawler as LinkedinCrawler
+
+# Type Definitons
+
+PathLike = Union[Path, str]
+
+@dataclass(frozen=True)
+class Account:
+    id: int
+    username: str
+    password: str
+    location: str
+    server: str
+
+    def __eq__(self, __o: object) -> bool:
+        return self.id == __o.id
+
+# Globals
+
+BYTES_IN_MB = 1024 * 1024
+
+# Functions
+
+def load_linkedin_accounts(account_path: PathLike) -> list[Account]:
+    with open(account_path) as f:
+        profiles = json.loads(f.read())
+
+    accounts = []
+    for profile in profiles:
+        account = Account(
+            id = profile["profile_id"],
+            username = profile["email"],
+            password = profile["password"],
+            location = profile["vpn_location"],
+            server = profile["vpn_server"]
+        )
+        accounts.append(account)
+
+    return accounts
+
+# Classes
+
+class CrawlerManager():
+    """Keeps one logged-in Crawler warm across chunks of work. Starting a crawler means resolving
+    chromedriver, spawning Chrome and running the full login sequence, so the same browser is
+    handed out again until it fails a health check, has visited max_pages pages, or its process
+    tree grows past max_memory_mb.
+
+    Usage:
+        manager = CrawlerManager(accounts)
+        for chunk in chunks:
+            crawler = manager.get_crawler()
+            ...
+        manager.close()
+    """
+
+    def __init__(
+        self,
+        accounts: Sequence[Any],
+        max_pages: int=500,
+        max_memory_mb: Optional[int]=2048,
+        crawler_factory: Callable[..., "LinkedinCrawler.Crawler"]=None,
+        **crawler_kwargs
+    ):
+        """
+        Args:
+            accounts (Sequence[Any]): anything with username and password attributes
+            max_pages (int, optional): recycle after this many page loads. Defaults to 500.
+            max_memory_mb (Optional[int], optional): recycle when Chrome's RSS exceeds this.
+            None disables the check. Defaults to 2048.
+            crawler_factory (Callable, optional): builds a Crawler from username, password and
+            executable_path. Defaults to LinkedinCrawler.Crawler.
+            **crawler_kwargs: passed on to every crawler, e.g. capture_profile.
+        """
+        self.accounts = list(accounts)
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+
+        if crawler_factory is None:
+            crawler_factory = LinkedinCrawler.Crawler
+        self.crawler_factory = crawler_factory
+        self.crawler_kwargs = crawler_kwargs
+
+        self.crawler = None
+        self.account = None
+        self.starts = 0
+        self.startup_history = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def recycle_reason(self) -> Optional[str]:
+        """Returns why the current crawler should be replaced, or None if it can be reused."""
+        crawler = self.crawler
+
+        if crawler is None:
+            return "no crawler"
+
+        if self.max_pages is not None and crawler.pages_visited >= self.max_pages:
+            return f"visited {crawler.pages_visited} pages"
+
+        if self.max_memory_mb is not None:
+            memory_mb = crawler.get_browser_memory() / BYTES_IN_MB
+            if memory_mb > self.max_memory_mb:
+                return f"browser using {memory_mb:.0f} MB"
+
+        if not crawler.is_healthy():
+            return "failed health check"
+
+        return None
+
+    def start_crawler(self) -> "LinkedinCrawler.Crawler":
+        self.account = random.choice(self.accounts)
+
+        start = time.perf_counter()
+        executable_path = LinkedinCrawler.resolve_driver_path()
+        crawler = self.crawler_factory(
+            username=self.account.username,
+            password=self.account.password,
+            executable_path=executable_path,
+            **self.crawler_kwargs
+        )
+        total = time.perf_counter() - start
+
+        timings = dict(getattr(crawler, "startup_timings", {}))
+        timings["total"] = total
+        self.startup_history.append(timings)
+        self.starts += 1
+        self.crawler = crawler
+
+        logging.info(f"Started crawler #{self.starts} in {total:.2f}s.")
+
+        return crawler
+
+    def get_crawler(self) -> "LinkedinCrawler.Crawler":
+        reason = self.recycle_reason()
+        if reason is None:
+            return self.crawler
+
+        if self.crawler is not None:
+            logging.info(f"Recycling crawler: {reason}.")
+            self.crawler.quit()
+            self.crawler = None
+
+        return self.start_crawler()
+
+    def close(self):
+        if self.crawler is not None:
+            self.crawler.quit()
+            self.crawler = None
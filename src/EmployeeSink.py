@@ -0,0 +1,177 @@
+# Imports
+
+# stdlib
+from abc import ABC, abstractmethod
+import csv
+import dataclasses
+import os
+from pathlib import Path
+import re
+import sqlite3
+import time
+from typing import Union
+
+# Own
+
+try:
+    from LinkedinCrawler import Employee
+except ModuleNotFoundError:
+    from src.LinkedinCrawler import Employee
+
+# Type Definitons
+
+PathLike = Union[Path, str]
+
+# Globals
+
+EMPLOYEE_FIELDS = [field.name for field in dataclasses.fields(Employee)]
+ROW_FIELDS = EMPLOYEE_FIELDS + ["how", "page", "written_at"]
+
+# Functions
+
+def employee_rows(employees: list[Employee], how: str, page: int) -> list[dict]:
+    written_at = time.time()
+    rows = []
+    for employee in employees:
+        row = dataclasses.asdict(employee)
+        row["how"] = how
+        row["page"] = page
+        row["written_at"] = written_at
+        rows.append(row)
+
+    return rows
+
+def slugify(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_") or "company"
+
+# Classes
+
+class EmployeeSink(ABC):
+    """Append-only destination for Employee rows, written one results page at a time."""
+
+    @abstractmethod
+    def write(self, employees: list[Employee], how: str, page: int):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+class CsvEmployeeSink(EmployeeSink):
+    """Appends rows to one CSV file, flushed and fsynced after every page so a crash never loses
+    a page that was checkpointed.
+    """
+
+    def __init__(self, path: PathLike):
+        self.path = Path(path)
+        write_header = not self.path.exists() or self.path.stat().st_size == 0
+
+        self._file = open(self.path, "a", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=ROW_FIELDS)
+        if write_header:
+            self._writer.writeheader()
+
+    def write(self, employees: list[Employee], how: str, page: int):
+        self._writer.writerows(employee_rows(employees, how, page))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+class ParquetEmployeeSink(EmployeeSink):
+    """Writes every page as its own part file in a folder, which together read as one Parquet
+    dataset (e.g. pandas.read_parquet(folder)). Parquet files cannot be appended to, so this
+    keeps the sink append-only. Needs pyarrow.
+    """
+
+    def __init__(self, folder: PathLike):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("ParquetEmployeeSink needs pyarrow, pip install pyarrow.") from e
+
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+
+    def write(self, employees: list[Employee], how: str, page: int):
+        rows = employee_rows(employees, how, page)
+        if not rows:
+            return
+
+        table = self.pa.Table.from_pylist(rows)
+        company = slugify(employees[0].input_company or "")
+        filename = f"{company}-{how}-{page:04d}-{time.time_ns()}.parquet"
+        tmp_path = self.folder / f".{filename}.tmp"
+
+        self.pq.write_table(table, tmp_path)
+        os.replace(tmp_path, self.folder / filename)
+
+class CrawlCheckpoint():
+    """Progress of company crawls: the last page written for every (company, how) search and
+    whether the search finished. Stored in sqlite so it survives crashes.
+    """
+
+    def __init__(self, path: PathLike):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                company TEXT NOT NULL,
+                how TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                done INTEGER NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (company, how)
+            )
+            """
+        )
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _row(self, company: str, how: str):
+        return self.conn.execute(
+            "SELECT page, done FROM checkpoints WHERE company = ? AND how = ?", (company, how)
+        ).fetchone()
+
+    def last_page(self, company: str, how: str) -> int:
+        row = self._row(company, how)
+
+        return 0 if row is None else row[0]
+
+    def is_done(self, company: str, how: str) -> bool:
+        row = self._row(company, how)
+
+        return row is not None and bool(row[1])
+
+    def _save(self, company: str, how: str, page: int, done: bool):
+        self.conn.execute(
+            """
+            INSERT OR REPLACE INTO checkpoints (company, how, page, done, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (company, how, page, done, time.time())
+        )
+        self.conn.commit()
+
+    def mark_page(self, company: str, how: str, page: int):
+        self._save(company, how, page, done=False)
+
+    def mark_done(self, company: str, how: str):
+        self._save(company, how, self.last_page(company, how), done=True)
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,326 @@
+# Imports
+
+# stdlib
+import argparse
+import gzip
+import json
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+from typing import BinaryIO, Iterable, Iterator, Optional, Union
+
+# 3rd-party
+from lxml import etree
+
+# Type Definitons
+
+PathLike = Union[Path, str]
+
+# Globals
+
+# The selectors PageParser uses for these fields. A class given with a space is matched against
+# the whole class attribute, a single class against any of its classes, like BeautifulSoup does.
+HEADSHOT_CONTAINER_CLASS = "pv-profile-sticky-header-v2__container pv1"
+EXPERIENCE_CONTAINER_CLASS = "pvs-list__container"
+EXPERIENCE_LIST_CLASS = "pvs-list"
+COMPANY_LINK_CLASS = "optional-action-target-wrapper display-flex"
+COMPANY_LINK_FALLBACK_CLASS = "optional-action-target-wrapper"
+
+# Once a target has its field, libxml2 still runs to the end of the chunk it was fed, so small
+# chunks stop early; they cost no throughput on full scans.
+CHUNK_SIZE = 4 * 1024
+SOURCE_SUFFIXES = (".txt", ".txt.gz")
+
+# field -> the source it is read from, "page" or "experience"
+FIELD_SOURCES = {
+    "headshot": "page",
+    "company_ids": "experience",
+}
+
+# Functions
+
+def company_id_from_link(link: str) -> Optional[int]:
+    """The numeric id of a linkedin.com/company/{id}/ link, None for other links (e.g. the
+    search link of a company without a page).
+    """
+    parts = link.split("/")
+    if "search" in link or parts[3] != "company":
+        return None
+
+    return int(parts[-2].strip().rstrip("/"))
+
+def _has_class(attrib, name: str) -> bool:
+    value = attrib.get("class")
+    if value is None:
+        return False
+    if " " in name:
+        return value == name
+
+    return name in value.split()
+
+def iter_chunks(path: PathLike, chunk_size: int=CHUNK_SIZE) -> Iterator[bytes]:
+    """Raw bytes of a saved source, plain or gzip compressed, chunk_size at a time."""
+    path = Path(path)
+    opener = gzip.open if path.name.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        yield from iter(lambda: f.read(chunk_size), b"")
+
+def extract_field(chunks: Union[bytes, str, Iterable[bytes]], field: str):
+    """Stream one field out of a page source without building a tree. Parsing stops as soon as
+    the field is found, the rest of the source is never read.
+
+    Args:
+        chunks (Union[bytes, str, Iterable[bytes]]): the source, whole or in chunks
+        field (str): one of FIELD_SOURCES
+
+    Returns:
+        headshot: the img src in the sticky header, or None
+        company_ids: list[Optional[int]], the company id of every experience entry, None for
+        entries without a company page
+    """
+    if isinstance(chunks, str):
+        chunks = chunks.encode("utf-8")
+    if isinstance(chunks, bytes):
+        source = chunks
+        chunks = (source[i:i + CHUNK_SIZE] for i in range(0, len(source), CHUNK_SIZE))
+
+    target = FIELD_TARGETS[field]()
+    parser = etree.HTMLParser(target=target, encoding="utf-8")
+    try:
+        for chunk in chunks:
+            parser.feed(chunk)
+        parser.close()
+    except _FieldFound:
+        pass
+
+    return target.result()
+
+def source_path(folder: PathLike, id: str) -> Optional[Path]:
+    for suffix in SOURCE_SUFFIXES:
+        path = Path(folder) / f"{id}{suffix}"
+        if path.exists():
+            return path
+
+    return None
+
+def iter_source_paths(folder: PathLike) -> Iterator[tuple[str, Path]]:
+    """(id, path) of every complete source in folder, in directory order."""
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.startswith("."):
+                continue
+            for suffix in SOURCE_SUFFIXES:
+                if name.endswith(suffix):
+                    yield name[:-len(suffix)], Path(entry.path)
+                    break
+
+def scan_sources(
+    folder: PathLike,
+    field: str,
+    ids: Iterable[str]=None,
+    chunk_size: int=CHUNK_SIZE
+) -> Iterator[tuple[str, object]]:
+    """(id, value) of field for every source in folder, or only for ids. Pass the page source
+    folder for "headshot" and the experience source folder for "company_ids".
+    """
+    if field not in FIELD_TARGETS:
+        raise ValueError(f"Unknown field {field!r}, expected one of {tuple(FIELD_TARGETS)}.")
+
+    if ids is None:
+        paths = iter_source_paths(folder)
+    else:
+        paths = ((id, source_path(folder, id)) for id in ids)
+
+    for id, path in paths:
+        if path is None:
+            continue
+        yield id, extract_field(iter_chunks(path, chunk_size), field)
+
+def write_lines(values: Iterable[tuple[str, object]], field: str, f: BinaryIO) -> int:
+    count = 0
+    for id, value in values:
+        f.write(json.dumps({"personid": id, field: value}).encode("utf-8") + b"\n")
+        count += 1
+
+    return count
+
+# Classes
+
+class _FieldFound(Exception):
+    """Raised by a target to stop the parser once it has its field."""
+
+class HeadshotTarget():
+    """lxml parser target for the src of the first img in the sticky header."""
+
+    def __init__(self):
+        self.depth = 0 # > 0 while inside the header
+        self.link = None
+
+    def start(self, tag: str, attrib):
+        if self.depth:
+            self.depth += 1
+            if tag == "img":
+                src = attrib.get("src")
+                self.link = src.strip() if src is not None else None
+                raise _FieldFound
+        elif tag == "div" and _has_class(attrib, HEADSHOT_CONTAINER_CLASS):
+            self.depth = 1
+
+    def end(self, tag: str):
+        if self.depth:
+            self.depth -= 1
+            if not self.depth:
+                # PageParser only looks in the first header
+                raise _FieldFound
+
+    def data(self, data: str):
+        pass
+
+    def close(self):
+        pass
+
+    def result(self) -> Optional[str]:
+        return self.link
+
+class CompanyIdsTarget():
+    """lxml parser target for the company link of every entry of the experience list: the
+    direct li children of the first ul.pvs-list in the first div.pvs-list__container. Stops at
+    the end of the list.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.container_depth = None
+        self.list_depth = None
+        self.in_entry = False
+        self.link = None # preferred class
+        self.fallback_link = None
+        self.ids = []
+
+    def start(self, tag: str, attrib):
+        self.depth += 1
+        if self.container_depth is None:
+            if tag == "div" and _has_class(attrib, EXPERIENCE_CONTAINER_CLASS):
+                self.container_depth = self.depth
+        elif self.list_depth is None:
+            if tag == "ul" and _has_class(attrib, EXPERIENCE_LIST_CLASS):
+                self.list_depth = self.depth
+        elif self.depth == self.list_depth + 1 and tag == "li":
+            self.in_entry = True
+            self.link = self.fallback_link = None
+        elif self.in_entry and tag == "a" and attrib.get("href") is not None:
+            if self.link is None and _has_class(attrib, COMPANY_LINK_CLASS):
+                self.link = attrib["href"]
+            if self.fallback_link is None and _has_class(attrib, COMPANY_LINK_FALLBACK_CLASS):
+                self.fallback_link = attrib["href"]
+
+    def end(self, tag: str):
+        if self.list_depth is not None:
+            if self.in_entry and self.depth == self.list_depth + 1:
+                self.in_entry = False
+                link = self.link or self.fallback_link
+                self.ids.append(company_id_from_link(link) if link is not None else None)
+            elif self.depth == self.list_depth:
+                raise _FieldFound
+        elif self.depth == self.container_depth:
+            # a container without a list, PageParser finds no entries either
+            raise _FieldFound
+
+        self.depth -= 1
+
+    def data(self, data: str):
+        pass
+
+    def close(self):
+        pass
+
+    def result(self) -> list[Optional[int]]:
+        return self.ids
+
+FIELD_TARGETS = {
+    "headshot": HeadshotTarget,
+    "company_ids": CompanyIdsTarget,
+}
+
+# Benchmark
+
+def benchmark(page_source: str, exp_source: str, num_sources: int=2_000) -> dict:
+    """Headshot links and company ids of num_sources copies of a profile, read through
+    PageParser (two BeautifulSoup trees per profile) against scan_sources.
+    """
+    try:
+        from LinkedinParser import PageParser
+        from ProfileReader import Person
+    except ModuleNotFoundError:
+        from src.LinkedinParser import PageParser
+        from src.ProfileReader import Person
+
+    results = {"sources": num_sources}
+    with tempfile.TemporaryDirectory() as tmp:
+        page_folder = Path(tmp) / "page"
+        exp_folder = Path(tmp) / "experience"
+        page_folder.mkdir()
+        exp_folder.mkdir()
+        for i in range(num_sources):
+            (page_folder / f"{i}.txt").write_text(page_source, encoding="utf-8")
+            (exp_folder / f"{i}.txt").write_text(exp_source, encoding="utf-8")
+        source_bytes = sum(path.stat().st_size for path in page_folder.iterdir())
+        source_bytes += sum(path.stat().st_size for path in exp_folder.iterdir())
+
+        start = time.perf_counter()
+        soup_values = {}
+        for i in range(num_sources):
+            person = Person(id=str(i), profile_url=None)
+            with PageParser(
+                person,
+                page_file=page_folder / f"{i}.txt",
+                exp_file=exp_folder / f"{i}.txt"
+            ) as page:
+                soup_values[str(i)] = (
+                    page.get_headshot_link(),
+                    [exp.company_id for exp in page.experience_records()]
+                )
+        soup_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        headshots = dict(scan_sources(page_folder, "headshot"))
+        company_ids = dict(scan_sources(exp_folder, "company_ids"))
+        scan_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for folder in (page_folder, exp_folder):
+            for _, path in iter_source_paths(folder):
+                for _ in iter_chunks(path):
+                    pass
+        read_seconds = time.perf_counter() - start
+
+    # experience_records has one company id per role, the scan one per company entry
+    same_headshots = all(soup_values[id][0] == link for id, link in headshots.items())
+    same_ids = all(set(soup_values[id][1]) == set(ids) for id, ids in company_ids.items())
+
+    return {
+        **results,
+        "mb": round(source_bytes / 2 ** 20, 1),
+        "soup_seconds": round(soup_seconds, 3),
+        "scan_seconds": round(scan_seconds, 3),
+        "read_only_seconds": round(read_seconds, 3),
+        "scan_mb_per_second": round(source_bytes / 2 ** 20 / scan_seconds, 1),
+        "same_values": same_headshots and same_ids,
+    }
+
+# CLI
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream one field out of every saved source in a folder, as JSON lines.")
+    parser.add_argument("field", choices=list(FIELD_TARGETS))
+    parser.add_argument("folder", help="page sources for headshot, experience sources for company_ids")
+    parser.add_argument("--ids", nargs="*", help="only these ids")
+    args = parser.parse_args()
+
+    write_lines(scan_sources(args.folder, args.field, ids=args.ids), args.field, sys.stdout.buffer)
+
+if __name__ == "__main__":
+    main()
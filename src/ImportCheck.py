@@ -0,0 +1,122 @@
+# Imports
+
+# stdlib
+import argparse
+import json
+from pathlib import Path
+import subprocess
+import sys
+from typing import Iterable
+
+# Globals
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# What a spawned parse worker imports before its first page: the modules of parse_person and
+# parse_saved_profile, and what the pool and the stream pull in.
+WORKER_MODULES = (
+    "src.LinkedinParser",
+    "src.Pipeline",
+    "src.ParsePool",
+    "src.ParseStream",
+    "src.ProfileReader",
+)
+
+# Crawl-only dependencies that none of WORKER_MODULES may load
+CRAWL_MODULES = (
+    "selenium",
+    "webdriver_manager",
+    "requests",
+    "wakepy",
+    "cutils",
+)
+
+DEFAULT_MAX_MS = 250
+
+# Functions
+
+def import_times(module: str=None) -> dict[str, int]:
+    """Cumulative import time in microseconds of every module loaded by `import module` in a
+    fresh interpreter, from python -X importtime. Without a module, what the interpreter itself
+    loads at startup.
+    """
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}" if module else "pass"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    times = {}
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+
+    return times
+
+def profile_module(module: str, repeat: int=3) -> dict:
+    """Best of repeat cold imports of module."""
+    runs = [import_times(module) for _ in range(repeat)]
+    best = min(runs, key=lambda times: times.get(module, 0))
+    startup = import_times()
+    loaded = {name.split(".")[0] for name in best}
+
+    # the heaviest top level dependencies, to see what to make lazy next
+    top = sorted(
+        (
+            (name, us) for name, us in best.items()
+            if name != module and "." not in name and name not in startup
+        ),
+        key=lambda item: item[1],
+        reverse=True
+    )[:5]
+
+    return {
+        "module": module,
+        "import_ms": round(best.get(module, 0) / 1000, 1),
+        "modules_loaded": len(best.keys() - startup.keys()),
+        "crawl_modules": sorted(loaded & set(CRAWL_MODULES)),
+        "heaviest": [{"module": name, "ms": round(us / 1000, 1)} for name, us in top],
+    }
+
+def check_worker_imports(
+    modules: Iterable[str]=WORKER_MODULES,
+    max_ms: float=DEFAULT_MAX_MS,
+    repeat: int=3
+) -> dict:
+    """Guard parse worker cold start: every module must import in under max_ms and without
+    loading any of CRAWL_MODULES.
+
+    Returns:
+        dict: the per-module profiles and a list of failures, empty if all is well
+    """
+    profiles = [profile_module(module, repeat=repeat) for module in modules]
+
+    failures = []
+    for profile in profiles:
+        if profile["crawl_modules"]:
+            failures.append(f"{profile['module']} loads {', '.join(profile['crawl_modules'])}")
+        if profile["import_ms"] > max_ms:
+            failures.append(f"{profile['module']} takes {profile['import_ms']}ms to import (max {max_ms}ms)")
+
+    return {"max_ms": max_ms, "modules": profiles, "failures": failures}
+
+# CLI
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import time of the parse worker modules.")
+    parser.add_argument("modules", nargs="*", default=list(WORKER_MODULES))
+    parser.add_argument("--max-ms", type=float, default=DEFAULT_MAX_MS)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    result = check_worker_imports(args.modules, max_ms=args.max_ms, repeat=args.repeat)
+    print(json.dumps(result, indent=4))
+    sys.exit(1 if result["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@
 # stdlib
 from dataclasses import dataclass
 import decimal
+import functools
 import logging
 from pathlib import Path
 import pickle
@@ -10,25 +11,37 @@ import platform
 import random
 import re
 import time
-from typing import Literal, Optional, Union
+from typing import Any, Callable, Iterator, Literal, Optional, TYPE_CHECKING, Union
+from urllib.parse import quote, unquote
 
 # 3rd-party
 from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.common.exceptions import InvalidCookieDomainException, NoSuchElementException, \
-                                       TimeoutException
+                                       TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 
+import psutil
+
 # Own
 
 try:
-    from ProfileReader import Person
+    from CrawlCache import CompanySearchCache, normalize_lead_id, ProfileUrlCache
+    from CrawlTrace import NULL_TRACER, Tracer
+    from ProfileReader import normalize_company_name, Person
+    from SourceWriter import SourceWriter
 except ModuleNotFoundError:
-    from src.ProfileReader import Person
+    from src.CrawlCache import CompanySearchCache, normalize_lead_id, ProfileUrlCache
+    from src.CrawlTrace import NULL_TRACER, Tracer
+    from src.ProfileReader import normalize_company_name, Person
+    from src.SourceWriter import SourceWriter
+
+if TYPE_CHECKING:
+    from EmployeeSink import CrawlCheckpoint, EmployeeSink
 
 # Type Definitons
 
@@ -50,32 +63,446 @@ class Employee:
     profile_url: str = None
     currently_at_company: bool = None
 
+@dataclass
+class CaptureProfile:
+    """Which resources headless Chrome is allowed to download. We only ever read the saved HTML
+    (the headshot is taken from the img src attribute), so images, fonts and media can be
+    blocked without changing what PageParser sees. Set measure to record bytes transferred and
+    load time for every page visit.
+    """
+    block_images: bool = True
+    block_fonts: bool = True
+    block_media: bool = True
+    measure: bool = False
+
+    def content_setting_prefs(self) -> dict:
+        prefs = dict()
+        if self.block_images:
+            prefs["profile.managed_default_content_settings.images"] = 2
+
+        return prefs
+
+    def blocked_url_patterns(self) -> list[str]:
+        patterns = []
+        if self.block_images:
+            patterns += BLOCKED_IMAGE_PATTERNS
+        if self.block_fonts:
+            patterns += BLOCKED_FONT_PATTERNS
+        if self.block_media:
+            patterns += BLOCKED_MEDIA_PATTERNS
+
+        return patterns
+
+@dataclass
+class VisitMetrics:
+    url: str
+    load_seconds: float
+    transfer_bytes: int = None
+    resource_count: int = None
+    dom_content_loaded_ms: float = None
+    load_event_ms: float = None
+
 # Globals
 
 INITIAL_LOGIN_PAGE = "https://www.linkedin.com/"
 SUCCESSFUL_LOGIN_PAGE = "https://www.linkedin.com/feed/?trk=homepage-basic_signin-form_submit"
 LINUX_USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/98.0.4758.102 Safari/537.36"
+LOGGED_OUT_URL_MARKERS = ("/login", "/authwall", "/checkpoint", "/uas/")
+
+BLOCKED_IMAGE_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*media.licdn.com/dms/image*"
+]
+BLOCKED_FONT_PATTERNS = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"]
+BLOCKED_MEDIA_PATTERNS = [
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3", "*.m4a", "*dms.licdn.com/playlist*"
+]
+LIGHTWEIGHT_CAPTURE = CaptureProfile()
+
+PAGE_LOAD_METRICS_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0] || {};
+const resources = performance.getEntriesByType('resource');
+let bytes = nav.transferSize || 0;
+for (const resource of resources) {
+    bytes += resource.transferSize || 0;
+}
+return {
+    transfer_bytes: bytes,
+    resource_count: resources.length,
+    dom_content_loaded_ms: nav.domContentLoadedEventEnd || null,
+    load_event_ms: nav.loadEventEnd || null
+};
+"""
+
+# Only the parts of each page that PageParser reads. The CSS mirrors the parser's bs4 lookups, so
+# an exact class attribute match in the parser is an exact [class='...'] match here.
+PROFILE_PAGE_REGIONS = [
+    {"css": "div[class='mt2 relative']", "parent": False}, # top card
+    {"css": "div.pvs-profile-actions", "parent": False}, # connect button, fallback for name
+    {"css": "div#education.pv-profile-card-anchor", "parent": True}, # education card
+    {"css": "div[class='pv-profile-sticky-header-v2__container pv1']", "parent": False} # headshot
+]
+EXPERIENCE_PAGE_REGIONS = [
+    {"css": "div.pvs-list__container", "parent": False} # experience list
+]
+
+PROFILE_ROW_XPATH = ".//li[@class='artdeco-list__item pl3 pv3 ']"
+PROFILE_LINK_SELECTOR = "a[data-control-name='view_lead_panel_via_search_lead_name']"
+
+# Walks the lead rows in the browser and calls back with {total, missing} once every row has its
+# link or the timeout hits. Arguments: container id, row xpath, link selector, step min / max ms,
+# settle min / max ms, timeout ms, whether to scroll back up.
+LOAD_ALL_PROFILES_SCRIPT = """
+const [containerId, rowXPath, linkSelector, stepMin, stepMax, settleMin, settleMax, timeout, safe] =
+    arguments;
+const done = arguments[arguments.length - 1];
+const container = document.getElementById(containerId);
+if (container === null) {
+    done({total: 0, missing: 0});
+    return;
+}
+const snapshot = document.evaluate(
+    rowXPath, container, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+);
+const rows = [];
+for (let i = 0; i < snapshot.snapshotLength; i++) {
+    rows.push(snapshot.snapshotItem(i));
+}
+const deadline = Date.now() + timeout;
+const sleep = (min, max) => new Promise(resolve => setTimeout(resolve, min + Math.random() * (max - min)));
+const unloaded = () => rows.filter(row => row.querySelector(linkSelector) === null);
+const walk = async (ordered) => {
+    for (const row of ordered) {
+        if (Date.now() > deadline) {
+            return;
+        }
+        row.scrollIntoView({behavior: 'smooth', block: 'center'});
+        await sleep(stepMin, stepMax);
+    }
+    await sleep(settleMin, settleMax);
+};
+(async () => {
+    await walk(rows);
+    if (safe) {
+        await walk(rows.slice().reverse());
+    }
+    let missing = unloaded();
+    while (missing.length > 0 && Date.now() < deadline) {
+        await walk(missing);
+        missing = unloaded();
+    }
+    done({total: rows.length, missing: missing.length});
+})();
+"""
+
+# A results page once it has loaded: its 'Next' button, or the 'no results' message that a page
+# past the last one shows instead
+RESULTS_PAGE_LOADED_XPATH = (
+    "//button[@aria-label='Next'] | //*[contains(text(), 'No leads matched your search')]"
+)
+
+# Rows and pagination of a Sales Navigator results page in one round trip. Mirrors
+# extract_results_from_soup, plus the 'no results' check from check_if_results_exist.
+EXTRACT_RESULTS_SCRIPT = """
+const noResults = document.evaluate(
+    "//*[contains(text(), 'No leads matched your search')]",
+    document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+).singleNodeValue;
+const rows = [];
+const container = document.getElementById('search-results-container');
+if (container !== null) {
+    for (const profile of container.querySelectorAll('li')) {
+        const link = profile.querySelector(
+            "a[data-control-name='view_lead_panel_via_search_lead_name']"
+        );
+        if (link === null) {
+            continue;
+        }
+        const name = link.querySelector("span[data-anonymize='person-name']");
+        rows.push({
+            name: name === null ? null : name.textContent,
+            href: link.getAttribute('href')
+        });
+    }
+}
+const nextButton = document.querySelector("button[aria-label='Next']");
+return {
+    has_results: noResults === null,
+    rows: rows,
+    has_next_button: nextButton !== null,
+    next_disabled: nextButton !== null && nextButton.hasAttribute('disabled')
+};
+"""
+
+CAPTURE_REGIONS_SCRIPT = """
+const regions = arguments[0];
+const parts = [];
+for (const region of regions) {
+    let element = document.querySelector(region.css);
+    if (element === null) {
+        continue;
+    }
+    if (region.parent && element.parentElement !== null) {
+        element = element.parentElement;
+    }
+    parts.push(element.outerHTML);
+}
+if (parts.length === 0) {
+    return null;
+}
+return '<html><head></head><body>' + parts.join('\\n') + '</body></html>';
+"""
+
+SALES_SEARCH_PAGE = "https://www.linkedin.com/sales/search/people"
+COMPANY_FILTER_TYPES = {"current": "CURRENT_COMPANY", "past": "PAST_COMPANY"}
+ORGANIZATION_URN_PATTERN = re.compile(r"urn:li:organization:(\d+)")
+
+DRIVER_PATH_CACHE = Path(__file__).resolve().parents[0] / "driver_path.txt"
+DRIVER_PATH_MAX_AGE = 24 * 3600 # re-check the installed chromedriver once a day
 
 # Functions
 
-def random_delay(min_delay: int, max_delay: int):
-    time.sleep(float(decimal.Decimal(random.randrange(min_delay, max_delay)) / 100))
+def random_delay(min_delay: int, max_delay: int, scale: float=1.0):
+    time.sleep(float(decimal.Decimal(random.randrange(min_delay, max_delay)) / 100) * scale)
+
+@functools.lru_cache(maxsize=None)
+def resolve_driver_path(cache_path: PathLike=DRIVER_PATH_CACHE) -> str:
+    """ChromeDriverManager().install() does a filesystem / version check on every call. Resolve
+    the chromedriver binary once per process, and remember it on disk so that later processes
+    can skip the check as long as the binary still exists and the cache is fresh.
+
+    Args:
+        cache_path (PathLike, optional): file holding the resolved path. Defaults to 
+        DRIVER_PATH_CACHE.
+
+    Returns:
+        str: path to the chromedriver executable
+    """
+    cache_path = Path(cache_path)
+
+    try:
+        cache_age = time.time() - cache_path.stat().st_mtime
+        cached_path = cache_path.read_text(encoding="utf-8").strip()
+        if cache_age < DRIVER_PATH_MAX_AGE and Path(cached_path).is_file():
+            return cached_path
+    except OSError:
+        pass
+
+    executable_path = ChromeDriverManager().install()
+
+    try:
+        cache_path.write_text(executable_path, encoding="utf-8")
+    except OSError:
+        logging.warning(f"Unable to cache the chromedriver path at {cache_path}.")
+
+    return executable_path
+
+def read_company_id_from_url(url: str) -> Optional[int]:
+    """After a company filter is applied, the search url carries the company as an
+    urn:li:organization:<id>, percent-encoded once or twice.
+    """
+    if url is None:
+        return None
+
+    match = ORGANIZATION_URN_PATTERN.search(unquote(unquote(url)))
+    if match is None:
+        return None
+
+    return int(match.group(1))
+
+def build_company_search_url(
+    name: str,
+    how: Literal["current", "past"],
+    company_id: int=None
+) -> str:
+    """The Sales Navigator people search url with a single company filter applied, i.e. the
+    page search_company ends up on, without typing. Without a company_id the filter is the
+    free text name, which is what pressing enter on a search with no suggestion does.
+
+    Args:
+        name (str): company name as LinkedIn shows it
+        how (Literal[current, past]): current or past company filter
+        company_id (int, optional): LinkedIn organization id. Defaults to None.
+
+    Returns:
+        str: search url
+    """
+    value = f"text:{quote(name, safe='')},selectionType:INCLUDED"
+    if company_id is not None:
+        urn = quote(f"urn:li:organization:{company_id}", safe="")
+        value = f"id:{urn},{value}"
+
+    query = f"(filters:List((type:{COMPANY_FILTER_TYPES[how]},values:List(({value})))))"
+
+    return f"{SALES_SEARCH_PAGE}?query={quote(query, safe='()')}"
+
+def traced(name: str, result_attributes: Callable[[Any], dict]=None):
+    """Record the whole call of a Crawler method as a span on self.tracer.
+
+    Args:
+        name (str): span name
+        result_attributes (Callable[[Any], dict], optional): extra span attributes computed from
+        the return value. Defaults to None.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.tracer.span(name) as span:
+                res = method(self, *args, **kwargs)
+                if result_attributes is not None:
+                    span.update(result_attributes(res))
+
+            return res
+
+        return wrapper
+
+    return decorator
+
+def extract_results_from_soup(soup: BeautifulSoup) -> dict:
+    """Lead rows and pagination state of a Sales Navigator results page, in the same shape that
+    EXTRACT_RESULTS_SCRIPT returns. has_results needs the live page and is left to the caller.
+
+    Args:
+        soup (BeautifulSoup): the html of the page
+
+    Returns:
+        dict: rows (list of {name, href}), has_next_button, next_disabled
+    """
+    rows = []
+    container = soup.find("div", {"id": "search-results-container"})
+    profile_list = container.find_all("li") if container is not None else []
+    for profile in profile_list:
+        link_soup = profile.find("a", {"data-control-name": "view_lead_panel_via_search_lead_name"})
+        if link_soup is None:
+            continue
+
+        name_soup = link_soup.find("span", {"data-anonymize": "person-name"})
+        rows.append({
+            "name": name_soup.get_text() if name_soup is not None else None,
+            "href": link_soup.get("href")
+        })
+
+    next_button = soup.find("button", {"aria-label": "Next"})
+
+    return {
+        "rows": rows,
+        "has_next_button": next_button is not None,
+        "next_disabled": next_button is not None and next_button.has_attr("disabled")
+    }
+
+def employees_from_results(
+    results: dict,
+    company_i: str,
+    company_s: str,
+    current: bool
+) -> list[Employee]:
+    employees = []
+    for row in results["rows"]:
+        raw_link = row["href"]
+        if raw_link is None:
+            continue
+
+        employee_res = Employee(
+            input_company=company_i,
+            searched_company=company_s,
+            name=row["name"],
+            sales_navigator_url=f"https://linkedin.com{raw_link.strip()}",
+            currently_at_company=current
+        )
+        employees.append(employee_res)
+
+    return employees
+
+def results_have_pages_left(results: dict) -> bool:
+    """Same rules as Crawler.check_if_pages_left: no pages are left on a 'no results' page, or
+    when the 'Next' button is missing or disabled.
+    """
+    if results["has_results"] is False or not results["has_next_button"]:
+        return False
+
+    return not results["next_disabled"]
 
 # Classes
 
 class Crawler():
 
-    def __init__(self, username: str, password: str):
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        executable_path: str=None,
+        capture_profile: CaptureProfile=None,
+        capture_mode: Literal["full", "targeted"]="full",
+        tracer: Tracer=NULL_TRACER,
+        driver: Any=None,
+        delay_scale: float=1.0,
+        results_extraction: Literal["soup", "script"]="soup",
+        batched_scrolling: bool=False,
+        writer: SourceWriter=None
+    ):
+        """
+        Args:
+            username (str): LinkedIn login
+            password (str): LinkedIn password
+            executable_path (str, optional): chromedriver binary. Defaults to the cached result
+            of resolve_driver_path.
+            capture_profile (CaptureProfile, optional): resources to block and whether to
+            measure page loads. Defaults to None, which downloads everything.
+            capture_mode (Literal[full, targeted], optional): save the whole page_source, or
+            only the regions PageParser reads, pulled with a single script call. Defaults to
+            "full".
+            tracer (Tracer, optional): where to record per-phase timings. Defaults to a tracer
+            that records nothing.
+            driver (Any, optional): use this WebDriver instead of launching Chrome and logging
+            in, e.g. a ReplayDriver. Defaults to None.
+            delay_scale (float, optional): multiplier on every random delay. Defaults to 1.0.
+            results_extraction (Literal[soup, script], optional): how get_user_links reads a
+            results page, by parsing the whole page_source or with a single script returning
+            JSON. Defaults to "soup".
+            batched_scrolling (bool, optional): load lazy result rows with one async script per
+            page instead of a scrollIntoView round trip per row. Defaults to False.
+            writer (SourceWriter, optional): write downloaded sources on a background thread
+            instead of inside visit_page. Defaults to None.
+        """
         base_path = Path(__file__).resolve().parents[0]
         self.base_path = base_path
-        operating_system = platform.system()
 
         self.username = username
         self.password = password
+        self.pages_visited = 0
+        self.startup_timings = dict()
+        self.capture_profile = capture_profile
+        self.visit_metrics = []
+        self.capture_mode = capture_mode
+        self.tracer = tracer
+        self.delay_scale = delay_scale
+        self.results_extraction = results_extraction
+        self.batched_scrolling = batched_scrolling
+        self.search_form_ready = False
+        self.last_search_matched = False
+        self.writer = writer
+
+        if driver is None:
+            self.launch_browser(executable_path)
+            self.sign_in()
+        else:
+            # an already running (or replayed) browser, no chromedriver and no login needed
+            self.driver = driver
+
+        self.start_time = time.time()
+
+    def launch_browser(self, executable_path: str=None):
+        capture_profile = self.capture_profile
+        operating_system = platform.system()
+
+        phase_start = time.perf_counter()
+        if executable_path is None:
+            executable_path = resolve_driver_path()
+        phase_start = self._record_startup_phase("resolve_driver", phase_start)
 
-        executable_path = ChromeDriverManager().install()
         chrome_options = webdriver.ChromeOptions()
         prefs = {"profile.default_content_setting_values.notifications": 2}
+        if capture_profile is not None:
+            prefs.update(capture_profile.content_setting_prefs())
         chrome_options.add_experimental_option("prefs", prefs)
 
         if operating_system == "Linux":
@@ -89,19 +516,115 @@ class Crawler():
         driver.set_window_size(1440, 960)
         self.driver = driver
 
+        if capture_profile is not None:
+            self.apply_capture_profile(capture_profile)
+        self._record_startup_phase("launch_browser", phase_start)
+
+    def sign_in(self):
+        driver = self.driver
+
+        phase_start = time.perf_counter()
         driver.get(INITIAL_LOGIN_PAGE)
 
         WebDriverWait(driver, 40).until(
             EC.element_to_be_clickable((By.ID, "session_key"))
         )
+        phase_start = self._record_startup_phase("initial_page", phase_start)
 
-        self.load_cookie(base_path / "cookies.pkl")
-        random_delay(5, 10)
+        self.load_cookie(self.base_path / "cookies.pkl")
+        self.delay(5, 10)
+        phase_start = self._record_startup_phase("load_cookie", phase_start)
 
         self.login()
-        random_delay(200, 300)
+        self.delay(200, 300)
+        self._record_startup_phase("login", phase_start)
 
-        self.start_time = time.time()
+        logging.info(
+            "Crawler startup took "
+            + ", ".join(f"{phase}: {secs:.2f}s" for phase, secs in self.startup_timings.items())
+        )
+
+    def delay(self, min_delay: int, max_delay: int):
+        """random_delay, scaled by delay_scale. A scale of 0 skips waiting entirely, which is only
+        meant for replayed browsers.
+        """
+        if self.delay_scale > 0:
+            random_delay(min_delay, max_delay, scale=self.delay_scale)
+
+    def apply_capture_profile(self, capture_profile: CaptureProfile):
+        """Content-setting prefs only cover images, so fonts and media are blocked at the network
+        layer through the Chrome DevTools protocol.
+        """
+        driver = self.driver
+        blocked_urls = capture_profile.blocked_url_patterns()
+
+        if blocked_urls:
+            try:
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls})
+            except (AttributeError, WebDriverException):
+                logging.warning("Unable to block resources through CDP, loading everything.")
+
+    def record_visit_metrics(self, url: str, load_seconds: float):
+        """If the capture profile asks for it, store bytes transferred and timings for the page
+        that was just loaded.
+        """
+        if self.capture_profile is None or not self.capture_profile.measure:
+            return
+
+        try:
+            raw_metrics = self.driver.execute_script(PAGE_LOAD_METRICS_SCRIPT) or dict()
+        except WebDriverException:
+            raw_metrics = dict()
+
+        metrics = VisitMetrics(url=url, load_seconds=load_seconds, **raw_metrics)
+        self.visit_metrics.append(metrics)
+        logging.info(
+            f"Loaded {url} in {load_seconds:.2f}s, {metrics.transfer_bytes} bytes transferred."
+        )
+
+    def _record_startup_phase(self, phase: str, phase_start: float) -> float:
+        now = time.perf_counter()
+        self.startup_timings[phase] = now - phase_start
+        self.tracer.record(f"startup.{phase}", now - phase_start)
+
+        return now
+
+    def is_healthy(self) -> bool:
+        """A cheap round trip to the browser. Any WebDriver error (crashed tab, dead session,
+        killed chromedriver) means the browser should be recycled, as does being bounced back
+        to a login wall.
+        """
+        try:
+            self.driver.execute_script("return 1;")
+            current_url = self.driver.current_url
+        except WebDriverException:
+            return False
+
+        return not any(marker in current_url for marker in LOGGED_OUT_URL_MARKERS)
+
+    def get_browser_memory(self) -> int:
+        """Resident memory, in bytes, of chromedriver plus every Chrome process it spawned."""
+        try:
+            driver_process = psutil.Process(self.driver.service.process.pid)
+            processes = [driver_process] + driver_process.children(recursive=True)
+        except (AttributeError, psutil.Error):
+            return 0
+
+        total_rss = 0
+        for process in processes:
+            try:
+                total_rss += process.memory_info().rss
+            except psutil.Error:
+                continue
+
+        return total_rss
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except WebDriverException:
+            logging.warning("The browser did not shut down cleanly.")
 
     def reset_start_time(self):
         self.start_time = time.time()
@@ -123,8 +646,7 @@ class Crawler():
 
         driver.refresh()
 
-    @staticmethod
-    def human_type(element, keys: KeyLike, min_delay: int=10, max_delay: int=90):
+    def human_type(self, element, keys: KeyLike, min_delay: int=10, max_delay: int=90):
         """Type in keys with random delay in between. This meant to mimic human typing.
 
         Args:
@@ -134,7 +656,7 @@ class Crawler():
             max_delay (int, optional): upper bound on spacing. Defaults to 90.
         """
         for char in keys:
-            random_delay(min_delay, max_delay)
+            self.delay(min_delay, max_delay)
             element.send_keys(char)
 
     def send_username_on_initial_login_page(self):
@@ -171,21 +693,28 @@ class Crawler():
         driver = self.driver
 
         sign_in_button = driver.find_element("xpath", '//*[@type="submit"]')
-        random_delay(10, 20)
+        self.delay(10, 20)
         sign_in_button.click()
 
     def _login(self) -> str:
         driver = self.driver
+        tracer = self.tracer
 
-        driver.get(INITIAL_LOGIN_PAGE)
+        with tracer.span("login.attempt") as span:
+            with tracer.span("login.get"):
+                driver.get(INITIAL_LOGIN_PAGE)
 
-        self.send_username_on_initial_login_page()
-        random_delay(6, 10)
-        self.send_password(id_name="session_password")
-        random_delay(14, 22)
-        self.click_sign_in_button()
+            with tracer.span("login.type_username"):
+                self.send_username_on_initial_login_page()
+                self.delay(6, 10)
+            with tracer.span("login.type_password"):
+                self.send_password(id_name="session_password")
+                self.delay(14, 22)
+            with tracer.span("login.submit"):
+                self.click_sign_in_button()
+                self.delay(15, 20)
 
-        random_delay(15, 20)
+            span["success"] = driver.current_url == SUCCESSFUL_LOGIN_PAGE
 
         return driver.current_url
 
@@ -199,15 +728,51 @@ class Crawler():
         Raises:
             UnableToLoginException
         """
-        tries = 0
-        res_url = self._login()
-        while res_url != SUCCESSFUL_LOGIN_PAGE and tries < max_tries:
-            random_delay(300, 400)
+        with self.tracer.span("login") as span:
+            tries = 0
             res_url = self._login()
-            tries += 1
-        
-        if tries >= max_tries:
-            raise UnableToLoginException("Max tries exceeded, unable to login.")
+            while res_url != SUCCESSFUL_LOGIN_PAGE and tries < max_tries:
+                self.delay(300, 400)
+                res_url = self._login()
+                tries += 1
+
+            span["retries"] = tries
+            if tries >= max_tries:
+                raise UnableToLoginException("Max tries exceeded, unable to login.")
+
+    def load_and_capture(self, url: str, wait_for_id: str, regions: list[dict], kind: str) -> str:
+        """Load a page, wait for it to render and capture its source, timing each phase.
+
+        Args:
+            url (str): page to load
+            wait_for_id (str): id of the element that signals the page has rendered
+            regions (list[dict]): regions to capture in targeted mode
+            kind (str): label for the trace, e.g. "profile" or "experience"
+
+        Returns:
+            str: the captured html
+        """
+        driver = self.driver
+        tracer = self.tracer
+
+        with tracer.span("visit_page.get", kind=kind):
+            load_start = time.perf_counter()
+            driver.get(url)
+            load_seconds = time.perf_counter() - load_start
+
+        with tracer.span("visit_page.delay", kind=kind):
+            self.delay(900, 1100)
+
+        with tracer.span("visit_page.wait", kind=kind):
+            self.wait_until_element_located(By.ID, wait_for_id)
+
+        self.record_visit_metrics(url, load_seconds)
+
+        with tracer.span("visit_page.capture", kind=kind, mode=self.capture_mode) as span:
+            source = self.capture_source(regions)
+            span["chars"] = len(source)
+
+        return source
 
     def visit_page(
         self, 
@@ -216,45 +781,79 @@ class Crawler():
         page_folder: PathLike=None,
         exp_folder: PathLike=None
     ) -> str:
-        driver = self.driver
         page_url = person.profile_url
         id = person.id
 
-        # lets get the original page
-        driver.get(page_url)
-        random_delay(900, 1100)
-        self.wait_until_element_located(By.ID, "experience")
-        page_source = driver.page_source
+        with self.tracer.span("visit_page", id=id):
+            # lets get the original page
+            page_source = self.load_and_capture(
+                page_url, "experience", PROFILE_PAGE_REGIONS, kind="profile"
+            )
+
+            # we also need get all the experiences, hidden under show all
+            experience_source = self.load_and_capture(
+                f"{page_url}/details/experience/", 
+                "profile-content", 
+                EXPERIENCE_PAGE_REGIONS, 
+                kind="experience"
+            )
+
+            person.page_source = page_source
+            person.exp_source = experience_source
+            self.pages_visited += 2
 
-        # we also need get all the experiences, hidden under show all
-        driver.get(f"{page_url}/details/experience/")
-        random_delay(900, 1100)
-        self.wait_until_element_located(By.ID, "profile-content")
-        experience_source = driver.page_source
+            if download:
+                with self.tracer.span("visit_page.write"):
+                    self.write_sources(person, page_folder, exp_folder)
 
-        person.page_source = page_source
-        person.exp_source = experience_source
+        return person
 
-        if download:
-            source_result = [
-                {"source": page_source, "folder": page_folder},
-                {"source": experience_source, "folder": exp_folder}
-            ]
+    def write_sources(self, person: Person, page_folder: PathLike, exp_folder: PathLike):
+        source_result = [
+            {"source": person.page_source, "folder": page_folder},
+            {"source": person.exp_source, "folder": exp_folder}
+        ]
 
-            for val in source_result:
-                source = val["source"]
-                target_folder = val["folder"]
+        for val in source_result:
+            source = val["source"]
+            target_folder = val["folder"]
 
-                if target_folder is None:
-                    target_folder = self.base_path
+            if target_folder is None:
+                target_folder = self.base_path
 
-                if isinstance(target_folder, str):
-                    target_folder = Path(target_folder)
+            if isinstance(target_folder, str):
+                target_folder = Path(target_folder)
 
-                with open(target_folder / f"{id}.txt", "w", encoding="utf8") as f:
-                    f.write(source)
+            if self.writer is not None:
+                self.writer.write(target_folder / f"{person.id}.txt", source)
+                continue
 
-        return person
+            with open(target_folder / f"{person.id}.txt", "w", encoding="utf8") as f:
+                f.write(source)
+
+    def capture_regions(self, regions: list[dict]) -> Optional[str]:
+        """Serialize only the given regions of the current page in one round trip, wrapped in
+        a minimal html document so PageParser can read it like a full page.
+
+        Args:
+            regions (list[dict]): dicts with a "css" selector and whether to take its "parent"
+
+        Returns:
+            Optional[str]: the html, or None if none of the regions are on the page
+        """
+        return self.driver.execute_script(CAPTURE_REGIONS_SCRIPT, regions)
+
+    def capture_source(self, regions: list[dict]) -> str:
+        if self.capture_mode == "targeted":
+            source = self.capture_regions(regions)
+            if source is not None:
+                return source
+
+            logging.warning(
+                f"No parser regions found on {self.driver.current_url}, saving the full page."
+            )
+
+        return self.driver.page_source
 
     def search_company(self, company: str, how: Literal["current", "past"]) -> str:
         """On the LinkedIn SalesNavigator page, click on "add companies" and type in the company
@@ -270,6 +869,7 @@ class Crawler():
             str: company name searched in LinkedIn, autocompleted or original
         """
         driver = self.driver
+        self.last_search_matched = False
 
         id_text = f"//span[contains(text(), 'Expand {how.capitalize()} Company filter')]"
         company_child = driver.find_element(By.XPATH, id_text)
@@ -279,7 +879,7 @@ class Crawler():
         company_selector = f"[placeholder='Add {how} companies']"
 
         self.wait_until_element_located(By.CSS_SELECTOR, company_selector)
-        random_delay(3, 6)
+        self.delay(3, 6)
         search_box = driver.find_element(By.CSS_SELECTOR, company_selector)
         self.human_type(search_box, company)
 
@@ -296,13 +896,133 @@ class Crawler():
             searched_company_name = re.match(pattern, title_cleaned).group(1)
 
             first_match.click()
+            self.last_search_matched = True
         except NoSuchElementException:
             search_box.send_keys(Keys.ENTER)
             searched_company_name = company
 
         return searched_company_name
 
-    def load_all_profiles(self, safe: bool=True):
+    def resolve_company_search(
+        self,
+        company: str,
+        how: Literal["current", "past"],
+        cache: CompanySearchCache
+    ) -> dict:
+        """Type the company into the search box and record what LinkedIn resolved it to: the
+        autocompleted name and organization id, or None if there was no suggestion.
+
+        Returns:
+            dict: {"name", "id"} or None
+        """
+        with self.tracer.span("search_company.type", how=how):
+            if not self.search_form_ready:
+                self.initialize_sales_navigator_page()
+            searched_company = self.search_company(company, how=how)
+
+        resolution = None
+        if self.last_search_matched:
+            company_id = None
+            # the url picks up the organization id a moment after the filter is applied
+            for _ in range(10):
+                company_id = read_company_id_from_url(self.driver.current_url)
+                if company_id is not None:
+                    break
+                self.delay(40, 60)
+            resolution = {"name": searched_company, "id": company_id}
+
+        if cache is not None:
+            cache.put(normalize_company_name(company), resolution)
+
+        return resolution
+
+    def open_company_search(
+        self,
+        company: str,
+        how: Literal["current", "past"],
+        cache: CompanySearchCache=None
+    ) -> str:
+        """Apply a company filter on the Sales Navigator search page. A company resolved before
+        is opened straight from its search url; anything else goes through the slow typing
+        path in search_company, and the outcome is cached.
+
+        Args:
+            company (str): input company name
+            how (Literal[current, past]): search through current or past company
+            cache (CompanySearchCache, optional): Defaults to None.
+
+        Returns:
+            str: company name searched in LinkedIn, autocompleted or original
+        """
+        entry = None
+        if cache is not None:
+            entry = cache.get(normalize_company_name(company))
+
+        if entry is None:
+            resolution = self.resolve_company_search(company, how, cache)
+            if resolution is None:
+                return company
+
+            return resolution["name"]
+
+        if entry.found:
+            searched_company = entry.value["name"]
+            search_url = build_company_search_url(searched_company, how, entry.value["id"])
+        else:
+            searched_company = company
+            search_url = build_company_search_url(company, how)
+
+        with self.tracer.span("search_company.cached", how=how):
+            self.driver.get(search_url)
+            self.wait_until_element_located(By.ID, "search-results-container")
+            self.search_form_ready = False
+
+        return searched_company
+
+    def resolve_companies(
+        self,
+        companies: list[str],
+        cache: CompanySearchCache,
+        how: Literal["current", "past"]="current"
+    ) -> dict[str, Optional[dict]]:
+        """Resolution-only batch mode: type every company that is not cached yet and store what
+        LinkedIn autocompleted it to, without collecting any leads. Later crawls of these
+        companies skip typing entirely.
+
+        Args:
+            companies (list[str]): input company names
+            cache (CompanySearchCache): where to store the resolutions
+            how (Literal[current, past], optional): which filter to type into. Defaults to
+            "current".
+
+        Returns:
+            dict[str, Optional[dict]]: company -> {"name", "id"}, None if there was no suggestion
+        """
+        res = dict()
+        for company in companies:
+            entry = cache.get(normalize_company_name(company))
+            if entry is not None:
+                res[company] = entry.value
+                continue
+
+            res[company] = self.resolve_company_search(company, how, cache)
+            self.clear_sales_navigator_filters()
+
+        logging.info(
+            f"Resolved {len(res)} companies, cache hit rate {cache.stats.hit_rate:.0%}."
+        )
+
+        return res
+
+    @traced("load_all_profiles", result_attributes=lambda missing: {"missing": missing})
+    def load_all_profiles(
+        self,
+        safe: bool=True,
+        batched: bool=None,
+        step_delay: tuple[int, int]=(10, 15),
+        settle_delay: tuple[int, int]=(50, 60),
+        timeout: int=60
+    ) -> Optional[int]:
         """On the SalesNavigator page, after entering in the company name, move to the right box
         where the profiles are. Not all profile information for the later profiles
         is loaded initially-- the name will be loaded, but not the link. Scroll down to each profile
@@ -310,31 +1030,104 @@ class Crawler():
 
         Args:
             safe (bool, optional): After scrolling down, scroll back up. Defaults to True.
+            batched (bool, optional): walk the list inside the browser with a single async
+            script instead of one round trip per row. Defaults to the crawler's
+            batched_scrolling.
+            step_delay (tuple[int, int], optional): random_delay bounds between rows. Defaults
+            to (10, 15).
+            settle_delay (tuple[int, int], optional): random_delay bounds after each pass.
+            Defaults to (50, 60).
+            timeout (int, optional): seconds the batched script may take. Defaults to 60.
+
+        Returns:
+            Optional[int]: in batched mode, how many rows still had no link loaded
         """
         driver = self.driver
+        tracer = self.tracer
 
-        random_delay(50, 60)
-        self.wait_until_element_located(By.ID, "search-results-container")
-        profile_container = (
-            driver.find_element(By.ID, "search-results-container")
-                  .find_elements(By.XPATH, ".//li[@class='artdeco-list__item pl3 pv3 ']")
-        )
-        for profile in profile_container:
-            driver.execute_script(
-                "arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", 
-                profile
+        if batched is None:
+            batched = self.batched_scrolling
+
+        with tracer.span("load_all_profiles.wait"):
+            self.delay(*settle_delay)
+            self.wait_until_element_located(By.ID, "search-results-container")
+
+        if batched:
+            return self.scroll_profiles_in_browser(safe, step_delay, settle_delay, timeout)
+
+        with tracer.span("load_all_profiles.locate") as span:
+            profile_container = (
+                driver.find_element(By.ID, "search-results-container")
+                      .find_elements(By.XPATH, PROFILE_ROW_XPATH)
             )
-            random_delay(10, 15)
-        random_delay(50, 60)
+            span["rows"] = len(profile_container)
 
-        if safe:
-            for profile in reversed(profile_container):
+        with tracer.span("load_all_profiles.scroll", direction="down"):
+            for profile in profile_container:
                 driver.execute_script(
                     "arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", 
                     profile
                 )
-                random_delay(10, 15)
-            random_delay(50, 60)
+                self.delay(*step_delay)
+            self.delay(*settle_delay)
+
+        if safe:
+            with tracer.span("load_all_profiles.scroll", direction="up"):
+                for profile in reversed(profile_container):
+                    driver.execute_script(
+                        "arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", 
+                        profile
+                    )
+                    self.delay(*step_delay)
+                self.delay(*settle_delay)
+
+        return None
+
+    def scroll_profiles_in_browser(
+        self,
+        safe: bool,
+        step_delay: tuple[int, int],
+        settle_delay: tuple[int, int],
+        timeout: int
+    ) -> int:
+        """One execute_async_script call that scrolls every lead row into view with the same
+        pacing as the row-by-row loop, then keeps revisiting rows whose link has not loaded
+        until all are present or the timeout hits.
+
+        Returns:
+            int: number of rows still missing their link
+        """
+        driver = self.driver
+
+        # random_delay bounds are in hundredths of a second
+        to_ms = 10 * self.delay_scale
+        # the script timeout is session-wide, put it back for every other script
+        previous_timeout = driver.timeouts.script
+        driver.set_script_timeout(timeout + 10)
+        try:
+            with self.tracer.span("load_all_profiles.scroll_script") as span:
+                res = driver.execute_async_script(
+                    LOAD_ALL_PROFILES_SCRIPT,
+                    "search-results-container",
+                    PROFILE_ROW_XPATH,
+                    PROFILE_LINK_SELECTOR,
+                    step_delay[0] * to_ms,
+                    step_delay[1] * to_ms,
+                    settle_delay[0] * to_ms,
+                    settle_delay[1] * to_ms,
+                    timeout * 1000,
+                    safe
+                )
+                span.update(res)
+        finally:
+            driver.set_script_timeout(previous_timeout)
+
+        if res["missing"] > 0:
+            logging.warning(
+                f"{res['missing']} of {res['total']} profiles did not load on {driver.current_url}."
+            )
+
+        return res["missing"]
 
     def wait_until_element_located(self, by: By, element: str, max_wait: int=30):
         driver = self.driver
@@ -346,6 +1139,13 @@ class Crawler():
             else:
                 raise TimeoutException
 
+    def results_exist(self) -> bool:
+        """check_if_results_exist, through EXTRACT_RESULTS_SCRIPT if results_extraction is "script"."""
+        if self.results_extraction == "script":
+            return self.driver.execute_script(EXTRACT_RESULTS_SCRIPT)["has_results"]
+
+        return self.check_if_results_exist()
+
     def check_if_results_exist(self) -> bool:
         driver = self.driver
 
@@ -380,86 +1180,252 @@ class Crawler():
 
         return False
 
+    def extract_results_page(self, page: int=None) -> dict:
+        """Pull the lead rows and pagination state off the current results page, either with
+        one injected script returning JSON ("script") or by serializing and parsing the whole page
+        ("soup"). Both return the same structure, see extract_results_from_soup.
+        """
+        driver = self.driver
+        tracer = self.tracer
+
+        if self.results_extraction == "script":
+            with tracer.span("get_user_links.extract_script", page=page):
+                return driver.execute_script(EXTRACT_RESULTS_SCRIPT)
+
+        with tracer.span("get_user_links.page_source", page=page):
+            page_source = driver.page_source
+        with tracer.span("get_user_links.parse", page=page):
+            soup = BeautifulSoup(page_source, "lxml")
+            results = extract_results_from_soup(soup)
+        with tracer.span("get_user_links.pagination", page=page):
+            results["has_results"] = self.check_if_results_exist()
+
+        return results
+
+    @traced(
+        "get_profile_url_from_sales_page", 
+        result_attributes=lambda profile_url: {"found": profile_url is not None}
+    )
     def get_profile_url_from_sales_page(self, sales_navigator_url: str) -> Optional[str]:
+        """The public profile url behind a Sales Navigator lead, None if the lead definitely has
+        none (the lead page is a 404, or it has no profile link). A page that fails to load in
+        time raises TimeoutException, as the lead may well resolve on a later try.
+        """
         driver = self.driver
-        driver.get(sales_navigator_url)
+        tracer = self.tracer
 
-        random_delay(50, 60)
-        try:
-            self.wait_until_element_located(By.CSS_SELECTOR, "section[data-x--lead-actions-bar='']")
-        except TimeoutException:
-            return None
+        with tracer.span("get_profile_url_from_sales_page.get"):
+            driver.get(sales_navigator_url)
+
+        with tracer.span("get_profile_url_from_sales_page.wait"):
+            self.delay(50, 60)
+            try:
+                self.wait_until_element_located(
+                    By.CSS_SELECTOR, "section[data-x--lead-actions-bar='']"
+                )
+            except Error404:
+                return None
+
+        with tracer.span("get_profile_url_from_sales_page.open_menu"):
+            try:
+                driver.find_element(By.CSS_SELECTOR, "section[data-x--lead-actions-bar='']") \
+                      .find_element(By.CSS_SELECTOR, "button[data-x--lead-actions-bar-overflow-menu='']") \
+                      .click()
+            except NoSuchElementException:
+                return None
+
+            self.delay(30, 40)
 
         try:
-            driver.find_element(By.CSS_SELECTOR, "section[data-x--lead-actions-bar='']") \
-                  .find_element(By.CSS_SELECTOR, "button[data-x--lead-actions-bar-overflow-menu='']") \
-                  .click()
+            profile_url = driver.find_element(By.CSS_SELECTOR, "div[id='hue-web-menu-outlet']") \
+                                .find_element(By.CSS_SELECTOR, "a[href^='https']") \
+                                .get_attribute("href")
         except NoSuchElementException:
             return None
 
-        random_delay(30, 40)
-        profile_url = driver.find_element(By.CSS_SELECTOR, "div[id='hue-web-menu-outlet']") \
-                            .find_element(By.CSS_SELECTOR, "a[href^='https']") \
-                            .get_attribute("href")
-
         return profile_url
 
+    def resolve_profile_urls(
+        self,
+        employees: list[Employee],
+        cache: ProfileUrlCache=None
+    ) -> list[Employee]:
+        """Fill in profile_url for every Employee with a Sales Navigator url. Leads are keyed by
+        their normalized lead id, so a lead that comes back under several searches, or that was
+        resolved on an earlier run, costs no page load. Leads that definitely have no profile
+        are cached as well; a lead whose page failed (timeout, stale element, ...) is logged and
+        left unresolved and uncached, and the rest of the batch carries on.
+
+        Args:
+            employees (list[Employee]): e.g. the output of visit_sales_navigator_page
+            cache (ProfileUrlCache, optional): persistent cache. Defaults to None, which only
+            deduplicates within this batch.
+
+        Returns:
+            list[Employee]: the same employees, with profile_url set where it could be found
+        """
+        resolved = dict()
+        failed = set()
+        page_loads = 0
+
+        for employee in employees:
+            lead_id = normalize_lead_id(employee.sales_navigator_url)
+            if lead_id is None:
+                continue
+
+            if lead_id not in resolved and cache is not None:
+                entry = cache.get(lead_id)
+                if entry is not None:
+                    resolved[lead_id] = entry.value
+
+            if lead_id in failed:
+                continue
+
+            if lead_id not in resolved:
+                page_loads += 1
+                try:
+                    profile_url = self.get_profile_url_from_sales_page(employee.sales_navigator_url)
+                except WebDriverException as e:
+                    # transient, do not remember it as "no profile"
+                    logging.warning(
+                        f"Could not resolve {employee.sales_navigator_url} ({type(e).__name__})."
+                    )
+                    failed.add(lead_id)
+                    continue
+
+                resolved[lead_id] = profile_url
+                if cache is not None:
+                    cache.put(lead_id, profile_url)
+
+            employee.profile_url = resolved[lead_id]
+
+        if cache is not None:
+            stats = cache.stats
+            logging.info(
+                f"Resolved {len(resolved)} leads with {page_loads} page loads, {len(failed)} failed "
+                f"(cache hit rate {stats.hit_rate:.0%}, {stats.negative_hits} negative hits)."
+            )
+
+        return employees
+
+    @traced("get_user_links", result_attributes=lambda employees: {"employees": len(employees)})
     def get_user_links(self, company_i: str, company_s: str, current: bool) -> list[Employee]:
+        employees = []
+        for _, page_employees in self.iter_user_link_pages(company_i, company_s, current):
+            employees += page_employees
+
+        return employees
+
+    def iter_user_link_pages(
+        self,
+        company_i: str,
+        company_s: str,
+        current: bool,
+        start_page: int=1
+    ) -> Iterator[tuple[int, list[Employee]]]:
+        """Page through the results of the current search, yielding the Employees of each page as
+        soon as it is read, so callers can persist them before moving on.
+
+        Args:
+            company_i (str): input company name
+            company_s (str): company name searched in LinkedIn
+            current (bool): whether this is the current company search
+            start_page (int, optional): first page to read, to resume an interrupted crawl.
+            Defaults to 1.
+
+        Yields:
+            Iterator[tuple[int, list[Employee]]]: page number and the employees on it
+        """
         driver = self.driver
+        tracer = self.tracer
 
         first_page_url = driver.current_url
         split_url = first_page_url.split("?", 1)
         first_part = split_url[0]
         second_part = split_url[1]
 
-        random_delay(50, 60)
-        profiles_exist = self.check_if_results_exist()
-        if profiles_exist is False:
-            return [Employee(input_company=company_i, currently_at_company=current)]
+        if start_page <= 1:
+            self.delay(50, 60)
+            if self.results_exist() is False:
+                yield 1, [Employee(input_company=company_i, currently_at_company=current)]
+                return
         
-        employees = []
-        i = 1
+        i = max(start_page, 1)
         pages_left = True
         while pages_left:
-            if i >= 2:
-                page_url = f"{first_part}?page={i}&{second_part}"
-                driver.get(page_url)
-                self.wait_until_element_located(By.CSS_SELECTOR, "button[aria-label='Next']")
+            if i >= 2 and i == start_page:
+                # a crawl that stopped after checkpointing the last page resumes past it, on a
+                # 'no results' page: nothing is left to read
+                with tracer.span("get_user_links.page_load", page=i):
+                    driver.get(f"{first_part}?page={i}&{second_part}")
+                    self.wait_until_element_located(By.XPATH, RESULTS_PAGE_LOADED_XPATH)
+                if self.results_exist() is False:
+                    return
+            elif i >= 2:
+                with tracer.span("get_user_links.page_load", page=i):
+                    page_url = f"{first_part}?page={i}&{second_part}"
+                    driver.get(page_url)
+                    self.wait_until_element_located(By.CSS_SELECTOR, "button[aria-label='Next']")
 
             self.load_all_profiles()
-            soup = BeautifulSoup(driver.page_source, "lxml")
-            
-            profile_list = soup.find("div", {"id": "search-results-container"}).find_all("li")
-            for profile in profile_list:
-                link_soup = profile.find(
-                    "a", 
-                    {"data-control-name": "view_lead_panel_via_search_lead_name"}
-                )
-                if link_soup is None:
-                    continue
-                
-                raw_link = link_soup["href"]
-                name = link_soup.find("span", {"data-anonymize": "person-name"}).get_text()
-                employee_res = Employee(
-                    input_company=company_i,
-                    searched_company=company_s,
-                    name=name,
-                    sales_navigator_url=f"https://linkedin.com{raw_link.strip()}",
-                    currently_at_company=current
-                )
-                employees.append(employee_res)
-
-            pages_left = self.check_if_pages_left(soup)
+            results = self.extract_results_page(page=i)
+            yield i, employees_from_results(results, company_i, company_s, current)
+            pages_left = results_have_pages_left(results)
             i += 1
 
-        return employees
+    def crawl_company(
+        self,
+        company: str,
+        sink: "EmployeeSink",
+        checkpoint: "CrawlCheckpoint",
+        cache: CompanySearchCache=None
+    ) -> int:
+        """Company-level crawl that streams Employees page by page into an append-only sink and
+        checkpoints (company, how, page) after every page. An interrupted crawl resumes at the
+        next unfetched page, and searches that finished are skipped. A crash between writing a
+        page and checkpointing it writes that page twice; rows carry their page number so
+        duplicates can be dropped downstream. A crash after checkpointing the last page resumes
+        on an empty page past it, and the search is marked done.
+
+        Args:
+            company (str): input company name
+            sink (EmployeeSink): where the rows go, see EmployeeSink
+            checkpoint (CrawlCheckpoint): crawl progress
+            cache (CompanySearchCache, optional): company search cache. Defaults to None.
+
+        Returns:
+            int: number of employees written
+        """
+        num_written = 0
+        for how in ("current", "past"):
+            if checkpoint.is_done(company, how):
+                continue
+
+            start_page = checkpoint.last_page(company, how) + 1
+            searched_company = self.open_company_search(company, how=how, cache=cache)
+            pages = self.iter_user_link_pages(
+                company_i=company,
+                company_s=searched_company,
+                current=how == "current",
+                start_page=start_page
+            )
+            for page, employees in pages:
+                sink.write(employees, how=how, page=page)
+                checkpoint.mark_page(company, how, page)
+                num_written += len(employees)
+
+            checkpoint.mark_done(company, how)
+            if self.search_form_ready:
+                self.clear_sales_navigator_filters()
+
+        return num_written
 
     def clear_sales_navigator_filters(self):
         driver = self.driver
 
         clear_all_selector = "[aria-label='Clear all filter values']"
         self.wait_until_element_located(By.CSS_SELECTOR, clear_all_selector)
-        random_delay(30, 60)
+        self.delay(30, 60)
         driver.find_element(By.CSS_SELECTOR, clear_all_selector).click()
 
     def initialize_sales_navigator_page(self):
@@ -470,26 +1436,29 @@ class Crawler():
         WebDriverWait(driver, 30).until(
             EC.element_to_be_clickable((By.CSS_SELECTOR, expand_button_aria))
         )
-        random_delay(30, 60)
+        self.delay(30, 60)
         expand_button = driver.find_element(By.CSS_SELECTOR, expand_button_aria)
         expand_button.click()
+        self.search_form_ready = True
 
-    def visit_sales_navigator_page(self, company: str):
-        searched_company = self.search_company(company, how="current")
+    def visit_sales_navigator_page(self, company: str, cache: CompanySearchCache=None):
+        searched_company = self.open_company_search(company, how="current", cache=cache)
         current_employees = self.get_user_links(
             company_i=company, 
             company_s=searched_company, 
             current=True
         )
-        self.clear_sales_navigator_filters()
+        if self.search_form_ready:
+            self.clear_sales_navigator_filters()
 
-        searched_company = self.search_company(company, how="past")
+        searched_company = self.open_company_search(company, how="past", cache=cache)
         past_employees = self.get_user_links(
             company_i=company, 
             company_s=searched_company, 
             current=False
         )        
-        self.clear_sales_navigator_filters()
+        if self.search_form_ready:
+            self.clear_sales_navigator_filters()
 
         employees = current_employees + past_employees
 
@@ -11,14 +11,27 @@ from typing import Optional, Union
 
 # 3rd-party
 from bs4 import BeautifulSoup
-import requests
 
 # Own
 
 try:
+    from Canonicalizer import default_canonicalizer
+    from FieldScan import (
+        company_id_from_link, COMPANY_LINK_CLASS, COMPANY_LINK_FALLBACK_CLASS, HEADSHOT_CONTAINER_CLASS
+    )
+    from ProfileDelta import section_fingerprints
     from ProfileReader import Person
+    from ProfileRecord import Education, Experience, is_empty, is_present, Profile, to_int
+    from SourceWriter import read_source
 except ModuleNotFoundError:
+    from src.Canonicalizer import default_canonicalizer
+    from src.FieldScan import (
+        company_id_from_link, COMPANY_LINK_CLASS, COMPANY_LINK_FALLBACK_CLASS, HEADSHOT_CONTAINER_CLASS
+    )
+    from src.ProfileDelta import section_fingerprints
     from src.ProfileReader import Person
+    from src.ProfileRecord import Education, Experience, is_empty, is_present, Profile, to_int
+    from src.SourceWriter import read_source
 
 # Type Definitons
 
@@ -29,33 +42,20 @@ class EducDegree:
     degree: str = None
     field_of_study: str = None
 
-@dataclass
-class EducResult:
-    school: str = None
-    degree: str = None
-    years: str = None
-
 @dataclass
 class EducYears:
-    start_year: str = None
-    end_year: str = None
+    start_year: int = None
+    end_year: int = None
     start_month: str = None
     end_month: str = None
 
-@dataclass
-class ExpResult:
-    company: str = None
-    company_id: str = None
-    desc: str = None
-    title: str = None
-    years: str = None
-
 @dataclass
 class ExpYears:
     start_month: str = None
     end_month: str = None
-    start_year: str = None
-    end_year: str = None
+    start_year: int = None
+    end_year: int = None
+    is_current: bool = False
     duration: str = None
 
 @dataclass
@@ -91,13 +91,10 @@ class PageParser():
         exp_file: PathLike=None
     ):
         if not from_file:
-            page_soup, exp_soup = self.initialize_from_person_only()
+            page_soup, exp_soup = self.initialize_from_person_only(person)
         elif from_file:
-            with open(page_file, "r", encoding="utf-8") as f:
-                page_source = f.read()
-            
-            with open(exp_file, "r", encoding="utf-8") as f:
-                exp_source = f.read()
+            page_source = read_source(page_file)
+            exp_source = read_source(exp_file)
 
             page_soup = self.soupify(page_source)
             exp_soup = self.soupify(exp_source)
@@ -107,56 +104,30 @@ class PageParser():
         self.id = person.id
         self.url = person.profile_url
 
-    def initialize_from_person_only(self, person: Person) -> tuple[BeautifulSoup, BeautifulSoup]:
-        page_soup = self.soupify(person.page_source)
-        exp_soup = self.soupify(person.exp_source)
-
-        return page_soup, exp_soup
-
-    @staticmethod
-    def initialize_education_dictionary() -> dict:
-        educ_dict = dict()
-
-        educ_keys = {
-            "degree", "end_month", "end_year", "field_of_study", "school", "start_month",
-            "start_year", "raw_years", "raw_degree"
-        }
-
-        for key in educ_keys:
-            educ_dict[key] = None
-
-        return educ_dict
+    def __enter__(self):
+        return self
 
-    @staticmethod
-    def initialize_experience_dictionary() -> dict:
-        exp_dict = dict()
-
-        exp_keys = {
-            "company", "company_id", "description", "raw_years", "end_month", "end_year", 
-            "start_month", "start_year", "title"
-        }
-        
-        for key in exp_keys:
-            exp_dict[key] = None
-
-        return exp_dict
+    def __exit__(self, *args):
+        self.close()
 
-    def initialize_master_dictionary(self) -> dict:
-        data_dict = dict()
+    def close(self):
+        """Tear down both trees. BeautifulSoup trees are full of reference cycles, so otherwise
+        they are only freed whenever the cyclic garbage collector gets to them, which lets
+        long-running workers grow. The parser cannot be used afterwards.
+        """
+        for soup in (self.page_soup, self.exp_soup):
+            if soup is not None:
+                soup.decompose()
 
-        master_string_keys = {
-            "headline", "location" 
-        }
-        # "city", "country", "first_name", "last_name", "state", "original_url", "picture_filename"
+        self.page_soup = None
+        self.exp_soup = None
 
-        for key in master_string_keys:
-            data_dict[key] = None
+    def initialize_from_person_only(self, person: Person) -> tuple[BeautifulSoup, BeautifulSoup]:
+        page_soup = self.soupify(person.page_source)
+        exp_soup = self.soupify(person.exp_source)
 
-        data_dict["personid"] = self.id
-        data_dict["linkedin_url"] = self.url
-        # data_dict["educations"] = None
+        return page_soup, exp_soup
 
-        return data_dict
 
     def soupify(self, page_source: str) -> BeautifulSoup:
         soup = BeautifulSoup(page_source, "lxml")
@@ -265,7 +236,7 @@ class PageParser():
 
         try:
             raw_link = (
-                soup.find("div", {"class": "pv-profile-sticky-header-v2__container pv1"})
+                soup.find("div", {"class": HEADSHOT_CONTAINER_CLASS})
                     .find("img")
             )
             raw_link = raw_link["src"]
@@ -277,6 +248,9 @@ class PageParser():
         return link
 
     def download_image(self, link, filename) -> bool:
+        # only needed with headshots, keep it off the import path of parse workers
+        import requests
+
         valid_image = True
         try:
             img = requests.get(link)
@@ -351,10 +325,10 @@ class PageParser():
             degree = self.__get_degree(educ)
             years = self.__get_school_years(educ)
             
-            result = EducResult(
+            result = Education(
                 school=school,
-                degree=degree,
-                years=years
+                raw_degree=degree,
+                raw_years=years
             )
 
             result_list.append(result)
@@ -449,22 +423,16 @@ class PageParser():
 
     def __get_company_id(self, exp: BeautifulSoup):
         # here we try two methods of finding, preferring the first
-        image_info = exp.find("a", {"class": "optional-action-target-wrapper display-flex"})
+        image_info = exp.find("a", {"class": COMPANY_LINK_CLASS})
         if image_info is None:
-            image_info = exp.find("a", {"class": "optional-action-target-wrapper"})
+            image_info = exp.find("a", {"class": COMPANY_LINK_FALLBACK_CLASS})
 
         try:
             comp_link = image_info["href"]
         except TypeError:
             return None
 
-        comp_list = comp_link.split("/")
-        if "search" in comp_link or comp_list[3] != "company":
-            return None
-
-        comp_id = int(clean_string(comp_list[-2]).rstrip("/"))
-
-        return comp_id
+        return company_id_from_link(comp_link)
 
     def get_experience(self):
         soup = self.exp_soup
@@ -476,7 +444,7 @@ class PageParser():
                     .find_all("li", recursive=False)
             )
         except AttributeError:
-            return [ExpResult()]
+            return [Experience()]
 
         result_list = []
         for exp in exp_list:
@@ -490,10 +458,10 @@ class PageParser():
                 res_list = [text_info]
 
             for text_info in res_list:
-                result = ExpResult(
+                result = Experience(
                     company_id=self.__get_company_id(exp),
-                    desc=self.__get_experience_description(text_info),
-                    years=self.__get_experience_years(text_info)
+                    description=self.__get_experience_description(text_info),
+                    raw_years=self.__get_experience_years(text_info)
                 )
 
                 if is_collapsed:
@@ -561,39 +529,37 @@ class PageParser():
                 res.end_month = end_list[0]
                 end_year = end_list[1]
 
-        res.start_year = start_year
-        res.end_year = end_year
+        res.start_year = to_int(start_year)
+        res.end_year = to_int(end_year)
 
         return res
 
-    def education_to_dict(self) -> list[dict]:
+    def education_records(self) -> Optional[list[Education]]:
         educ_list = self.get_education()
         if educ_list is None:
             return educ_list
 
-        educ_dict_list = []
+        canonicalizer = default_canonicalizer()
+        educ_records = []
         for educ in educ_list:
-            educ_dict = self.initialize_education_dictionary()
-
-            degree_res = self.parse_degree(educ.degree)
-            year_res = self.parse_educ_years(educ.years)
-
-            educ_dict["school"] = educ.school
-            educ_dict["field_of_study"] = degree_res.field_of_study
-            educ_dict["degree"] = degree_res.degree
-            educ_dict["start_month"] = year_res.start_month
-            educ_dict["end_month"] = year_res.end_month
-            educ_dict["start_year"] = year_res.start_year
-            educ_dict["end_year"] = year_res.end_year
-            educ_dict["raw_years"] = educ.years
-            educ_dict["raw_degree"] = educ.degree
-
-            if all(value is None for value in educ_dict.values()):
+            degree_res = self.parse_degree(educ.raw_degree)
+            year_res = self.parse_educ_years(educ.raw_years)
+
+            educ.field_of_study = degree_res.field_of_study
+            educ.degree = degree_res.degree
+            educ.start_month = year_res.start_month
+            educ.end_month = year_res.end_month
+            educ.start_year = year_res.start_year
+            educ.end_year = year_res.end_year
+            educ.canonical_school = canonicalizer.canonical_school(educ.school)
+            educ.degree_level = canonicalizer.degree_level(educ.degree)
+
+            if is_empty(educ):
                 continue
             
-            educ_dict_list.append(educ_dict)
+            educ_records.append(educ)
 
-        return educ_dict_list
+        return educ_records
 
     @staticmethod
     def parse_exp_years(year_info: str):
@@ -629,7 +595,9 @@ class PageParser():
             end_list = clean_string(years_list[1]).split(" ")
 
         if len(end_list) == 1:
-            res.end_year = end_list[0]
+            # a year, "Present" or nothing
+            res.is_current = is_present(end_list[0])
+            res.end_year = to_int(end_list[0])
         elif len(end_list) == 2:
             res.end_month = end_list[0]
             res.end_year = int(end_list[1])
@@ -640,33 +608,28 @@ class PageParser():
 
         return res
 
-    def experience_to_dict(self):
+    def experience_records(self) -> Optional[list[Experience]]:
         exp_list = self.get_experience()
         if exp_list is None:
             return None
         
-        exp_dict_list = []
+        exp_records = []
         for exp in exp_list:
-            exp_dict = self.initialize_experience_dictionary()
-            year_res = self.parse_exp_years(exp.years)
-
-            exp_dict["company"] = exp.company
-            exp_dict["company_id"] = exp.company_id
-            exp_dict["description"] = exp.desc
-            exp_dict["raw_years"] = exp.years
-            exp_dict["start_month"] = year_res.start_month
-            exp_dict["end_month"] = year_res.end_month
-            exp_dict["start_year"] = year_res.start_year
-            exp_dict["end_year"] = year_res.end_year
-            exp_dict["duration"] = year_res.duration
-            exp_dict["title"] = exp.title
-
-            if all(value is None for value in exp_dict.values()):
+            year_res = self.parse_exp_years(exp.raw_years)
+
+            exp.start_month = year_res.start_month
+            exp.end_month = year_res.end_month
+            exp.start_year = year_res.start_year
+            exp.end_year = year_res.end_year
+            exp.is_current = year_res.is_current
+            exp.duration = year_res.duration
+
+            if is_empty(exp):
                 continue
 
-            exp_dict_list.append(exp_dict)
+            exp_records.append(exp)
 
-        return exp_dict_list
+        return exp_records
 
     @staticmethod
     def parse_location(location_info: str):
@@ -689,19 +652,54 @@ class PageParser():
 
         return res
 
-    def parse_page(self):
-        mast_dict = self.initialize_master_dictionary()
-
+    def parse_profile(self) -> Profile:
         loc = self.get_location()
         loc_res = self.parse_location(loc)
 
-        mast_dict["city"] = loc_res.city
-        mast_dict["state"] = loc_res.state
-        mast_dict["country"] = loc_res.country
-        mast_dict["educations"] = self.education_to_dict()
-        mast_dict["experiences"] = self.experience_to_dict()
-        mast_dict["name"] = self.get_name()
-        mast_dict["location"] = loc
-        mast_dict["headline"] = self.get_headline()
-
-        return mast_dict
+        profile = Profile(
+            personid=self.id,
+            linkedin_url=self.url,
+            name=self.get_name(),
+            headline=self.get_headline(),
+            location=loc,
+            city=loc_res.city,
+            state=loc_res.state,
+            country=loc_res.country,
+            educations=self.education_records(),
+            experiences=self.experience_records()
+        )
+        profile.fingerprints = section_fingerprints(profile.to_dict())
+
+        return profile
+
+    def parse_page(self) -> dict:
+        """parse_profile as a plain dict."""
+        return self.parse_profile().to_dict()
+
+# Workers
+
+def parse_person(person: Person, headshot_folder: PathLike=None) -> Profile:
+    """Parse a Person straight from the page_source / exp_source captured by
+    Crawler.visit_page, without going through files. Module-level so that it can be sent to a
+    process pool.
+
+    Args:
+        person (Person): with page_source and exp_source set
+        headshot_folder (PathLike, optional): if given, download the headshot to
+        {headshot_folder}/{id}.png and set image_url. Defaults to None.
+
+    Returns:
+        Profile: the parse_profile record
+    """
+    with PageParser(person=person, from_file=False) as page:
+        res = page.parse_profile()
+        link = page.get_headshot_link() if headshot_folder is not None else None
+
+    # the trees are gone, download_image only needs the id
+    if headshot_folder is not None:
+        if link:
+            valid_image = page.download_image(link=link, filename=Path(headshot_folder) / f"{person.id}.png")
+            if valid_image:
+                res.image_url = link
+
+    return res
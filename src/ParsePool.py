@@ -0,0 +1,206 @@
+# Imports
+
+# stdlib
+from dataclasses import dataclass
+import gc
+import logging
+import multiprocessing
+from multiprocessing.connection import Connection, wait
+import os
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+# 3rd-party
+import psutil
+
+# Type Definitons
+
+@dataclass
+class WorkerStats:
+    worker_id: int
+    pid: int = None
+    tasks: int = 0
+    peak_rss_mb: float = 0.0
+    exit_reason: str = None # "done", "rss" or "died"
+
+@dataclass
+class TaskResult:
+    index: int
+    value: Any = None
+    error: Optional[str] = None
+
+# Globals
+
+BYTES_IN_MB = 1024 * 1024
+
+# Functions
+
+def _worker_loop(
+    worker_id: int,
+    func: Callable,
+    conn: Connection,
+    max_rss_bytes: Optional[int]
+):
+    process = psutil.Process()
+    peak = 0
+    done = 0
+
+    while True:
+        item = conn.recv()
+        if item is None:
+            conn.send(("exit", peak, done, "done"))
+            return
+
+        index, arg = item
+        try:
+            res = TaskResult(index=index, value=func(arg))
+        except Exception as e:
+            res = TaskResult(index=index, error=f"{type(e).__name__}: {e}")
+
+        done += 1
+        rss = process.memory_info().rss
+        peak = max(peak, rss)
+        retire = False
+        if max_rss_bytes is not None and rss > max_rss_bytes:
+            gc.collect()
+            retire = process.memory_info().rss > max_rss_bytes
+
+        conn.send(("result", res, retire))
+        if retire:
+            conn.send(("exit", peak, done, "rss"))
+            return
+
+# Classes
+
+class BoundedProcessPool():
+    """A process pool that keeps every worker under an RSS ceiling. After each task a worker
+    checks its own RSS with psutil; past max_rss_mb (even after a gc pass) it finishes and a
+    fresh worker takes its place. A worker that dies (e.g. OOM killed) fails only the task it
+    was on and is replaced as well. stats has the tasks and peak RSS of every worker.
+
+    Every worker has its own pipe and one task at a time, so a killed worker cannot take a
+    shared queue lock down with it, and the pool always knows which task it was on.
+
+    Usage:
+        pool = BoundedProcessPool(parse_func, workers=8, max_rss_mb=1024)
+        for res in pool.imap_unordered(people):
+            ...
+        print(pool.summary())
+    """
+
+    def __init__(self, func: Callable, workers: int=None, max_rss_mb: Optional[float]=None):
+        """
+        Args:
+            func (Callable): module-level function of one argument
+            workers (int, optional): Defaults to the number of CPUs.
+            max_rss_mb (Optional[float], optional): per-worker ceiling, None for no ceiling.
+            Defaults to None.
+        """
+        self.func = func
+        self.workers = workers or os.cpu_count() or 1
+        self.max_rss_bytes = int(max_rss_mb * BYTES_IN_MB) if max_rss_mb else None
+        self.stats: list[WorkerStats] = []
+
+    def _start_worker(self) -> tuple[int, multiprocessing.Process, Connection]:
+        worker_id = len(self.stats)
+        conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=_worker_loop,
+            args=(worker_id, self.func, child_conn, self.max_rss_bytes),
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        self.stats.append(WorkerStats(worker_id=worker_id, pid=process.pid))
+
+        return worker_id, process, conn
+
+    def imap_unordered(self, items: Iterable[Any]) -> Iterator[TaskResult]:
+        """Run func over items, yielding TaskResults as they complete."""
+        pending = list(enumerate(items))
+        pending.reverse()
+
+        workers = {} # worker_id -> (process, conn)
+        in_flight = {} # worker_id -> task index
+
+        def dispatch(worker_id: int):
+            _, conn = workers[worker_id]
+            if not pending:
+                conn.send(None)
+                return
+
+            index, arg = pending.pop()
+            try:
+                conn.send((index, arg))
+            except OSError:
+                # died between tasks, the task goes to its replacement
+                pending.append((index, arg))
+            else:
+                in_flight[worker_id] = index
+
+        def replace():
+            if pending:
+                worker_id, process, conn = self._start_worker()
+                workers[worker_id] = (process, conn)
+                dispatch(worker_id)
+
+        for _ in range(min(self.workers, len(pending))):
+            replace()
+
+        while workers:
+            conns = {conn: worker_id for worker_id, (_, conn) in workers.items()}
+            for conn in wait(list(conns)):
+                worker_id = conns[conn]
+                process, _ = workers[worker_id]
+                try:
+                    message = conn.recv()
+                except EOFError:
+                    # killed, e.g. by the OOM killer
+                    process.join()
+                    logging.warning(f"Parse worker {worker_id} died (exit code {process.exitcode}).")
+                    self.stats[worker_id].exit_reason = "died"
+                    del workers[worker_id]
+                    conn.close()
+                    index = in_flight.pop(worker_id, None)
+                    if index is not None:
+                        yield TaskResult(index=index, error="worker died")
+                    replace()
+                    continue
+
+                if message[0] == "result":
+                    _, res, retire = message
+                    in_flight.pop(worker_id, None)
+                    yield res
+                    # a worker past the ceiling exits on its own, it gets no more work
+                    if not retire:
+                        dispatch(worker_id)
+                else:
+                    _, peak, done, reason = message
+                    stats = self.stats[worker_id]
+                    stats.tasks, stats.exit_reason = done, reason
+                    stats.peak_rss_mb = peak / BYTES_IN_MB
+                    del workers[worker_id]
+                    process.join()
+                    conn.close()
+                    if reason == "rss":
+                        replace()
+
+    def map(self, items: Iterable[Any]) -> list[TaskResult]:
+        """Like imap_unordered, but in the order of items."""
+        return sorted(self.imap_unordered(items), key=lambda res: res.index)
+
+    def summary(self) -> dict:
+        return {
+            "workers_started": len(self.stats),
+            "recycled": sum(stats.exit_reason == "rss" for stats in self.stats),
+            "died": sum(stats.exit_reason == "died" for stats in self.stats),
+            "peak_rss_mb": max((stats.peak_rss_mb for stats in self.stats), default=0.0),
+            "workers": [
+                {
+                    "worker_id": stats.worker_id,
+                    "tasks": stats.tasks,
+                    "peak_rss_mb": round(stats.peak_rss_mb, 1),
+                    "exit_reason": stats.exit_reason
+                }
+                for stats in self.stats
+            ]
+        }
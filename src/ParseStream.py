@@ -0,0 +1,153 @@
+# Imports
+
+# stdlib
+import concurrent.futures
+import logging
+from pathlib import Path
+import threading
+from typing import Callable, Optional, Union
+
+# Own
+
+try:
+    from LinkedinParser import parse_person
+    from ProfileReader import Person
+    from ProfileRecord import Profile
+    from ProfileSink import make_profile_sink
+except ModuleNotFoundError:
+    from src.LinkedinParser import parse_person
+    from src.ProfileReader import Person
+    from src.ProfileRecord import Profile
+    from src.ProfileSink import make_profile_sink
+
+# Type Definitons
+
+PathLike = Union[Path, str]
+
+# Classes
+
+class ParseStream():
+    """Parses every Person returned by Crawler.visit_page on a process pool as soon as it is
+    captured, so structured records are ready seconds after the crawl instead of after a
+    separate write / read / parse pass over the archive. At most max_pending people are in
+    flight; submit() blocks beyond that so captured sources cannot pile up in memory.
+
+    Usage:
+        with ParseStream(output_folder=BASE_PATH / "CL_Profiles") as stream:
+            for person in people:
+                stream.submit(crawler.visit_page(person, download=False))
+    """
+
+    def __init__(
+        self,
+        output_folder: PathLike=None,
+        headshot_folder: PathLike=None,
+        max_workers: int=None,
+        max_pending: int=32,
+        on_result: Callable[[Person, Profile], None]=None,
+        output_format: str="json",
+        records_per_file: int=10_000
+    ):
+        """
+        Args:
+            output_folder (PathLike, optional): write each record here, see ProfileSink.
+            Defaults to None.
+            headshot_folder (PathLike, optional): download headshots here. Defaults to None.
+            max_workers (int, optional): parse processes. Defaults to the number of CPUs.
+            max_pending (int, optional): people submitted but not yet parsed. Defaults to 32.
+            on_result (Callable[[Person, Profile], None], optional): called with every record.
+            Defaults to None.
+            output_format (str, optional): "json", "jsonl" or "jsonl.gz". Defaults to "json".
+            records_per_file (int, optional): for the jsonl formats. Defaults to 10_000.
+        """
+        self.sink = make_profile_sink(
+            output_folder,
+            output_format=output_format,
+            records_per_file=records_per_file
+        ) if output_folder is not None else None
+        self.headshot_folder = headshot_folder
+        self.on_result = on_result
+
+        self.parsed = 0
+        self.failed = 0
+
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def submit(self, person: Optional[Person]) -> Optional[concurrent.futures.Future]:
+        if person is None or person.page_source is None or person.exp_source is None:
+            return None
+
+        self._slots.acquire()
+        future = self._pool.submit(parse_person, person, self.headshot_folder)
+        future.add_done_callback(lambda future: self._finish(person, future))
+
+        return future
+
+    def _finish(self, person: Person, future: concurrent.futures.Future):
+        # the pool pickles the person on its own thread some time after submit(), so the sources
+        # can only be dropped once the work is done
+        person.page_source = None
+        person.exp_source = None
+
+        try:
+            res = future.result()
+        except Exception as e:
+            self.failed += 1
+            logging.warning(f"Parsing {person.id} failed: {type(e).__name__}: {e}")
+            return
+        finally:
+            self._slots.release()
+
+        self.parsed += 1
+        if self.sink is not None:
+            self.sink.write(res)
+
+        if self.on_result is not None:
+            self.on_result(person, res)
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        if self.sink is not None:
+            self.sink.close()
+
+# Check
+
+def check_stream(page_source: str, exp_source: str, num_people: int=40, max_workers: int=2) -> dict:
+    """Stream num_people copies of a saved profile through a ParseStream, the way
+    crawl_profiles does, and check that every record comes back and matches a direct parse.
+
+    Returns:
+        dict: parsed / failed counts and a list of failures, empty if all is well
+    """
+    expected = parse_person(
+        Person(id="0", profile_url=None, page_source=page_source, exp_source=exp_source)
+    ).to_dict()
+
+    records = {}
+    with ParseStream(
+        max_workers=max_workers,
+        max_pending=8,
+        on_result=lambda person, res: records.__setitem__(person.id, res)
+    ) as stream:
+        for i in range(num_people):
+            stream.submit(
+                Person(id=str(i), profile_url=None, page_source=page_source, exp_source=exp_source)
+            )
+
+    failures = []
+    if stream.failed:
+        failures.append(f"{stream.failed} of {num_people} people failed to parse")
+    if len(records) != num_people:
+        failures.append(f"{len(records)} of {num_people} records came back")
+    for personid, res in records.items():
+        if dict(res.to_dict(), personid="0") != expected:
+            failures.append(f"record {personid} differs from a direct parse")
+
+    return {"people": num_people, "parsed": stream.parsed, "failed": stream.failed, "failures": failures}
@@ -0,0 +1,301 @@
+# Imports
+
+# stdlib
+import argparse
+import json
+import gc
+from pathlib import Path
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Optional, Union
+
+# Own
+
+try:
+    from LinkedinParser import PageParser
+    from ProfileReader import Person
+except ModuleNotFoundError:
+    from src.LinkedinParser import PageParser
+    from src.ProfileReader import Person
+
+# Type Definitons
+
+PathLike = Union[Path, str]
+
+# Globals
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# One synthetic saved profile per known DOM layout: manifest.json (layout -> description,
+# profile_url) and per layout profile.html, experience.html and the golden expected.json
+CORPUS = REPO_ROOT / "fixtures" / "regression"
+# Timings are only comparable on one machine, so the history stays local (gitignored) and out
+# of the corpus.
+HISTORY = REPO_ROOT / ".regression_history.json"
+
+DEFAULT_REPEAT = 50
+DEFAULT_MAX_SLOWDOWN = 1.5 # parse time may grow by 50% over the baseline run
+DEFAULT_MAX_MEMORY_GROWTH = 1.25
+
+# Functions
+
+def current_commit() -> str:
+    """HEAD, with "-dirty" if the parser sources have uncommitted changes, "unknown" outside a
+    git checkout.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short=12", "HEAD"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--", "src"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+    return f"{commit}-dirty" if status else commit
+
+def load_manifest(corpus: PathLike=CORPUS) -> dict[str, dict]:
+    with open(Path(corpus) / "manifest.json", encoding="utf-8") as f:
+        return json.load(f)["layouts"]
+
+def layout_person(corpus: PathLike, name: str, layout: dict) -> Person:
+    folder = Path(corpus) / name
+    person = Person(id=name, profile_url=layout["profile_url"])
+    person.page_source = (folder / "profile.html").read_text(encoding="utf-8")
+    person.exp_source = (folder / "experience.html").read_text(encoding="utf-8")
+
+    return person
+
+def parse_layout(person: Person) -> dict:
+    """The parse_page record, plus the headshot link so that its selector is covered too."""
+    with PageParser(person=person, from_file=False) as page:
+        profile = page.parse_profile()
+        profile.image_url = page.get_headshot_link()
+
+    return profile.to_dict()
+
+def diff_records(expected: Any, actual: Any, path: str="") -> list[str]:
+    """Every difference between two JSON values, as "path: expected X, got Y"."""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        diffs = []
+        for key in expected.keys() | actual.keys():
+            diffs.extend(diff_records(expected.get(key), actual.get(key), f"{path}.{key}"))
+        return sorted(diffs)
+
+    if isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            return [f"{path}: expected {len(expected)} entries, got {len(actual)}"]
+        diffs = []
+        for i, (left, right) in enumerate(zip(expected, actual)):
+            diffs.extend(diff_records(left, right, f"{path}[{i}]"))
+        return diffs
+
+    if expected != actual:
+        return [f"{path}: expected {expected!r}, got {actual!r}"]
+
+    return []
+
+def measure_layout(person: Person, repeat: int=DEFAULT_REPEAT) -> dict:
+    """Best of repeat parse times and the tracemalloc peak of one parse (the Python heap:
+    BeautifulSoup's tree, not libxml2's own buffers).
+    """
+    parse_layout(person) # warm up
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse_layout(person)
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    parse_layout(person)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"parse_ms": round(min(times) * 1000, 3), "peak_kb": round(peak / 1024, 1)}
+
+def load_history(path: PathLike) -> dict[str, dict]:
+    path = Path(path)
+    if not path.exists():
+        return {}
+
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_history(path: PathLike, history: dict[str, dict]):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=4)
+        f.write("\n")
+
+def best_runs(history: dict[str, dict]) -> dict[str, dict]:
+    """Per layout, the fastest parse and the lowest peak of every recorded run. Comparing
+    against these, rather than against the previous run, keeps small slowdowns from adding up
+    commit after commit.
+    """
+    best = {}
+    for entry in history.values():
+        for name, res in entry["layouts"].items():
+            if name not in best:
+                best[name] = dict(res)
+            else:
+                best[name]["parse_ms"] = min(best[name]["parse_ms"], res["parse_ms"])
+                best[name]["peak_kb"] = min(best[name]["peak_kb"], res["peak_kb"])
+
+    return best
+
+def baseline_layouts(history: dict[str, dict], baseline: str=None) -> Optional[dict[str, dict]]:
+    """The per-layout numbers to compare against: the run of commit baseline if given, else the
+    best recorded run (see best_runs). None if there is nothing to compare against.
+    """
+    if baseline is not None:
+        return history[baseline]["layouts"] if baseline in history else None
+
+    return best_runs(history) or None
+
+def compare_runs(
+    layouts: dict[str, dict],
+    baseline: dict[str, dict],
+    max_slowdown: float=DEFAULT_MAX_SLOWDOWN,
+    max_memory_growth: float=DEFAULT_MAX_MEMORY_GROWTH
+) -> list[str]:
+    failures = []
+    for name, res in layouts.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        if old["parse_ms"] and res["parse_ms"] > old["parse_ms"] * max_slowdown:
+            failures.append(
+                f"{name}: parse takes {res['parse_ms']}ms, was {old['parse_ms']}ms (max x{max_slowdown})"
+            )
+        if old["peak_kb"] and res["peak_kb"] > old["peak_kb"] * max_memory_growth:
+            failures.append(
+                f"{name}: parse peaks at {res['peak_kb']}KB, was {old['peak_kb']}KB (max x{max_memory_growth})"
+            )
+
+    return failures
+
+def run_regression(
+    corpus: PathLike=CORPUS,
+    repeat: int=DEFAULT_REPEAT,
+    max_slowdown: float=DEFAULT_MAX_SLOWDOWN,
+    max_memory_growth: float=DEFAULT_MAX_MEMORY_GROWTH,
+    history_path: PathLike=None,
+    baseline: str=None,
+    record: bool=True,
+    record_failures: bool=False,
+    update_golden: bool=False
+) -> dict:
+    """Check every layout of the corpus against its golden output and the history.
+
+    Args:
+        corpus (PathLike, optional): Defaults to fixtures/regression.
+        repeat (int, optional): timed parses per layout. Defaults to 50.
+        max_slowdown (float, optional): fail if a layout parses this many times slower than in
+        the baseline run. Defaults to 1.5.
+        max_memory_growth (float, optional): same for the peak memory. Defaults to 1.25.
+        history_path (PathLike, optional): where runs are kept, per machine. Defaults to
+        .regression_history.json in the repository root.
+        baseline (str, optional): commit to compare against. Defaults to the best recorded run
+        of each layout.
+        record (bool, optional): write this run into the history if it passes. Defaults to True.
+        record_failures (bool, optional): record it even if it fails, making a slower parser
+        the new reference of its commit. Defaults to False.
+        update_golden (bool, optional): rewrite expected.json from the current output instead
+        of diffing. Defaults to False.
+
+    Returns:
+        dict: per-layout results and a list of failures, empty if all is well
+    """
+    corpus = Path(corpus)
+    history_path = Path(history_path) if history_path is not None else HISTORY
+    commit = current_commit()
+
+    layouts = {}
+    failures = []
+    for name, layout in load_manifest(corpus).items():
+        person = layout_person(corpus, name, layout)
+        golden_path = corpus / name / "expected.json"
+        actual = parse_layout(person)
+
+        if update_golden:
+            with open(golden_path, "w", encoding="utf-8") as f:
+                json.dump(actual, f, indent=4, ensure_ascii=False)
+                f.write("\n")
+            diffs = []
+        elif not golden_path.exists():
+            diffs = ["no expected.json, run with --update-golden"]
+        else:
+            with open(golden_path, encoding="utf-8") as f:
+                diffs = diff_records(json.load(f), actual)
+
+        layouts[name] = dict(measure_layout(person, repeat=repeat), diffs=diffs)
+        failures.extend(f"{name}: {diff}" for diff in diffs)
+
+    history = load_history(history_path)
+    previous = baseline_layouts(history, baseline)
+    if baseline is not None and previous is None:
+        failures.append(f"no run of {baseline} in {history_path}")
+    if previous is not None:
+        failures.extend(compare_runs(
+            layouts,
+            previous,
+            max_slowdown=max_slowdown,
+            max_memory_growth=max_memory_growth
+        ))
+
+    if record and (record_failures or not failures):
+        history[commit] = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": repeat,
+            "layouts": {
+                name: {"parse_ms": res["parse_ms"], "peak_kb": res["peak_kb"]}
+                for name, res in layouts.items()
+            }
+        }
+        save_history(history_path, history)
+
+    return {
+        "commit": commit,
+        "baseline": baseline or (f"best of {len(history)} runs" if previous is not None else None),
+        "layouts": layouts,
+        "failures": failures,
+    }
+
+# CLI
+
+def main():
+    parser = argparse.ArgumentParser(description="Golden-output and performance regression check of the parser.")
+    parser.add_argument("--corpus", default=str(CORPUS))
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--max-slowdown", type=float, default=DEFAULT_MAX_SLOWDOWN)
+    parser.add_argument("--max-memory-growth", type=float, default=DEFAULT_MAX_MEMORY_GROWTH)
+    parser.add_argument("--history", default=str(HISTORY), help="history file of this machine")
+    parser.add_argument("--baseline", help="commit to compare against, defaults to the best recorded run")
+    parser.add_argument("--no-record", action="store_true", help="do not add this run to the history")
+    parser.add_argument("--record-failures", action="store_true", help="add this run to the history even if it fails")
+    parser.add_argument("--update-golden", action="store_true", help="rewrite expected.json from the current output")
+    args = parser.parse_args()
+
+    result = run_regression(
+        corpus=args.corpus,
+        repeat=args.repeat,
+        max_slowdown=args.max_slowdown,
+        max_memory_growth=args.max_memory_growth,
+        history_path=args.history,
+        baseline=args.baseline,
+        record=not args.no_record,
+        record_failures=args.record_failures,
+        update_golden=args.update_golden
+    )
+    print(json.dumps(result, indent=4, ensure_ascii=False))
+    sys.exit(1 if result["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+# Imports
+
+# stdlib
+import concurrent.futures
+import functools
+import logging
+from pathlib import Path
+import sys
+from typing import Optional, Union
+
+# Own
+
+# Crawl-only dependencies (Selenium, webdriver_manager, wakepy, cutils) are imported inside the
+# crawl functions, so that parsing, and every parse worker, never loads them. See ImportCheck.
+
+try:
+    from Config import PipelineConfig
+    from FieldScan import FIELD_SOURCES, scan_sources, write_lines
+    from LinkedinParser import PageParser
+    from ParsePool import BoundedProcessPool
+    from ProfileDelta import DeltaStore, ingest_profiles
+    from ProfileIndex import ProfileIndex
+    import ProfileReader
+    from ProfileReader import Person
+    from ProfileSink import encode, make_profile_sink, profile_ids
+    from Sharding import Shard, select_shard, shard_root
+    from SourceWriter import list_source_ids
+except ModuleNotFoundError:
+    from src.Config import PipelineConfig
+    from src.FieldScan import FIELD_SOURCES, scan_sources, write_lines
+    from src.LinkedinParser import PageParser
+    from src.ParsePool import BoundedProcessPool
+    from src.ProfileDelta import DeltaStore, ingest_profiles
+    from src.ProfileIndex import ProfileIndex
+    import src.ProfileReader as ProfileReader
+    from src.ProfileReader import Person
+    from src.ProfileSink import encode, make_profile_sink, profile_ids
+    from src.Sharding import Shard, select_shard, shard_root
+    from src.SourceWriter import list_source_ids
+
+# Type Definitons
+
+PathLike = Union[Path, str]
+
+# Globals
+
+SECONDS_IN_HOUR = 3600
+
+# Functions
+
+def run_root(config: PipelineConfig, shard: Optional[Shard]) -> Path:
+    return shard_root(config.base_path, shard)
+
+def read_people(config: PipelineConfig, shard: Optional[Shard]=None) -> list[Person]:
+    people = ProfileReader.read_csv_for_scraping(
+        filepath=config.path(config.input.csv),
+        id_col=config.input.id_col,
+        url_col=config.input.url_col
+    )
+
+    return select_shard(people, shard)
+
+def read_companies(config: PipelineConfig, shard: Optional[Shard]=None) -> list[str]:
+    companies = ProfileReader.read_companies_for_scraping(
+        filepath=config.path(config.input.csv),
+        company_col=config.input.company_col
+    )
+
+    return select_shard(companies, shard, key=lambda company: company)
+
+def make_folders(root: Path, *folders: str):
+    for folder in folders:
+        (root / folder).mkdir(parents=True, exist_ok=True)
+
+def download_page_source(
+    crawler: "LinkedinCrawler.Crawler",
+    person: Person,
+    page_folder: PathLike,
+    exp_folder: PathLike,
+    download: bool=True
+) -> Optional[Person]:
+    from selenium.common.exceptions import TimeoutException, WebDriverException
+    try:
+        from LinkedinCrawler import Error404
+    except ModuleNotFoundError:
+        from src.LinkedinCrawler import Error404
+
+    try:
+        return crawler.visit_page(
+            person,
+            download=download,
+            page_folder=page_folder,
+            exp_folder=exp_folder
+        )
+    except (Error404, TimeoutException, WebDriverException):
+        logging.warning(
+            f"Something went wrong, please check {person.id} ({person.profile_url})."
+        )
+
+        return None
+
+def crawl_profiles(config: PipelineConfig, shard: Optional[Shard]=None):
+    """Download the profile sources of everyone in the input CSV not yet visited, parsing them
+    on the fly if crawl.stream_parse is set.
+    """
+    import cutils
+    import wakepy
+    try:
+        from CrawlerManager import CrawlerManager, load_linkedin_accounts
+        from CrawlTrace import Tracer
+        import LinkedinCrawler
+        from ParseStream import ParseStream
+        from SourceWriter import SourceWriter
+    except ModuleNotFoundError:
+        from src.CrawlerManager import CrawlerManager, load_linkedin_accounts
+        from src.CrawlTrace import Tracer
+        import src.LinkedinCrawler as LinkedinCrawler
+        from src.ParseStream import ParseStream
+        from src.SourceWriter import SourceWriter
+
+    crawl, output = config.crawl, config.output
+    root = run_root(config, shard)
+    make_folders(root, output.page_sources, output.experience_sources, output.profiles, output.headshots)
+
+    visited_ids = list_source_ids(root / output.page_sources)
+    if crawl.stream_parse:
+        visited_ids |= profile_ids(root / output.profiles)
+    people = [person for person in read_people(config, shard) if person.id not in visited_ids]
+
+    chunked_people = cutils.random_chunk_seq(people, crawl.chunk_min, crawl.chunk_max)
+    accounts = load_linkedin_accounts(config.path(crawl.credentials))
+    tracer = Tracer(root / output.trace)
+    capture_profile = LinkedinCrawler.LIGHTWEIGHT_CAPTURE if crawl.capture == "lightweight" else None
+    download = cutils.rate_limited(limit=crawl.profiles_per_hour, period=SECONDS_IN_HOUR)(
+        download_page_source
+    )
+
+    stream = ParseStream(
+        output_folder=root / output.profiles,
+        headshot_folder=root / output.headshots if config.parse.download_headshots else None,
+        max_workers=config.parse.workers,
+        max_pending=config.parse.max_pending,
+        output_format=config.parse.output_format,
+        records_per_file=config.parse.records_per_file
+    ) if crawl.stream_parse else None
+
+    writer = SourceWriter(max_queue=crawl.writer_queue, compress=crawl.compress_sources)
+    try:
+        with wakepy.keepawake(keep_screen_awake=True), writer, CrawlerManager(
+            accounts,
+            max_pages=crawl.max_pages,
+            max_memory_mb=crawl.max_memory_mb,
+            capture_profile=capture_profile,
+            tracer=tracer,
+            writer=writer,
+            delay_scale=crawl.delay_scale
+        ) as manager:
+            for chunk in chunked_people:
+                crawler = manager.get_crawler()
+                for person in chunk:
+                    person = download(
+                        crawler=crawler,
+                        person=person,
+                        page_folder=root / output.page_sources,
+                        exp_folder=root / output.experience_sources,
+                        download=crawl.save_raw_sources or not crawl.stream_parse
+                    )
+                    if stream is not None:
+                        stream.submit(person)
+    finally:
+        # also on a crash or Ctrl-C: finish what was queued for parsing and keep the trace tail
+        if stream is not None:
+            stream.close()
+        tracer.close()
+
+def crawl_companies(config: PipelineConfig, shard: Optional[Shard]=None):
+    """Download the Sales Navigator employees of every company in the input CSV, resuming from
+    the checkpoint.
+    """
+    from selenium.common.exceptions import WebDriverException
+    import wakepy
+    try:
+        from CrawlCache import CompanySearchCache
+        from CrawlerManager import CrawlerManager, load_linkedin_accounts
+        from CrawlTrace import Tracer
+        from EmployeeSink import CrawlCheckpoint, CsvEmployeeSink, ParquetEmployeeSink
+        from LinkedinCrawler import Error404
+    except ModuleNotFoundError:
+        from src.CrawlCache import CompanySearchCache
+        from src.CrawlerManager import CrawlerManager, load_linkedin_accounts
+        from src.CrawlTrace import Tracer
+        from src.EmployeeSink import CrawlCheckpoint, CsvEmployeeSink, ParquetEmployeeSink
+        from src.LinkedinCrawler import Error404
+
+    crawl = config.crawl
+    folder = run_root(config, shard) / config.output.sales_navigator
+    folder.mkdir(parents=True, exist_ok=True)
+
+    companies = read_companies(config, shard)
+    accounts = load_linkedin_accounts(config.path(crawl.credentials))
+    tracer = Tracer(folder / config.output.trace)
+
+    if crawl.employee_sink == "parquet":
+        sink = ParquetEmployeeSink(folder / "employees")
+    else:
+        sink = CsvEmployeeSink(folder / "employees.csv")
+
+    with wakepy.keepawake(keep_screen_awake=True), \
+         CrawlerManager(
+             accounts,
+             max_pages=crawl.max_pages,
+             max_memory_mb=crawl.max_memory_mb,
+             tracer=tracer,
+             delay_scale=crawl.delay_scale
+         ) as manager, \
+         sink, \
+         CrawlCheckpoint(folder / "checkpoints.sqlite") as checkpoint, \
+         CompanySearchCache(folder / "company_searches.sqlite") as cache:
+        for company in companies:
+            if checkpoint.is_done(company, "current") and checkpoint.is_done(company, "past"):
+                continue
+
+            crawler = manager.get_crawler()
+            if not crawler.search_form_ready:
+                crawler.initialize_sales_navigator_page()
+
+            try:
+                crawler.crawl_company(company, sink=sink, checkpoint=checkpoint, cache=cache)
+            except (Error404, WebDriverException) as e:
+                logging.warning(f"Crawl of {company} stopped ({type(e).__name__}), will resume.")
+                crawler.search_form_ready = False
+
+    tracer.close()
+
+def parse_saved_profile(
+    person: Person,
+    page_folder: Path,
+    exp_folder: Path,
+    headshot_folder: Optional[Path]
+) -> Optional[bytes]:
+    """Parse {id}.txt sources into a record, encoded here in the worker so that the parent only
+    has to write it out. None if the sources were never downloaded.
+    """
+    id = person.id
+
+    try:
+        page = PageParser(
+            person=person,
+            page_file=page_folder / f"{id}.txt",
+            exp_file=exp_folder / f"{id}.txt"
+        )
+    except FileNotFoundError:
+        return None
+
+    with page:
+        res = page.parse_profile()
+        link = page.get_headshot_link() if headshot_folder is not None else None
+
+    if headshot_folder is not None:
+        if link:
+            valid_image = page.download_image(link=link, filename=headshot_folder / f"{id}.png")
+            if valid_image:
+                res.image_url = link
+
+    return encode(res)
+
+def parse_profiles(config: PipelineConfig, shard: Optional[Shard]=None) -> dict:
+    """Parse every downloaded profile of the input CSV, then record what changed in the delta
+    store.
+    """
+    parse, output = config.parse, config.output
+    root = run_root(config, shard)
+    make_folders(root, output.profiles, output.headshots)
+
+    parse_func = functools.partial(
+        parse_saved_profile,
+        page_folder=root / output.page_sources,
+        exp_folder=root / output.experience_sources,
+        headshot_folder=root / output.headshots if parse.download_headshots else None
+    )
+    people = read_people(config, shard)
+    sink = make_profile_sink(
+        root / output.profiles,
+        output_format=parse.output_format,
+        records_per_file=parse.records_per_file
+    )
+    parsed = 0
+
+    with sink:
+        if parse.bounded_memory:
+            pool = BoundedProcessPool(parse_func, workers=parse.workers, max_rss_mb=parse.max_worker_rss_mb)
+            for res in pool.imap_unordered(people):
+                if res.error is not None:
+                    logging.warning(f"Could not parse {people[res.index].id}: {res.error}")
+                elif res.value is not None:
+                    sink.write_encoded(people[res.index].id, res.value)
+                    parsed += 1
+            summary = {"people": len(people), "parsed": parsed, "memory": pool.summary()}
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=parse.workers) as pool:
+                for person, data in zip(people, pool.map(parse_func, people, chunksize=parse.chunk_size)):
+                    if data is not None:
+                        sink.write_encoded(person.id, data)
+                        parsed += 1
+            summary = {"people": len(people), "parsed": parsed}
+
+    if parse.record_deltas:
+        # keep only what changed since the last crawl of each profile
+        with DeltaStore(root / output.deltas) as store:
+            summary["deltas"] = ingest_profiles(store, root / output.profiles)
+
+    return summary
+
+def extract_field_values(
+    config: PipelineConfig,
+    field: str,
+    shard: Optional[Shard]=None,
+    output: PathLike=None
+) -> dict:
+    """One field of every saved source, streamed out of the raw source archive without parsing
+    whole pages, as JSON lines {"personid": ..., field: ...} in output (stdout if None).
+    """
+    root = run_root(config, shard)
+    output_config = config.output
+    folder = root / (
+        output_config.page_sources if FIELD_SOURCES[field] == "page" else output_config.experience_sources
+    )
+    values = scan_sources(folder, field)
+
+    if output is None:
+        count = write_lines(values, field, sys.stdout.buffer)
+        sys.stdout.flush()
+    else:
+        with open(output, "wb") as f:
+            count = write_lines(values, field, f)
+
+    return {"field": field, "sources": count}
+
+def index_profiles(config: PipelineConfig, shard: Optional[Shard]=None) -> dict:
+    root = run_root(config, shard)
+    with ProfileIndex(root / config.output.index) as index:
+        return index.ingest(root / config.output.profiles)
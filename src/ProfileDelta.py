@@ -0,0 +1,333 @@
+# Imports
+
+# stdlib
+from dataclasses import dataclass
+import hashlib
+import json
+from pathlib import Path
+import sqlite3
+import time
+from typing import Any, Iterator, Optional, Union
+
+# Own
+
+try:
+    from ProfileSink import profile_files, read_profile_file
+except ModuleNotFoundError:
+    from src.ProfileSink import profile_files, read_profile_file
+
+# Type Definitons
+
+PathLike = Union[Path, str]
+
+@dataclass
+class Delta:
+    personid: str
+    section: str
+    op: str
+    fingerprint: str
+    body: Any
+    captured_at: float
+
+# Globals
+
+TOP_CARD_FIELDS = ("name", "headline", "location", "city", "state", "country")
+LIST_SECTIONS = ("educations", "experiences")
+
+# What fingerprints hash: the text scraped off the page, not what the parser derives from it
+# (canonical school, degree level, parsed dates, is_current, city / state / country). A change
+# to the Canonicalizer or the date parsing must not make every entry look removed and re-added.
+TOP_CARD_FINGERPRINT_FIELDS = ("name", "headline", "location")
+FINGERPRINT_FIELDS = {
+    "educations": ("school", "degree", "field_of_study", "raw_years", "raw_degree"),
+    "experiences": ("company", "company_id", "title", "description", "raw_years"),
+}
+# keys of a parse_page record that are not profile content
+RECORD_META_FIELDS = ("personid", "fingerprints")
+
+ADDED = "add"
+REMOVED = "remove"
+
+# Functions
+
+def fingerprint(obj: Any) -> str:
+    """Stable hash of a JSON-able value. Key order does not matter, every value does."""
+    encoded = json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=8).hexdigest()
+
+def top_card(record: dict) -> dict:
+    return {key: record.get(key) for key in TOP_CARD_FIELDS}
+
+def entry_fingerprint(entry: dict, keys: tuple[str, ...]) -> str:
+    return fingerprint({key: entry.get(key) for key in keys})
+
+def section_fingerprints(record: dict) -> dict:
+    """Fingerprints of the top card and of each education and experience entry, in order, over
+    their scraped fields only (see FINGERPRINT_FIELDS). Two captures of an unchanged profile get
+    the same fingerprints, whatever version of the parser annotated them.
+
+    Returns:
+        dict: {"top_card": str, "educations": list[str], "experiences": list[str]}
+    """
+    res = {"top_card": entry_fingerprint(record, TOP_CARD_FINGERPRINT_FIELDS)}
+    for section in LIST_SECTIONS:
+        keys = FINGERPRINT_FIELDS[section]
+        res[section] = [entry_fingerprint(entry, keys) for entry in record.get(section) or []]
+
+    return res
+
+def record_sections(record: dict) -> dict[str, dict[str, Any]]:
+    """Every entry of a record as {section: {fingerprint: body}}."""
+    fingerprints = section_fingerprints(record)
+
+    sections = {"top_card": {fingerprints["top_card"]: top_card(record)}}
+    for section in LIST_SECTIONS:
+        sections[section] = dict(zip(fingerprints[section], record.get(section) or []))
+
+    return sections
+
+def record_layout(record: dict) -> dict:
+    """What is needed, on top of the stored entries, to rebuild the record: the fingerprints in
+    order and the remaining fields (linkedin_url, image_url, ...).
+    """
+    layout = section_fingerprints(record)
+    layout["extra"] = {
+        key: value
+        for key, value in record.items()
+        if key not in TOP_CARD_FIELDS and key not in LIST_SECTIONS and key not in RECORD_META_FIELDS
+    }
+
+    return layout
+
+# Classes
+
+class DeltaStore():
+    """Keeps every profile capture as changes against the previous one. Entry bodies are stored
+    once per (person, section, fingerprint), and a capture only adds rows for entries that were
+    added or removed, plus a layout and a capture row if anything changed, so storage grows with
+    changes rather than with re-crawls. A changed entry shows up as the removal of its old fingerprint and the
+    addition of the new one. Derived fields are not fingerprinted: a stored body is updated in
+    place to the latest annotations (canonical_school, degree_level, ...) of its entry.
+
+    Usage:
+        with DeltaStore(BASE_PATH / "profile_deltas.db") as store:
+            store.record(res, captured_at=time.time())
+            store.snapshot(personid)
+            store.deltas_since(last_run)
+    """
+
+    def __init__(self, path: PathLike):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                personid TEXT NOT NULL,
+                section TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                body TEXT NOT NULL,
+                PRIMARY KEY (personid, section, fingerprint)
+            );
+            CREATE TABLE IF NOT EXISTS deltas (
+                personid TEXT NOT NULL,
+                section TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                op TEXT NOT NULL,
+                captured_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS deltas_captured_at ON deltas (captured_at);
+            CREATE TABLE IF NOT EXISTS layouts (
+                personid TEXT NOT NULL,
+                captured_at REAL NOT NULL,
+                layout TEXT NOT NULL,
+                PRIMARY KEY (personid, captured_at)
+            );
+            CREATE TABLE IF NOT EXISTS captures (
+                personid TEXT NOT NULL,
+                captured_at REAL NOT NULL,
+                changed INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL
+            );
+            """
+        )
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _layout(self, personid: str, at: float=None) -> Optional[dict]:
+        if at is None:
+            at = float("inf")
+
+        row = self.conn.execute(
+            """
+            SELECT layout FROM layouts WHERE personid = ? AND captured_at <= ?
+            ORDER BY captured_at DESC LIMIT 1
+            """,
+            (personid, at)
+        ).fetchone()
+
+        return None if row is None else json.loads(row[0])
+
+    def record(self, record: dict, captured_at: float=None) -> list[Delta]:
+        """Store a parse_page record captured at captured_at (default now). A capture that
+        changes nothing (the same sources parsed again, or an unchanged re-crawl) only refreshes
+        the annotations of the stored entries, it adds no capture row.
+
+        Returns:
+            list[Delta]: entries added or removed since the person's previous capture
+        """
+        if captured_at is None:
+            captured_at = time.time()
+
+        personid = record["personid"]
+        previous = self._layout(personid, at=captured_at)
+        layout = record_layout(record)
+        sections = record_sections(record)
+
+        deltas = []
+        for section, entries in sections.items():
+            if previous is None:
+                old = set()
+            elif section == "top_card":
+                old = {previous["top_card"]}
+            else:
+                old = set(previous[section])
+
+            for fp in entries.keys() - old:
+                deltas.append(Delta(personid, section, ADDED, fp, entries[fp], captured_at))
+            for fp in old - entries.keys():
+                deltas.append(Delta(personid, section, REMOVED, fp, None, captured_at))
+
+        changed = previous != layout
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO entries (personid, section, fingerprint, body) VALUES (?, ?, ?, ?)
+                ON CONFLICT DO UPDATE SET body = excluded.body WHERE body != excluded.body
+                """,
+                [
+                    (personid, section, fp, json.dumps(body, ensure_ascii=False))
+                    for section, entries in sections.items()
+                    for fp, body in entries.items()
+                ]
+            )
+            self.conn.executemany(
+                "INSERT INTO deltas (personid, section, fingerprint, op, captured_at) VALUES (?, ?, ?, ?, ?)",
+                [(personid, d.section, d.fingerprint, d.op, captured_at) for d in deltas]
+            )
+            if changed:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO layouts (personid, captured_at, layout) VALUES (?, ?, ?)",
+                    (personid, captured_at, json.dumps(layout, ensure_ascii=False))
+                )
+                self.conn.execute(
+                    "INSERT INTO captures (personid, captured_at, changed) VALUES (?, ?, ?)",
+                    (personid, captured_at, changed)
+                )
+
+        return deltas
+
+    def is_ingested(self, path: PathLike) -> bool:
+        """Whether profile file path was ingested as it is now (same mtime and size)."""
+        path = Path(path)
+        stat = path.stat()
+        row = self.conn.execute(
+            "SELECT mtime, size FROM files WHERE path = ?", (str(path.resolve()),)
+        ).fetchone()
+
+        return row is not None and tuple(row) == (stat.st_mtime, stat.st_size)
+
+    def mark_ingested(self, path: PathLike):
+        path = Path(path)
+        stat = path.stat()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files (path, mtime, size) VALUES (?, ?, ?)",
+                (str(path.resolve()), stat.st_mtime, stat.st_size)
+            )
+
+    def _bodies(self, personid: str) -> dict[tuple[str, str], Any]:
+        rows = self.conn.execute(
+            "SELECT section, fingerprint, body FROM entries WHERE personid = ?", (personid,)
+        )
+
+        return {(section, fp): json.loads(body) for section, fp, body in rows}
+
+    def snapshot(self, personid: str, at: float=None) -> Optional[dict]:
+        """Rebuild the parse_page record as it was captured at time at (default latest), with
+        its fingerprints. None if the person had not been captured by then.
+        """
+        layout = self._layout(personid, at=at)
+        if layout is None:
+            return None
+
+        bodies = self._bodies(personid)
+        record = {"personid": personid}
+        record.update(layout["extra"])
+        record.update(bodies[("top_card", layout["top_card"])])
+        for section in LIST_SECTIONS:
+            record[section] = [bodies[(section, fp)] for fp in layout[section]]
+        record["fingerprints"] = {key: layout[key] for key in ("top_card",) + LIST_SECTIONS}
+
+        return record
+
+    def deltas_since(self, since: float=0.0) -> Iterator[Delta]:
+        """Every change captured after since, oldest first. Removals carry the body of the entry
+        that was removed.
+        """
+        rows = self.conn.execute(
+            """
+            SELECT d.personid, d.section, d.op, d.fingerprint, e.body, d.captured_at
+            FROM deltas d
+            JOIN entries e USING (personid, section, fingerprint)
+            WHERE d.captured_at > ?
+            ORDER BY d.captured_at, d.rowid
+            """,
+            (since,)
+        )
+        for personid, section, op, fp, body, captured_at in rows:
+            yield Delta(personid, section, op, fp, json.loads(body), captured_at)
+
+    def changed_people(self, since: float=0.0) -> list[str]:
+        rows = self.conn.execute(
+            "SELECT DISTINCT personid FROM captures WHERE changed AND captured_at > ? ORDER BY personid",
+            (since,)
+        )
+
+        return [row[0] for row in rows]
+
+    def close(self):
+        self.conn.close()
+
+def ingest_profiles(store: DeltaStore, folder: PathLike) -> dict:
+    """Record every profile in folder (e.g. CL_Profiles), using the mtime of its file as the
+    capture time. Files are read oldest first, see ProfileSink; files already ingested as they
+    are now are skipped, so a run only reads what was written since the last one.
+
+    Returns:
+        dict: counts of files read and skipped, profiles seen, profiles changed and entry deltas
+    """
+    summary = {"files": 0, "skipped": 0, "profiles": 0, "changed": 0, "deltas": 0}
+    for path in profile_files(folder):
+        if store.is_ingested(path):
+            summary["skipped"] += 1
+            continue
+
+        captured_at = path.stat().st_mtime
+        for record in read_profile_file(path):
+            deltas = store.record(record, captured_at=captured_at)
+            summary["profiles"] += 1
+            summary["changed"] += bool(deltas)
+            summary["deltas"] += len(deltas)
+        store.mark_ingested(path)
+        summary["files"] += 1
+
+    return summary
@@ -0,0 +1,395 @@
+# Imports
+
+# stdlib
+import argparse
+import json
+from pathlib import Path
+import sqlite3
+import time
+from typing import Optional, Union
+
+# Own
+
+try:
+    from Canonicalizer import default_canonicalizer
+    from ProfileReader import normalize_company_name, normalize_name
+    from ProfileRecord import is_present, to_int
+    from ProfileSink import profile_files, read_profile_file
+except ModuleNotFoundError:
+    from src.Canonicalizer import default_canonicalizer
+    from src.ProfileReader import normalize_company_name, normalize_name
+    from src.ProfileRecord import is_present, to_int
+    from src.ProfileSink import profile_files, read_profile_file
+
+# Type Definitons
+
+PathLike = Union[Path, str]
+
+# Globals
+
+# an experience without an end year that is not current only covers its start year
+OPEN_END_YEAR = 9999
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT NOT NULL,
+    personid TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (path, personid)
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    personid TEXT PRIMARY KEY,
+    name TEXT,
+    headline TEXT,
+    location TEXT,
+    city TEXT,
+    state TEXT,
+    country TEXT,
+    linkedin_url TEXT,
+    image_url TEXT
+);
+CREATE TABLE IF NOT EXISTS educations (
+    personid TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    school TEXT,
+    school_norm TEXT,
+    canonical_school TEXT,
+    degree TEXT,
+    degree_level TEXT,
+    field_of_study TEXT,
+    start_year INTEGER,
+    end_year INTEGER
+);
+CREATE TABLE IF NOT EXISTS experiences (
+    personid TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    company TEXT,
+    company_norm TEXT,
+    company_id INTEGER,
+    title TEXT,
+    start_year INTEGER,
+    end_year INTEGER,
+    is_current INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_personid ON files (personid);
+CREATE INDEX IF NOT EXISTS educations_personid ON educations (personid);
+CREATE INDEX IF NOT EXISTS educations_school ON educations (school_norm, end_year);
+CREATE INDEX IF NOT EXISTS educations_canonical_school ON educations (canonical_school, end_year);
+CREATE INDEX IF NOT EXISTS educations_years ON educations (start_year, end_year);
+CREATE INDEX IF NOT EXISTS experiences_personid ON experiences (personid);
+CREATE INDEX IF NOT EXISTS experiences_company_id ON experiences (company_id, start_year);
+CREATE INDEX IF NOT EXISTS experiences_company ON experiences (company_norm, start_year);
+CREATE INDEX IF NOT EXISTS experiences_years ON experiences (start_year, end_year);
+"""
+
+# bumped when SCHEMA changes, an index built with another version is rebuilt from scratch
+SCHEMA_VERSION = 2
+TABLES = ("files", "profiles", "educations", "experiences")
+
+PROFILE_COLUMNS = (
+    "personid", "name", "headline", "location", "city", "state", "country", "linkedin_url",
+    "image_url"
+)
+
+# Functions
+
+def clean_company(company: Optional[str]) -> Optional[str]:
+    """Experience companies carry the employment type, e.g. "Acme Inc. · Full-time"."""
+    if company is None:
+        return None
+
+    return company.split(" · ")[0].strip()
+
+def normalize_school(school: Optional[str]) -> Optional[str]:
+    return normalize_name(school) if school else None
+
+def index_company(company: Optional[str]) -> Optional[str]:
+    company = clean_company(company)
+
+    return normalize_company_name(company) if company else None
+
+def education_rows(record: dict) -> list[tuple]:
+    canonicalizer = default_canonicalizer()
+    rows = []
+    for i, educ in enumerate(record.get("educations") or []):
+        # profiles parsed before canonicalization existed lack the fields
+        if "canonical_school" not in educ:
+            educ = canonicalizer.annotate_education(dict(educ))
+
+        rows.append((
+            record["personid"],
+            i,
+            educ.get("school"),
+            normalize_school(educ.get("school")),
+            educ.get("canonical_school"),
+            educ.get("degree"),
+            educ.get("degree_level"),
+            educ.get("field_of_study"),
+            to_int(educ.get("start_year")),
+            to_int(educ.get("end_year"))
+        ))
+
+    return rows
+
+def experience_rows(record: dict) -> list[tuple]:
+    rows = []
+    for i, exp in enumerate(record.get("experiences") or []):
+        end_year = exp.get("end_year")
+        rows.append((
+            record["personid"],
+            i,
+            clean_company(exp.get("company")),
+            index_company(exp.get("company")),
+            to_int(exp.get("company_id")),
+            exp.get("title"),
+            to_int(exp.get("start_year")),
+            to_int(end_year),
+            # records parsed before ProfileRecord have "Present" as the end year
+            bool(exp.get("is_current")) or is_present(end_year)
+        ))
+
+    return rows
+
+# Classes
+
+class ProfileIndex():
+    """Parsed profiles (CL_Profiles) in sqlite, one row per profile, education and
+    experience, indexed on company_id, normalized company name, normalized school and years so
+    that lookups do not need a scan of the corpus. ingest() is incremental: only files that are
+    new or changed since the last run (by mtime and size) are read.
+
+    Usage:
+        with ProfileIndex(BASE_PATH / "profile_index.db") as index:
+            index.ingest(BASE_PATH / "CL_Profiles")
+            index.people_at_company(company_id=1234, start_year=2015, end_year=2019)
+            index.alumni("Univ. of Georgia")
+    """
+
+    def __init__(self, path: PathLike):
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            for table in TABLES:
+                self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _delete_person(self, personid: str):
+        for table in ("profiles", "educations", "experiences"):
+            self.conn.execute(f"DELETE FROM {table} WHERE personid = ?", (personid,))
+
+    def add_record(self, record: dict):
+        """Insert or replace one parse_page record. Does not commit."""
+        personid = record["personid"]
+        self._delete_person(personid)
+
+        self.conn.execute(
+            f"INSERT INTO profiles VALUES ({', '.join('?' * len(PROFILE_COLUMNS))})",
+            [personid] + [record.get(col) for col in PROFILE_COLUMNS[1:]]
+        )
+        self.conn.executemany(
+            "INSERT INTO educations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", education_rows(record)
+        )
+        self.conn.executemany(
+            "INSERT INTO experiences VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", experience_rows(record)
+        )
+
+    def _drop_file(self, path: str):
+        """Forget a file, and everyone who is in no other indexed file."""
+        personids = [
+            row["personid"]
+            for row in self.conn.execute("SELECT personid FROM files WHERE path = ?", (path,))
+        ]
+        self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+        for personid in personids:
+            if self.conn.execute("SELECT 1 FROM files WHERE personid = ?", (personid,)).fetchone() is None:
+                self._delete_person(personid)
+
+    def ingest(self, folder: PathLike, prune: bool=True) -> dict:
+        """Index every new or changed profile file in folder, {id}.json or NDJSON parts (see
+        ProfileSink). Files are read oldest first, so the newest record of a person wins.
+
+        Args:
+            folder (PathLike): e.g. CL_Profiles
+            prune (bool, optional): drop people whose file is gone. Defaults to True.
+
+        Returns:
+            dict: counts of files added, updated, unchanged and removed, and of records read
+        """
+        known = {
+            row["path"]: (row["mtime"], row["size"])
+            for row in self.conn.execute("SELECT DISTINCT path, mtime, size FROM files")
+        }
+        summary = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0, "records": 0}
+        seen = set()
+
+        with self.conn:
+            for file_path in profile_files(folder):
+                path = str(file_path.resolve())
+                stat = file_path.stat()
+                seen.add(path)
+                if known.get(path) == (stat.st_mtime, stat.st_size):
+                    summary["unchanged"] += 1
+                    continue
+
+                records = read_profile_file(file_path)
+                if path in known:
+                    self._drop_file(path)
+                for record in records:
+                    self.add_record(record)
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO files (path, personid, mtime, size) VALUES (?, ?, ?, ?)",
+                    [(path, record["personid"], stat.st_mtime, stat.st_size) for record in records]
+                )
+                summary["updated" if path in known else "added"] += 1
+                summary["records"] += len(records)
+
+            if prune:
+                for path in known.keys() - seen:
+                    self._drop_file(path)
+                    summary["removed"] += 1
+
+        return summary
+
+    def query(self, sql: str, params: tuple=()) -> list[dict]:
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def people_at_company(
+        self,
+        company_id: int=None,
+        company: str=None,
+        start_year: int=None,
+        end_year: int=None
+    ) -> list[dict]:
+        """Experiences at a company (by LinkedIn company_id, or by name, normalized the same way
+        as the input companies) that overlap [start_year, end_year]. Current jobs run to today.
+        """
+        if company_id is None and company is None:
+            raise ValueError("Pass company_id or company.")
+
+        if company_id is not None:
+            conditions, params = ["company_id = ?"], [int(company_id)]
+        else:
+            conditions, params = ["company_norm = ?"], [index_company(company)]
+
+        if end_year is not None:
+            conditions.append("start_year <= ?")
+            params.append(end_year)
+        if start_year is not None:
+            conditions.append(
+                f"""
+                COALESCE(end_year, CASE WHEN is_current THEN {OPEN_END_YEAR} ELSE start_year END) >= ?
+                """
+            )
+            params.append(start_year)
+
+        return self.query(
+            f"""
+            SELECT p.personid, p.name, p.linkedin_url, e.company, e.company_id, e.title,
+                e.start_year, e.end_year, e.is_current
+            FROM experiences e JOIN profiles p USING (personid)
+            WHERE {" AND ".join(conditions)}
+            ORDER BY p.personid, e.position
+            """,
+            tuple(params)
+        )
+
+    def alumni(
+        self,
+        school: str,
+        start_year: int=None,
+        end_year: int=None,
+        degree_level: str=None
+    ) -> list[dict]:
+        """Educations at school that ended within [start_year, end_year]. Schools are compared
+        by canonical name, so "Univ. of Georgia" also finds "UGA".
+        """
+        canonical_school = default_canonicalizer().canonical_school(school)
+        conditions, params = ["canonical_school = ?"], [canonical_school]
+        if degree_level is not None:
+            conditions.append("degree_level = ?")
+            params.append(degree_level)
+        if start_year is not None:
+            conditions.append("end_year >= ?")
+            params.append(start_year)
+        if end_year is not None:
+            conditions.append("end_year <= ?")
+            params.append(end_year)
+
+        return self.query(
+            f"""
+            SELECT p.personid, p.name, p.linkedin_url, e.school, e.canonical_school, e.degree,
+                e.degree_level, e.field_of_study, e.start_year, e.end_year
+            FROM educations e JOIN profiles p USING (personid)
+            WHERE {" AND ".join(conditions)}
+            ORDER BY p.personid, e.position
+            """,
+            tuple(params)
+        )
+
+    def profile(self, personid: str) -> Optional[dict]:
+        rows = self.query("SELECT * FROM profiles WHERE personid = ?", (personid,))
+        if not rows:
+            return None
+
+        res = rows[0]
+        res["educations"] = self.query(
+            "SELECT * FROM educations WHERE personid = ? ORDER BY position", (personid,)
+        )
+        res["experiences"] = self.query(
+            "SELECT * FROM experiences WHERE personid = ? ORDER BY position", (personid,)
+        )
+
+        return res
+
+    def close(self):
+        self.conn.close()
+
+# CLI
+
+def main():
+    parser = argparse.ArgumentParser(description="Index parsed profiles and look people up.")
+    parser.add_argument("database", help="sqlite index, created if missing")
+    parser.add_argument("--ingest", help="folder of parsed profiles to index")
+    parser.add_argument("--company-id", type=int)
+    parser.add_argument("--company")
+    parser.add_argument("--school")
+    parser.add_argument("--start-year", type=int)
+    parser.add_argument("--end-year", type=int)
+    args = parser.parse_args()
+
+    with ProfileIndex(args.database) as index:
+        if args.ingest:
+            start = time.perf_counter()
+            summary = index.ingest(args.ingest)
+            print(f"{summary} in {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        if args.company_id is not None or args.company:
+            rows = index.people_at_company(
+                company_id=args.company_id,
+                company=args.company,
+                start_year=args.start_year,
+                end_year=args.end_year
+            )
+        elif args.school:
+            rows = index.alumni(args.school, start_year=args.start_year, end_year=args.end_year)
+        else:
+            return
+
+        seconds = time.perf_counter() - start
+        for row in rows:
+            print(json.dumps(row))
+        print(f"{len(rows)} rows in {seconds * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
 import csv
 from dataclasses import dataclass
+import functools
 from pathlib import Path
-import re
 from typing import Optional, Union
 
 PathLike = Union[Path, str]
 
+NORMALIZE_CACHE_SIZE = 2 ** 16
+PUNCTUATION_TABLE = str.maketrans("", "", "`~!@#$%^*()_-+={[}]\\|:;\"'<>,?/") # keep & and .
+COMPANY_SUFFIXES = frozenset({"pllc", "llc", "inc", "co", "company", "corp"})
+
 @dataclass
 class Person:
     id: str
@@ -28,31 +32,93 @@ def read_csv_for_scraping(filepath: PathLike, id_col: str, url_col: str) -> list
 
     return person_list
 
+def read_companies_for_scraping(filepath: PathLike, company_col: str) -> list[str]:
+    with open(filepath, "r", encoding="utf8") as csvfile:
+        rows = list(csv.DictReader(csvfile))
+
+    companies = []
+    seen = set()
+    for row in rows:
+        company = row[company_col]
+        if company and company not in seen:
+            seen.add(company)
+            companies.append(company)
+
+    return companies
+
+@functools.lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def normalize_name(raw_name: str) -> str:
-    bad_punctation = "`~!@#$%^*()_-+={[}]\\|:;\"'<>,?/" # keep & and . 
-    raw_name = re.sub(r"(\u180B|\u200B|\u200C|\u200D|\u2060|\uFEFF)+", "", raw_name) # remove unicode whitespace
+    # anything non-ascii was replaced by "?" and "?" is punctuation, so both simply go
     raw_name = (
-        raw_name.encode("ascii", "replace")
-                .decode("utf-8")
+        raw_name.encode("ascii", "ignore")
+                .decode("ascii")
                 .lower() # lowercase
-                .translate(str.maketrans("", "", bad_punctation)) # remove punctuation
-                .strip() # strip extra whitespace
+                .translate(PUNCTUATION_TABLE) # remove punctuation
     )
-    cleaned_name = " ".join(raw_name.split()) # normalize spaces to 1
+    cleaned_name = " ".join(raw_name.split()) # normalize spaces to 1, strips as well
 
     return cleaned_name
 
+@functools.lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def normalize_company_name(raw_name: str) -> str:
-    raw_name = normalize_name(raw_name)
-
-    replace_mapper = {
-        "&": "and"
-    }
-    for orig_word, new_word in replace_mapper.items():
-        raw_name = raw_name.replace(orig_word, new_word)
-
-    to_strip = {"pllc", "llc", "inc", "co", "company", "corp"}
-    normalized_name = " ".join(word for word in raw_name.split() if word not in to_strip)
+    raw_name = normalize_name(raw_name).replace("&", "and")
+    normalized_name = " ".join(word for word in raw_name.split() if word not in COMPANY_SUFFIXES)
     
     return normalized_name
-    
\ No newline at end of file
+
+def normalization_cache_stats() -> dict:
+    """Hit rates of the normalize_name and normalize_company_name memos."""
+    stats = {}
+    for func in (normalize_name, normalize_company_name):
+        info = func.cache_info()
+        lookups = info.hits + info.misses
+        stats[func.__name__] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "hit_rate": info.hits / lookups if lookups else 0.0
+        }
+
+    return stats
+
+def _normalizer(company: bool):
+    return normalize_company_name if company else normalize_name
+
+def normalize_series(names, company: bool=False):
+    """normalize_name (or normalize_company_name) over a whole pandas Series. Every distinct
+    name is normalized once; missing values stay missing.
+    """
+    import numpy as np
+    import pandas as pd
+
+    normalize = _normalizer(company)
+    codes, uniques = pd.factorize(names)
+    normalized = np.array([normalize(name) for name in uniques] + [None], dtype=object)
+
+    # code -1 (missing) takes the trailing None
+    return pd.Series(normalized[codes], index=names.index, name=names.name, dtype=object)
+
+def normalize_arrow(names, company: bool=False):
+    """normalize_name (or normalize_company_name) over a pyarrow string array or chunked array.
+    Normalizes the dictionary of distinct names once and takes from it, nulls stay null.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    normalize = _normalizer(company)
+    encoded = pc.dictionary_encode(names)
+    if isinstance(encoded, pa.ChunkedArray):
+        encoded = encoded.unify_dictionaries()
+        chunks = [
+            pc.take(
+                pa.array([normalize(name) for name in chunk.dictionary.to_pylist()], pa.string()),
+                chunk.indices
+            )
+            for chunk in encoded.chunks
+        ]
+
+        return pa.chunked_array(chunks, type=pa.string())
+
+    dictionary = pa.array([normalize(name) for name in encoded.dictionary.to_pylist()], pa.string())
+
+    return pc.take(dictionary, encoded.indices)
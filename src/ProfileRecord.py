@@ -0,0 +1,280 @@
+# Imports
+
+# stdlib
+from dataclasses import dataclass, fields
+import time
+from typing import Any, Iterable, Optional
+
+# Type Definitons
+
+@dataclass(slots=True)
+class Education:
+    school: Optional[str] = None
+    canonical_school: Optional[str] = None
+    degree: Optional[str] = None
+    degree_level: Optional[str] = None
+    field_of_study: Optional[str] = None
+    start_month: Optional[str] = None
+    start_year: Optional[int] = None
+    end_month: Optional[str] = None
+    end_year: Optional[int] = None
+    raw_years: Optional[str] = None
+    raw_degree: Optional[str] = None
+
+@dataclass(slots=True)
+class Experience:
+    company: Optional[str] = None
+    company_id: Optional[int] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    start_month: Optional[str] = None
+    start_year: Optional[int] = None
+    end_month: Optional[str] = None
+    end_year: Optional[int] = None # None while current
+    is_current: bool = False
+    duration: Optional[str] = None
+    raw_years: Optional[str] = None
+
+@dataclass(slots=True)
+class Profile:
+    """One parsed profile. Field order is the order records are written in (see ProfileSink).
+    educations / experiences are None if the section could not be found at all.
+    """
+    personid: str
+    linkedin_url: Optional[str] = None
+    name: Optional[str] = None
+    headline: Optional[str] = None
+    location: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    country: Optional[str] = None
+    image_url: Optional[str] = None
+    educations: Optional[list[Education]] = None
+    experiences: Optional[list[Experience]] = None
+    fingerprints: Optional[dict] = None
+
+    def to_dict(self) -> dict:
+        res = {name: getattr(self, name) for name in PROFILE_FIELDS}
+        for section in SECTIONS:
+            if res[section] is not None:
+                res[section] = [entry_dict(entry) for entry in res[section]]
+
+        return res
+
+    @classmethod
+    def from_dict(cls, record: dict) -> "Profile":
+        """From a record read back from CL_Profiles. Records written before this model have
+        years as str and a current end year of "Present"; both are converted. Unknown keys are
+        dropped.
+        """
+        res = cls(**{name: record.get(name) for name in PROFILE_FIELDS})
+        if res.educations is not None:
+            res.educations = [education_from_dict(educ) for educ in res.educations]
+        if res.experiences is not None:
+            res.experiences = [experience_from_dict(exp) for exp in res.experiences]
+
+        return res
+
+# Globals
+
+PROFILE_FIELDS = tuple(f.name for f in fields(Profile))
+EDUCATION_FIELDS = tuple(f.name for f in fields(Education))
+EXPERIENCE_FIELDS = tuple(f.name for f in fields(Experience))
+SECTIONS = ("educations", "experiences")
+
+# flat tables: profiles without the sections, and one row per entry keyed by (personid, position)
+PROFILE_COLUMNS = tuple(name for name in PROFILE_FIELDS if name not in SECTIONS + ("fingerprints",))
+ENTRY_KEY_COLUMNS = ("personid", "position")
+
+PANDAS_DTYPES = {
+    "start_year": "Int64",
+    "end_year": "Int64",
+    "company_id": "Int64",
+    "is_current": "boolean",
+    "position": "int64",
+}
+
+# Functions
+
+def to_int(value: Any) -> Optional[int]:
+    """int years and company ids from what the page or an old record has: 2016, "2016",
+    "Present" or None.
+    """
+    if value is None or isinstance(value, int):
+        return value
+
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def is_present(value: Any) -> bool:
+    return isinstance(value, str) and value.strip().lower() == "present"
+
+def education_from_dict(educ: dict) -> Education:
+    res = Education(**{name: educ.get(name) for name in EDUCATION_FIELDS})
+    res.start_year = to_int(res.start_year)
+    res.end_year = to_int(res.end_year)
+
+    return res
+
+def experience_from_dict(exp: dict) -> Experience:
+    res = Experience(**{name: exp.get(name) for name in EXPERIENCE_FIELDS})
+    res.is_current = bool(res.is_current) or is_present(res.end_year)
+    res.company_id = to_int(res.company_id)
+    res.start_year = to_int(res.start_year)
+    res.end_year = to_int(res.end_year)
+
+    return res
+
+def entry_dict(entry: Any) -> dict:
+    names = EDUCATION_FIELDS if isinstance(entry, Education) else EXPERIENCE_FIELDS
+
+    return {name: getattr(entry, name) for name in names}
+
+def is_empty(entry: Any) -> bool:
+    """Nothing was scraped for the entry."""
+    return all(
+        getattr(entry, name) is None
+        for name in (EDUCATION_FIELDS if isinstance(entry, Education) else EXPERIENCE_FIELDS)
+        if name != "is_current"
+    )
+
+def profiles_to_columns(profiles: Iterable[Profile]) -> dict[str, dict[str, list]]:
+    """Column lists of the three flat tables, "profiles", "educations" and "experiences", read
+    straight off the records without building a dict per row.
+    """
+    profiles = list(profiles)
+    tables = {
+        "profiles": {name: [getattr(p, name) for p in profiles] for name in PROFILE_COLUMNS}
+    }
+
+    for section, names in (("educations", EDUCATION_FIELDS), ("experiences", EXPERIENCE_FIELDS)):
+        owners, positions, entries = [], [], []
+        for profile in profiles:
+            section_entries = getattr(profile, section) or ()
+            owners.extend([profile.personid] * len(section_entries))
+            positions.extend(range(len(section_entries)))
+            entries.extend(section_entries)
+
+        columns = {"personid": owners, "position": positions}
+        for name in names:
+            columns[name] = [getattr(entry, name) for entry in entries]
+        tables[section] = columns
+
+    return tables
+
+def profiles_to_frames(profiles: Iterable[Profile]) -> dict:
+    """profiles_to_columns as pandas DataFrames, with nullable Int64 years and ids.
+
+    Returns:
+        dict[str, pandas.DataFrame]: profiles, educations and experiences
+    """
+    import pandas as pd
+
+    frames = {}
+    for table, columns in profiles_to_columns(profiles).items():
+        frames[table] = pd.DataFrame({
+            name: pd.array(values, dtype=PANDAS_DTYPES[name]) if name in PANDAS_DTYPES else values
+            for name, values in columns.items()
+        })
+
+    return frames
+
+def arrow_schemas() -> dict:
+    import pyarrow as pa
+
+    types = {
+        "position": pa.int32(),
+        "start_year": pa.int32(),
+        "end_year": pa.int32(),
+        "company_id": pa.int64(),
+        "is_current": pa.bool_(),
+    }
+    tables = {
+        "profiles": PROFILE_COLUMNS,
+        "educations": ENTRY_KEY_COLUMNS + EDUCATION_FIELDS,
+        "experiences": ENTRY_KEY_COLUMNS + EXPERIENCE_FIELDS,
+    }
+
+    return {
+        table: pa.schema([(name, types.get(name, pa.string())) for name in names])
+        for table, names in tables.items()
+    }
+
+def profiles_to_arrow(profiles: Iterable[Profile]) -> dict:
+    """profiles_to_columns as Arrow record batches with a fixed schema. Needs pyarrow.
+
+    Returns:
+        dict[str, pyarrow.RecordBatch]: profiles, educations and experiences
+    """
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("profiles_to_arrow needs pyarrow, pip install pyarrow.") from e
+
+    schemas = arrow_schemas()
+
+    return {
+        table: pa.RecordBatch.from_arrays(
+            [pa.array(columns[field.name], type=field.type) for field in schemas[table]],
+            schema=schemas[table]
+        )
+        for table, columns in profiles_to_columns(profiles).items()
+    }
+
+# Benchmark
+
+def benchmark(sample: Profile, num_profiles: int=50_000) -> dict:
+    """Flat tables from num_profiles copies of sample: through a dict per row (what building a
+    DataFrame from the old records took) against profiles_to_frames.
+    """
+    import pandas as pd
+    import tracemalloc
+
+    profiles = []
+    for i in range(num_profiles):
+        profiles.append(Profile.from_dict(dict(sample.to_dict(), personid=f"{sample.personid}-{i}")))
+
+    tracemalloc.start()
+    records = [profile.to_dict() for profile in profiles]
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+
+    tracemalloc.start()
+    copies = [Profile.from_dict(profiles[0].to_dict()) for _ in range(1000)]
+    record_bytes = tracemalloc.get_traced_memory()[0] * num_profiles / 1000
+    tracemalloc.stop()
+    del copies
+
+    start = time.perf_counter()
+    rows = {"educations": [], "experiences": []}
+    for profile in profiles:
+        record = profile.to_dict()
+        for section in SECTIONS:
+            for position, entry in enumerate(record[section] or []):
+                rows[section].append(dict(entry, personid=record["personid"], position=position))
+    dict_frames = {section: pd.DataFrame(section_rows) for section, section_rows in rows.items()}
+    dict_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    frames = profiles_to_frames(profiles)
+    column_seconds = time.perf_counter() - start
+
+    same_rows = True
+    for section in SECTIONS:
+        frame = frames[section]
+        # same columns in the same order, with the dtypes profiles_to_frames gives them
+        expected = dict_frames[section].reindex(columns=frame.columns).astype(frame.dtypes.to_dict())
+        same_rows = same_rows and expected.equals(frame)
+
+    return {
+        "profiles": num_profiles,
+        "dict_mb": round(dict_bytes / 2 ** 20, 1),
+        "record_mb": round(record_bytes / 2 ** 20, 1),
+        "dict_rows_seconds": round(dict_seconds, 3),
+        "columns_seconds": round(column_seconds, 3),
+        "rows": {table: len(frame) for table, frame in frames.items()},
+        "same_rows": same_rows,
+    }
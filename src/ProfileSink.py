@@ -0,0 +1,293 @@
+# Imports
+
+# stdlib
+from abc import ABC, abstractmethod
+import gzip
+import json
+import logging
+import os
+from pathlib import Path
+import tempfile
+import threading
+import time
+from typing import Any, Iterator, Union
+import zlib
+
+# 3rd-party
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Own
+
+try:
+    from ProfileRecord import EDUCATION_FIELDS, EXPERIENCE_FIELDS, Profile, PROFILE_FIELDS
+except ModuleNotFoundError:
+    from src.ProfileRecord import EDUCATION_FIELDS, EXPERIENCE_FIELDS, Profile, PROFILE_FIELDS
+
+# Type Definitons
+
+PathLike = Union[Path, str]
+
+# Globals
+
+# Key order of parsed profiles, that of the ProfileRecord dataclasses. encode() writes records
+# in it, so files are stable without sorting keys on every write. Keys not listed go last.
+PROFILE_KEYS = PROFILE_FIELDS
+EDUCATION_KEYS = EDUCATION_FIELDS
+EXPERIENCE_KEYS = EXPERIENCE_FIELDS
+
+OUTPUT_FORMATS = ("json", "jsonl", "jsonl.gz")
+PROFILE_SUFFIXES = (".json", ".jsonl", ".jsonl.gz")
+PART_PREFIX = "profiles"
+
+# Functions
+
+def _ordered(record: dict, keys: tuple) -> dict:
+    res = {key: record[key] for key in keys if key in record}
+    if len(res) < len(record):
+        res.update((key, value) for key, value in record.items() if key not in res)
+
+    return res
+
+def order_record(record: dict) -> dict:
+    """record with its keys, and those of its educations and experiences, in schema order."""
+    res = _ordered(record, PROFILE_KEYS)
+    for section, keys in (("educations", EDUCATION_KEYS), ("experiences", EXPERIENCE_KEYS)):
+        if res.get(section):
+            res[section] = [_ordered(entry, keys) for entry in res[section]]
+
+    return res
+
+def encode(record: Union[Profile, dict]) -> bytes:
+    """Compact UTF-8 JSON in schema order, with orjson if it is installed. orjson writes a
+    Profile as is, fields in order.
+    """
+    if orjson is not None and isinstance(record, Profile):
+        return orjson.dumps(record)
+
+    record = record.to_dict() if isinstance(record, Profile) else order_record(record)
+    if orjson is not None:
+        return orjson.dumps(record)
+
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def decode(data: Union[bytes, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+
+    return json.loads(data)
+
+def is_profile_file(name: str) -> bool:
+    return name.endswith(PROFILE_SUFFIXES) and not name.startswith(".")
+
+def profile_files(folder: PathLike) -> list[Path]:
+    """Every profile file in folder, oldest first, so that when a person is in several files the
+    last record read is the newest one.
+    """
+    entries = [entry for entry in os.scandir(folder) if is_profile_file(entry.name)]
+    entries.sort(key=lambda entry: (entry.stat().st_mtime, entry.name))
+
+    return [Path(entry.path) for entry in entries]
+
+def read_profile_file(path: PathLike) -> list[dict]:
+    """All records of one {id}.json or NDJSON part. A part cut short by a crash yields the
+    records before the cut.
+    """
+    path = Path(path)
+    if path.name.endswith(".json"):
+        return [decode(path.read_bytes())]
+
+    if path.name.endswith(".gz"):
+        try:
+            with gzip.open(path, "rb") as f:
+                lines = f.read().splitlines()
+        except (EOFError, zlib.error, gzip.BadGzipFile):
+            # keep what was flushed before the cut
+            lines = []
+            with gzip.open(path, "rb") as f:
+                try:
+                    for line in f:
+                        lines.append(line)
+                except (EOFError, zlib.error, gzip.BadGzipFile):
+                    logging.warning(f"{path} is cut short, reading the first {len(lines)} lines.")
+    else:
+        lines = path.read_bytes().splitlines()
+
+    records = []
+    for line in lines:
+        if not line:
+            continue
+        try:
+            records.append(decode(line))
+        except ValueError:
+            logging.warning(f"Skipping a truncated line in {path}.")
+
+    return records
+
+def iter_profiles(folder: PathLike) -> Iterator[tuple[Path, dict]]:
+    """(file, record) for every record in folder, oldest file first."""
+    for path in profile_files(folder):
+        for record in read_profile_file(path):
+            yield path, record
+
+def load_profiles(folder: PathLike) -> list[dict]:
+    """Bulk load every profile in folder, one record per person (the newest)."""
+    latest = {}
+    for _, record in iter_profiles(folder):
+        latest[record["personid"]] = record
+
+    return list(latest.values())
+
+def profile_ids(folder: PathLike) -> set[str]:
+    """Ids of the people in folder. {id}.json files are not opened."""
+    ids = set()
+    for path in profile_files(folder):
+        if path.name.endswith(".json"):
+            ids.add(path.stem)
+        else:
+            ids.update(record["personid"] for record in read_profile_file(path))
+
+    return ids
+
+def make_profile_sink(folder: PathLike, output_format: str="json", records_per_file: int=10_000) -> "ProfileSink":
+    """The ProfileSink for a parse.output_format."""
+    if output_format == "json":
+        return JsonProfileSink(folder)
+    if output_format in ("jsonl", "jsonl.gz"):
+        return NdjsonProfileSink(
+            folder,
+            records_per_file=records_per_file,
+            compress=output_format == "jsonl.gz"
+        )
+
+    raise ValueError(f"Unknown output format {output_format!r}, expected one of {OUTPUT_FORMATS}.")
+
+# Classes
+
+class ProfileSink(ABC):
+    """Destination for parsed profile records. write() takes a record, write_encoded() one
+    already passed through encode(), e.g. by a parse worker.
+    """
+
+    def write(self, record: Union[Profile, dict]):
+        personid = record.personid if isinstance(record, Profile) else record["personid"]
+        self.write_encoded(personid, encode(record))
+
+    @abstractmethod
+    def write_encoded(self, personid: str, data: bytes):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+class JsonProfileSink(ProfileSink):
+    """One compact {id}.json per person, replaced atomically. Safe to use from several
+    processes.
+    """
+
+    def __init__(self, folder: PathLike):
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+
+    def write_encoded(self, personid: str, data: bytes):
+        path = self.folder / f"{personid}.json"
+        tmp_path = self.folder / f".{personid}.json.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+class NdjsonProfileSink(ProfileSink):
+    """Many records per file, one per line, in parts of records_per_file records named
+    profiles-{timestamp}-{pid}-{part}.jsonl(.gz), so runs and shards never write to the same
+    file. Plain parts are flushed after every record; a gzip part is only complete once
+    closed, but read_profile_file recovers what a crash left of it. Thread-safe, one writer
+    process per folder.
+    """
+
+    def __init__(self, folder: PathLike, records_per_file: int=10_000, compress: bool=False):
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.records_per_file = records_per_file
+        self.compress = compress
+
+        self._prefix = f"{PART_PREFIX}-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        self._part = 0
+        self._count = 0
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _open_part(self):
+        suffix = ".jsonl.gz" if self.compress else ".jsonl"
+        path = self.folder / f"{self._prefix}-{self._part:05d}{suffix}"
+        self._file = gzip.open(path, "ab", compresslevel=6) if self.compress else open(path, "ab")
+        self._part += 1
+        self._count = 0
+
+    def write_encoded(self, personid: str, data: bytes):
+        with self._lock:
+            if self._file is None:
+                self._open_part()
+
+            self._file.write(data + b"\n")
+            self._count += 1
+            if not self.compress:
+                self._file.flush()
+
+            if self._count >= self.records_per_file:
+                self._file.close()
+                self._file = None
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+# Benchmark
+
+def benchmark(sample: dict, num_records: int=20_000) -> dict:
+    """Write num_records copies of sample the old way (indented, sorted {id}.json) and in every
+    output format, then load them back.
+    """
+    results = {"records": num_records, "orjson": orjson is not None}
+    records = [dict(sample, personid=f"{sample['personid']}-{i}") for i in range(num_records)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp) / "indented"
+        folder.mkdir()
+        start = time.perf_counter()
+        for record in records:
+            with open(folder / f"{record['personid']}.json", "w", encoding="utf-8") as f:
+                json.dump(record, f, indent=4, sort_keys=True)
+        results["indented_json"] = {
+            "write_seconds": round(time.perf_counter() - start, 3),
+            "bytes": sum(path.stat().st_size for path in folder.iterdir())
+        }
+
+        for output_format in OUTPUT_FORMATS:
+            folder = Path(tmp) / output_format
+            start = time.perf_counter()
+            with make_profile_sink(folder, output_format=output_format) as sink:
+                for record in records:
+                    sink.write(record)
+            write_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            loaded = load_profiles(folder)
+            results[output_format] = {
+                "write_seconds": round(write_seconds, 3),
+                "load_seconds": round(time.perf_counter() - start, 3),
+                "bytes": sum(path.stat().st_size for path in folder.iterdir()),
+                "loaded": len(loaded)
+            }
+
+    return results
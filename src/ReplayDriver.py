@@ -0,0 +1,585 @@
+# Imports
+
+# stdlib
+import argparse
+import json
+from pathlib import Path
+import re
+import tempfile
+import time
+from typing import Any, Callable, Optional, Union
+
+# 3rd-party
+import lxml.html
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.timeouts import Timeouts
+
+# Own
+
+try:
+    import LinkedinCrawler
+    from ProfileReader import Person
+except ModuleNotFoundError:
+    import src.LinkedinCrawler as LinkedinCrawler
+    from src.ProfileReader import Person
+
+# Type Definitons
+
+PathLike = Union[Path, str]
+ScriptHandler = Callable[..., Any]
+
+# Globals
+
+NOT_FOUND_URL = "https://www.linkedin.com/404/"
+NOT_FOUND_SOURCE = "<html><head></head><body><h1>Page not found</h1></body></html>"
+MANIFEST_NAME = "manifest.json"
+
+CSS_COMPOUND_PATTERN = re.compile(
+    r"""
+    (?P<tag>^[a-zA-Z][a-zA-Z0-9-]*|^\*)
+    |\#(?P<id>[\w-]+)
+    |\.(?P<cls>[\w-]+)
+    |\[(?P<attr>[\w-]+)(?:(?P<op>[~^$*]?=)(?P<quote>['"]?)(?P<value>.*?)(?P=quote))?\]
+    """,
+    re.VERBOSE
+)
+
+# Functions
+
+def xpath_literal(value: str) -> str:
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+
+    parts = value.split("'")
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in parts) + ")"
+
+def css_compound_to_xpath(compound: str) -> str:
+    """Translate a single compound selector such as div#id.class[attr^='x'] into an xpath step."""
+    tag = "*"
+    conditions = []
+
+    pos = 0
+    while pos < len(compound):
+        match = CSS_COMPOUND_PATTERN.match(compound, pos)
+        if match is None or match.end() == pos:
+            raise ValueError(f"Unsupported css selector: {compound}")
+
+        if match.group("tag"):
+            tag = match.group("tag")
+        elif match.group("id"):
+            conditions.append(f"@id={xpath_literal(match.group('id'))}")
+        elif match.group("cls"):
+            cls = xpath_literal(f" {match.group('cls')} ")
+            conditions.append(f"contains(concat(' ', normalize-space(@class), ' '), {cls})")
+        else:
+            attr = f"@{match.group('attr')}"
+            op = match.group("op")
+            value = xpath_literal(match.group("value") or "")
+            if op is None:
+                conditions.append(attr)
+            elif op == "=":
+                conditions.append(f"{attr}={value}")
+            elif op == "^=":
+                conditions.append(f"starts-with({attr}, {value})")
+            elif op == "$=":
+                conditions.append(
+                    f"substring({attr}, string-length({attr}) - string-length({value}) + 1)={value}"
+                )
+            elif op == "*=":
+                conditions.append(f"contains({attr}, {value})")
+            elif op == "~=":
+                conditions.append(
+                    f"contains(concat(' ', normalize-space({attr}), ' '), concat(' ', {value}, ' '))"
+                )
+
+        pos = match.end()
+
+    return tag + "".join(f"[{condition}]" for condition in conditions)
+
+def css_to_xpath(selector: str, relative: bool=False) -> str:
+    """Translate the small subset of CSS the crawler uses (tags, ids, classes, attribute
+    operators, descendant and child combinators, selector groups) into xpath, so the replay
+    driver only needs lxml.
+
+    Args:
+        selector (str): css selector
+        relative (bool, optional): search below the current element. Defaults to False.
+
+    Returns:
+        str: an equivalent xpath expression
+    """
+    xpaths = []
+    for group in selector.split(","):
+        tokens = re.findall(r"""\[[^\]]*\]|>|[^\s>\[]+|\s+""", group.strip())
+
+        steps = []
+        compound = ""
+        combinator = "//"
+        for token in tokens:
+            if token.isspace() or token == ">":
+                if compound:
+                    steps.append(combinator + css_compound_to_xpath(compound))
+                    compound = ""
+                    combinator = "//"
+                if token == ">":
+                    combinator = "/"
+            else:
+                compound += token
+        if compound:
+            steps.append(combinator + css_compound_to_xpath(compound))
+
+        prefix = "." if relative else ""
+        xpaths.append(prefix + "".join(steps))
+
+    return " | ".join(xpaths)
+
+def locator_to_xpath(by: str, value: str, relative: bool) -> str:
+    prefix = ".//" if relative else "//"
+
+    if by == By.XPATH:
+        return value
+    if by == By.CSS_SELECTOR:
+        return css_to_xpath(value, relative=relative)
+    if by == By.ID:
+        return f"{prefix}*[@id={xpath_literal(value)}]"
+    if by == By.NAME:
+        return f"{prefix}*[@name={xpath_literal(value)}]"
+    if by == By.TAG_NAME:
+        return f"{prefix}{value}"
+    if by == By.CLASS_NAME:
+        return css_to_xpath(f".{value}", relative=relative)
+    if by == By.LINK_TEXT:
+        return f"{prefix}a[normalize-space(.)={xpath_literal(value)}]"
+    if by == By.PARTIAL_LINK_TEXT:
+        return f"{prefix}a[contains(., {xpath_literal(value)})]"
+
+    raise ValueError(f"Unsupported locator strategy: {by}")
+
+def capture_regions_handler(driver: "ReplayDriver", regions: list[dict]) -> Optional[str]:
+    """Python equivalent of LinkedinCrawler.CAPTURE_REGIONS_SCRIPT."""
+    parts = []
+    for region in regions:
+        found = driver.tree.xpath(css_to_xpath(region["css"]))
+        if not found:
+            continue
+
+        element = found[0]
+        if region["parent"] and element.getparent() is not None:
+            element = element.getparent()
+        parts.append(lxml.html.tostring(element, encoding="unicode", with_tail=False))
+
+    if not parts:
+        return None
+
+    return "<html><head></head><body>" + "\n".join(parts) + "</body></html>"
+
+def extract_results_handler(driver: "ReplayDriver") -> dict:
+    """Stand-in for LinkedinCrawler.EXTRACT_RESULTS_SCRIPT, so that the script extraction mode
+    can be benchmarked without a browser. It does not prove anything about the script itself,
+    check_results_script runs that in headless Chrome.
+    """
+    tree = driver.tree
+    no_results = tree.xpath("//*[contains(text(), 'No leads matched your search')]")
+
+    rows = []
+    for profile in tree.xpath("//*[@id='search-results-container']//li"):
+        links = profile.xpath(
+            ".//a[@data-control-name='view_lead_panel_via_search_lead_name']"
+        )
+        if not links:
+            continue
+
+        link = links[0]
+        names = link.xpath(".//span[@data-anonymize='person-name']")
+        rows.append({
+            "name": names[0].text_content() if names else None,
+            "href": link.get("href")
+        })
+
+    next_buttons = tree.xpath("//button[@aria-label='Next']")
+
+    return {
+        "has_results": not no_results,
+        "rows": rows,
+        "has_next_button": bool(next_buttons),
+        "next_disabled": bool(next_buttons) and next_buttons[0].get("disabled") is not None
+    }
+
+def load_all_profiles_handler(
+    driver: "ReplayDriver",
+    container_id: str,
+    row_xpath: str,
+    link_selector: str,
+    *pacing
+) -> dict:
+    """Python equivalent of LinkedinCrawler.LOAD_ALL_PROFILES_SCRIPT. Recorded pages never load
+    more rows, so this only counts them.
+    """
+    containers = driver.tree.xpath(f"//*[@id={xpath_literal(container_id)}]")
+    if not containers:
+        return {"total": 0, "missing": 0}
+
+    rows = containers[0].xpath(row_xpath)
+    link_xpath = css_to_xpath(link_selector, relative=True)
+    missing = [row for row in rows if not row.xpath(link_xpath)]
+
+    return {"total": len(rows), "missing": len(missing)}
+
+def scroll_into_view_handler(driver: "ReplayDriver", *args) -> None:
+    return None
+
+# Classes
+
+class ReplayElement():
+
+    def __init__(self, driver: "ReplayDriver", element: lxml.html.HtmlElement):
+        self.driver = driver
+        self.element = element
+        self.typed = []
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, ReplayElement) and self.element is other.element
+
+    def __hash__(self) -> int:
+        return id(self.element)
+
+    @property
+    def tag_name(self) -> str:
+        return self.element.tag
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.element.text_content().split())
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        return self.element.get(name)
+
+    def get_dom_attribute(self, name: str) -> Optional[str]:
+        return self.element.get(name)
+
+    def is_displayed(self) -> bool:
+        return True
+
+    def is_enabled(self) -> bool:
+        return self.element.get("disabled") is None
+
+    def click(self):
+        self.driver.clicks.append(self)
+
+    def send_keys(self, *keys):
+        self.typed += list(keys)
+
+    def clear(self):
+        self.typed = []
+
+    def find_elements(self, by: str=By.ID, value: str=None) -> list["ReplayElement"]:
+        return self.driver._find(self.element, by, value, relative=True)
+
+    def find_element(self, by: str=By.ID, value: str=None) -> "ReplayElement":
+        found = self.find_elements(by, value)
+        if not found:
+            raise NoSuchElementException(f"Unable to locate element: {by}={value}")
+
+        return found[0]
+
+class ReplayDriver():
+    """Serves recorded HTML fixtures through the subset of the WebDriver API that the crawler
+    uses: get, page_source, current_url, find_element(s), execute_script and
+    execute_async_script. Scripts cannot be run without a browser, so each script the crawler
+    injects is answered by a registered python handler; unknown scripts return None.
+
+    Usage:
+        driver = ReplayDriver.from_directory("fixtures/replay")
+        crawler = LinkedinCrawler.Crawler(username=None, password=None, driver=driver, delay_scale=0)
+    """
+
+    def __init__(
+        self,
+        pages: dict[str, str],
+        start_url: str=None,
+        script_handlers: dict[str, ScriptHandler]=None
+    ):
+        """
+        Args:
+            pages (dict[str, str]): url -> html
+            start_url (str, optional): page loaded before the first get. Defaults to None.
+            script_handlers (dict[str, ScriptHandler], optional): script -> handler(driver, *args),
+            added to the default handlers. Defaults to None.
+        """
+        self.pages = pages
+        self.script_handlers = {
+            LinkedinCrawler.CAPTURE_REGIONS_SCRIPT: capture_regions_handler,
+            LinkedinCrawler.EXTRACT_RESULTS_SCRIPT: extract_results_handler,
+            LinkedinCrawler.LOAD_ALL_PROFILES_SCRIPT: load_all_profiles_handler,
+            "arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});":
+                scroll_into_view_handler
+        }
+        if script_handlers is not None:
+            self.script_handlers.update(script_handlers)
+
+        self.history = []
+        self.clicks = []
+        self.script_calls = 0
+        self.cookies = []
+        self.script_timeout = 30
+
+        self._current_url = None
+        self._source = NOT_FOUND_SOURCE
+        self.tree = lxml.html.document_fromstring(self._source)
+
+        if start_url is not None:
+            self.get(start_url)
+
+    @classmethod
+    def from_directory(cls, fixture_dir: PathLike, **kwargs) -> "ReplayDriver":
+        """Load fixtures listed in fixture_dir/manifest.json, a mapping of url -> file name."""
+        fixture_dir = Path(fixture_dir)
+        with open(fixture_dir / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        pages = dict()
+        for url, filename in manifest["pages"].items():
+            pages[url] = (fixture_dir / filename).read_text(encoding="utf-8")
+
+        return cls(pages, start_url=manifest.get("start_url"), **kwargs)
+
+    def _load(self, url: str, source: str):
+        self._current_url = url
+        self._source = source
+        self.tree = lxml.html.document_fromstring(source)
+
+    def _find(self, root, by: str, value: str, relative: bool) -> list[ReplayElement]:
+        xpath = locator_to_xpath(by, value, relative=relative)
+        found = root.xpath(xpath)
+
+        return [
+            ReplayElement(self, element) for element in found
+            if isinstance(element, lxml.html.HtmlElement)
+        ]
+
+    # navigation
+
+    def get(self, url: str):
+        self.history.append(url)
+        if url in self.pages:
+            self._load(url, self.pages[url])
+        else:
+            self._load(NOT_FOUND_URL, NOT_FOUND_SOURCE)
+
+    def refresh(self):
+        if self._current_url is not None:
+            self.get(self._current_url)
+
+    @property
+    def current_url(self) -> Optional[str]:
+        return self._current_url
+
+    @property
+    def page_source(self) -> str:
+        return self._source
+
+    # elements
+
+    def find_elements(self, by: str=By.ID, value: str=None) -> list[ReplayElement]:
+        return self._find(self.tree, by, value, relative=False)
+
+    def find_element(self, by: str=By.ID, value: str=None) -> ReplayElement:
+        found = self.find_elements(by, value)
+        if not found:
+            raise NoSuchElementException(f"Unable to locate element: {by}={value}")
+
+        return found[0]
+
+    # scripts
+
+    def execute_script(self, script: str, *args) -> Any:
+        self.script_calls += 1
+        handler = self.script_handlers.get(script)
+        if handler is None:
+            return None
+
+        return handler(self, *args)
+
+    def execute_async_script(self, script: str, *args) -> Any:
+        return self.execute_script(script, *args)
+
+    def set_script_timeout(self, time_to_wait: float):
+        self.script_timeout = time_to_wait
+
+    @property
+    def timeouts(self) -> Timeouts:
+        return Timeouts(script=self.script_timeout)
+
+    def execute_cdp_cmd(self, cmd: str, cmd_args: dict) -> dict:
+        return dict()
+
+    # session
+
+    def delete_all_cookies(self):
+        self.cookies = []
+
+    def add_cookie(self, cookie: dict):
+        self.cookies.append(cookie)
+
+    def get_cookies(self) -> list[dict]:
+        return list(self.cookies)
+
+    def set_window_position(self, x: int, y: int):
+        pass
+
+    def set_window_size(self, width: int, height: int):
+        pass
+
+    def quit(self):
+        pass
+
+# Benchmark
+
+def replay_crawler(fixture_dir: PathLike, **crawler_kwargs) -> "LinkedinCrawler.Crawler":
+    driver = ReplayDriver.from_directory(fixture_dir)
+    crawler_kwargs.setdefault("delay_scale", 0)
+
+    return LinkedinCrawler.Crawler(username=None, password=None, driver=driver, **crawler_kwargs)
+
+def benchmark_crawler(
+    fixture_dir: PathLike,
+    repeat: int=20,
+    **crawler_kwargs
+) -> dict[str, float]:
+    """Time the crawl-side hot paths against recorded fixtures, with all delays switched off.
+    manifest.json lists "profiles" (profile urls with an /details/experience/ page) and
+    "searches" (first results page urls) alongside "pages".
+
+    Args:
+        fixture_dir (PathLike): directory with manifest.json and the fixture html
+        repeat (int, optional): number of passes. Defaults to 20.
+        **crawler_kwargs: passed on to the Crawler, e.g. results_extraction
+
+    Returns:
+        dict[str, float]: mean seconds per call of each crawler method
+    """
+    fixture_dir = Path(fixture_dir)
+    with open(fixture_dir / MANIFEST_NAME, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    crawler = replay_crawler(fixture_dir, **crawler_kwargs)
+    timings = {"visit_page": [], "get_user_links": []}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for _ in range(repeat):
+            for i, profile_url in enumerate(manifest.get("profiles", [])):
+                person = Person(id=str(i), profile_url=profile_url)
+                start = time.perf_counter()
+                crawler.visit_page(person, download=True, page_folder=tmp_dir, exp_folder=tmp_dir)
+                timings["visit_page"].append(time.perf_counter() - start)
+
+            for search_url in manifest.get("searches", []):
+                crawler.driver.get(search_url)
+                start = time.perf_counter()
+                crawler.get_user_links(company_i="replay", company_s="replay", current=True)
+                timings["get_user_links"].append(time.perf_counter() - start)
+
+    return {
+        name: sum(values) / len(values)
+        for name, values in timings.items() if values
+    }
+
+def headless_chrome(driver_path: str=None):
+    """A bare headless Chrome for checks, or None if there is no browser / chromedriver. Never
+    downloads a driver.
+    """
+    from selenium import webdriver
+    from selenium.common.exceptions import WebDriverException
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--no-sandbox")
+    options.add_argument("--headless")
+
+    try:
+        return webdriver.Chrome(executable_path=driver_path or "chromedriver", options=options)
+    except (WebDriverException, OSError):
+        return None
+
+def check_results_script(fixture_dir: PathLike, driver_path: str=None) -> dict:
+    """Run the real EXTRACT_RESULTS_SCRIPT in headless Chrome over every recorded search page
+    and check it against extract_results_from_soup (plus the 'no results' check).
+
+    Args:
+        fixture_dir (PathLike): directory with manifest.json listing "searches"
+        driver_path (str, optional): chromedriver. Defaults to the one on PATH.
+
+    Returns:
+        dict: skipped (the reason, or None), the result of every search url and a list of
+        failures, empty if all is well
+    """
+    from bs4 import BeautifulSoup
+
+    fixture_dir = Path(fixture_dir)
+    with open(fixture_dir / MANIFEST_NAME, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    driver = headless_chrome(driver_path)
+    if driver is None:
+        return {"skipped": "no headless Chrome / chromedriver available", "searches": {}, "failures": []}
+
+    searches = {}
+    failures = []
+    try:
+        for search_url in manifest.get("searches", []):
+            path = fixture_dir / manifest["pages"][search_url]
+            driver.get(path.resolve().as_uri())
+            script = driver.execute_script(LinkedinCrawler.EXTRACT_RESULTS_SCRIPT)
+
+            soup = BeautifulSoup(path.read_text(encoding="utf-8"), "lxml")
+            expected = LinkedinCrawler.extract_results_from_soup(soup)
+            expected["has_results"] = soup.find(string=re.compile("No leads matched your search")) is None
+
+            same = script == expected
+            searches[search_url] = {"same": same, "script": script, "soup": expected}
+            if not same:
+                failures.append(f"{search_url}: script and soup extraction differ")
+    finally:
+        driver.quit()
+
+    return {"skipped": None, "searches": searches, "failures": failures}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the crawler against replayed pages.")
+    parser.add_argument("fixture_dir", help="directory containing manifest.json")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--check-extraction", 
+        action="store_true", 
+        help="run EXTRACT_RESULTS_SCRIPT in headless Chrome and check it against the soup "
+        "extraction on every search (skipped without a browser)"
+    )
+    parser.add_argument("--driver-path", help="chromedriver, defaults to the one on PATH")
+    args = parser.parse_args()
+
+    if args.check_extraction:
+        res = check_results_script(args.fixture_dir, driver_path=args.driver_path)
+        if res["skipped"] is not None:
+            print(f"{'skipped':<10}{res['skipped']}")
+        for search_url, search in res["searches"].items():
+            print(f"{'ok' if search['same'] else 'MISMATCH':<10}{search_url}")
+        if res["failures"]:
+            raise SystemExit(1)
+
+    for mode in ("soup", "script"):
+        for batched in (False, True):
+            res = benchmark_crawler(
+                args.fixture_dir, 
+                repeat=args.repeat, 
+                results_extraction=mode, 
+                batched_scrolling=batched
+            )
+            label = f"{mode}{'+batched' if batched else ''}"
+            for name, seconds in res.items():
+                print(f"{label:<16}{name:<20}{seconds * 1000:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# Imports
+
+# stdlib
+import argparse
+from dataclasses import dataclass
+import hashlib
+import os
+from pathlib import Path
+import shutil
+from typing import Iterable, Optional, TypeVar, Union
+
+# Type Definitons
+
+PathLike = Union[Path, str]
+T = TypeVar("T")
+
+@dataclass(frozen=True)
+class Shard:
+    index: int
+    count: int
+
+    @property
+    def name(self) -> str:
+        return f"shard-{self.index:03d}-of-{self.count:03d}"
+
+    def contains(self, key: str) -> bool:
+        return shard_of(key, self.count) == self.index
+
+# Globals
+
+SHARDS_FOLDER = "shards"
+MERGED_FOLDER = "merged"
+# appended line by line when merging, other files are per id
+CONCATENATED_SUFFIXES = (".jsonl", ".csv")
+# per-shard state, not merged
+SKIPPED_SUFFIXES = (".sqlite", ".db", ".db-journal", ".db-wal", ".db-shm")
+
+# Functions
+
+def shard_of(key: str, count: int) -> int:
+    """Stable across processes, machines and Python versions, unlike hash()."""
+    digest = hashlib.blake2b(str(key).encode("utf-8"), digest_size=8).digest()
+
+    return int.from_bytes(digest, "big") % count
+
+def parse_shard(value: str) -> Shard:
+    """argparse type for --shard i/N, with 0 <= i < N."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected i/N, e.g. 0/4, got {value!r}.")
+
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"Shard index must be in [0, {count}), got {value!r}.")
+
+    return Shard(index, count)
+
+def add_shard_argument(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        help="only handle shard i of N (0-based), e.g. --shard 0/4, with outputs under "
+             f"{SHARDS_FOLDER}/shard-000-of-004"
+    )
+
+def select_shard(items: Iterable[T], shard: Optional[Shard], key=lambda item: item.id) -> list[T]:
+    if shard is None:
+        return list(items)
+
+    return [item for item in items if shard.contains(key(item))]
+
+def shard_root(base_path: PathLike, shard: Optional[Shard]) -> Path:
+    """Where a shard keeps its outputs and state. Without a shard, base_path itself."""
+    base_path = Path(base_path)
+    if shard is None:
+        return base_path
+
+    return base_path / SHARDS_FOLDER / shard.name
+
+def shard_roots(base_path: PathLike, count: int) -> list[Path]:
+    return [shard_root(base_path, Shard(i, count)) for i in range(count)]
+
+def copy_atomic(source: Path, target: Path):
+    tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    shutil.copy2(source, tmp_path)
+    os.replace(tmp_path, target)
+
+def merge_lines(sources: list[Path], target: Path) -> dict:
+    """Concatenate JSONL / CSV files into target, keeping only the first CSV header. target is
+    replaced, so merging twice does not duplicate lines. target gets the mtime of the newest
+    source: profile parts are read oldest first, and captured at, by their mtime (see
+    ProfileSink.profile_files), so a merged part must not look newer than it is.
+    """
+    tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    lines = 0
+    header = None
+
+    with open(tmp_path, "w", encoding="utf-8", newline="") as out:
+        for source in sources:
+            with open(source, "r", encoding="utf-8", newline="") as f:
+                if source.suffix == ".csv":
+                    first = f.readline()
+                    if header is None:
+                        header = first
+                        out.write(first)
+                for line in f:
+                    out.write(line)
+                    lines += 1
+
+    if sources:
+        mtime_ns = max(source.stat().st_mtime_ns for source in sources)
+        os.utime(tmp_path, ns=(mtime_ns, mtime_ns))
+    os.replace(tmp_path, target)
+
+    return {"files": len(sources), "lines": lines}
+
+def merge_tree(sources: list[Path], target: Path, summary: dict) -> dict:
+    """Merge the same folder of every shard into target. JSONL and CSV files are concatenated,
+    sqlite files skipped, and every other file (sources, profiles, headshots, Parquet parts) is
+    copied, the newest one winning if several shards have it.
+    """
+    target.mkdir(parents=True, exist_ok=True)
+
+    files = {}
+    folders = {}
+    for source in sources:
+        for entry in os.scandir(source):
+            if entry.name.startswith("."):
+                continue
+            elif entry.is_dir():
+                folders.setdefault(entry.name, []).append(Path(entry.path))
+            else:
+                files.setdefault(entry.name, []).append((Path(entry.path), entry.stat().st_mtime))
+
+    for name, paths in files.items():
+        if name.endswith(SKIPPED_SUFFIXES):
+            summary["skipped"] += 1
+        elif name.endswith(CONCATENATED_SUFFIXES):
+            merge_lines([path for path, _ in paths], target / name)
+            summary["concatenated"] += 1
+        else:
+            summary["conflicts"] += len(paths) - 1
+            path, mtime = max(paths, key=lambda item: item[1])
+            target_path = target / name
+            if target_path.exists() and target_path.stat().st_mtime >= mtime:
+                summary["unchanged"] += 1
+            else:
+                copy_atomic(path, target_path)
+                summary["copied"] += 1
+
+    for name, paths in folders.items():
+        merge_tree(paths, target / name, summary)
+
+    return summary
+
+def merge_shards(roots: list[PathLike], output: PathLike, names: Iterable[str]=None) -> dict:
+    """Combine shard outputs into one dataset under output, see merge_tree. sqlite state
+    (caches, checkpoints, delta stores) stays per shard.
+
+    Args:
+        roots (list[PathLike]): shard roots, see shard_root
+        output (PathLike): where the merged outputs go
+        names (Iterable[str], optional): top level outputs to merge, e.g. CL_Profiles. Defaults
+        to everything the shards have.
+
+    Returns:
+        dict: counts of files copied, unchanged, concatenated, skipped and conflicts
+    """
+    roots = [Path(root) for root in roots if Path(root).exists()]
+    summary = {"copied": 0, "unchanged": 0, "concatenated": 0, "skipped": 0, "conflicts": 0}
+
+    if names is None:
+        return merge_tree(roots, Path(output), summary)
+
+    for name in names:
+        sources = [root / name for root in roots if (root / name).exists()]
+        if all(source.is_dir() for source in sources):
+            merge_tree(sources, Path(output) / name, summary)
+        elif name.endswith(CONCATENATED_SUFFIXES):
+            Path(output).mkdir(parents=True, exist_ok=True)
+            merge_lines(sources, Path(output) / name)
+            summary["concatenated"] += 1
+
+    return summary
+
+# CLI
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge the outputs of sharded runs.")
+    parser.add_argument("base_path", help="the BASE_PATH the shards ran under")
+    parser.add_argument("count", type=int, help="number of shards, N")
+    parser.add_argument("--output", help=f"defaults to base_path/{SHARDS_FOLDER}/{MERGED_FOLDER}")
+    parser.add_argument("--only", nargs="*", help="outputs to merge, e.g. CL_Profiles")
+    args = parser.parse_args()
+
+    summary = merge_shards(
+        shard_roots(args.base_path, args.count),
+        args.output or Path(args.base_path) / SHARDS_FOLDER / MERGED_FOLDER,
+        names=args.only
+    )
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
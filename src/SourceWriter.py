@@ -0,0 +1,256 @@
+# Imports
+
+# stdlib
+import gzip
+import logging
+import os
+from pathlib import Path
+import queue
+import threading
+from typing import Union
+
+# Type Definitons
+
+PathLike = Union[Path, str]
+
+# Globals
+
+SOURCE_SUFFIXES = (".txt", ".txt.gz")
+IDLE_SYNC_SECONDS = 1.0
+
+_FLUSH = object()
+_STOP = object()
+
+# Functions
+
+def compressed_path(path: PathLike) -> Path:
+    path = Path(path)
+
+    return path.with_name(f"{path.name}.gz")
+
+def read_source(path: PathLike) -> str:
+    """Read a saved page source, whether it was written plain or gzip compressed. Given the plain
+    {id}.txt path, falls back to {id}.txt.gz.
+    """
+    path = Path(path)
+    if path.suffix != ".gz" and not path.exists() and compressed_path(path).exists():
+        path = compressed_path(path)
+
+    if path.suffix == ".gz":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return f.read()
+
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+def list_source_ids(folder: PathLike) -> set[str]:
+    """Ids of every complete source in folder. Writes go through a temp file and a rename, so a
+    crashed write never shows up here.
+    """
+    ids = set()
+    for path in Path(folder).iterdir():
+        name = path.name
+        for suffix in SOURCE_SUFFIXES:
+            if name.endswith(suffix) and not name.startswith("."):
+                ids.add(name[:-len(suffix)])
+
+    return ids
+
+def fsync_directory(folder: Path):
+    try:
+        fd = os.open(folder, os.O_RDONLY)
+    except OSError:
+        return
+
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+# Classes
+
+class SourceWriter():
+    """Writes captured page sources on a background thread so the browser never waits on disk.
+    Every file is written to a temp file and renamed into place, so a crash cannot leave a
+    truncated {id}.txt behind. fsyncs are batched: temp files are synced and renamed together
+    every fsync_every files, or as soon as the queue goes idle. flush() and close() guarantee
+    everything queued so far is durable.
+
+    Usage:
+        with SourceWriter(compress=True) as writer:
+            writer.write(folder / f"{id}.txt", page_source)
+    """
+
+    def __init__(
+        self,
+        max_queue: int=64,
+        compress: bool=False,
+        compress_level: int=6,
+        fsync_every: int=16
+    ):
+        """
+        Args:
+            max_queue (int, optional): pending writes before write() blocks. Defaults to 64.
+            compress (bool, optional): gzip sources, saved as {name}.gz. Defaults to False.
+            compress_level (int, optional): gzip level. Defaults to 6.
+            fsync_every (int, optional): files per fsync batch. Defaults to 16.
+        """
+        self.compress = compress
+        self.compress_level = compress_level
+        self.fsync_every = max(fsync_every, 1)
+
+        self.files_written = 0
+        self.bytes_written = 0
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._pending = []
+        self._sequence = 0
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="SourceWriter", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _check_thread(self):
+        """Fail instead of waiting forever on a writer thread that is gone."""
+        if not self._thread.is_alive():
+            error, self._error = self._error, None
+            raise RuntimeError("The SourceWriter thread has stopped, queued sources were not written.") from error
+
+    def _put(self, item):
+        while True:
+            self._check_thread()
+            try:
+                self._queue.put(item, timeout=IDLE_SYNC_SECONDS)
+                return
+            except queue.Full:
+                pass
+
+    def write(self, path: PathLike, source: str):
+        """Queue source to be written to path. Blocks only if max_queue writes are pending."""
+        if self._closed:
+            raise ValueError("Cannot write to a closed SourceWriter.")
+        self._raise_error()
+
+        self._put((Path(path), source))
+
+    def flush(self):
+        """Block until every queued source is on disk."""
+        done = threading.Event()
+        self._put((_FLUSH, done))
+        while not done.wait(IDLE_SYNC_SECONDS):
+            self._check_thread()
+        self._raise_error()
+
+    def close(self):
+        if self._closed:
+            return
+
+        try:
+            self.flush()
+        finally:
+            self._closed = True
+            if self._thread.is_alive():
+                self._queue.put((_STOP, None))
+                self._thread.join()
+
+    # background thread
+
+    def _run(self):
+        while True:
+            try:
+                target, payload = self._queue.get(timeout=IDLE_SYNC_SECONDS)
+            except queue.Empty:
+                try:
+                    self._sync_pending()
+                except Exception as e:
+                    logging.error(f"SourceWriter failed: {e}")
+                    self._error = e
+                continue
+
+            try:
+                if target is _STOP:
+                    self._sync_pending()
+                    return
+                elif target is _FLUSH:
+                    self._sync_pending()
+                    payload.set()
+                else:
+                    self._stage(target, payload)
+                    if len(self._pending) >= self.fsync_every:
+                        self._sync_pending()
+            except Exception as e:
+                logging.error(f"SourceWriter failed: {e}")
+                self._error = e
+                if target is _FLUSH:
+                    payload.set()
+            finally:
+                self._queue.task_done()
+
+    def _stage(self, path: Path, source: str):
+        data = source.encode("utf-8")
+        if self.compress:
+            data = gzip.compress(data, compresslevel=self.compress_level)
+            path = compressed_path(path)
+
+        self._sequence += 1
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{self._sequence}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+
+        self._pending.append((tmp_path, path))
+        self.bytes_written += len(data)
+
+    def _sync_pending(self):
+        """Sync and rename every staged file. A file that fails is dropped, temp file and all,
+        and does not hold back the rest; the first error is raised once the batch is done.
+        """
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, []
+        folders = set()
+        written = 0
+        error = None
+        for tmp_path, path in pending:
+            try:
+                fd = os.open(tmp_path, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logging.error(f"Could not write {path}: {e}")
+                error = error or e
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                continue
+
+            folders.add(path.parent)
+            written += 1
+
+        for folder in folders:
+            fsync_directory(folder)
+
+        self.files_written += written
+        if error is not None:
+            raise error
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() + len(self._pending)
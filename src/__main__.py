@@ -0,0 +1,244 @@
+"""Command line entry point, run from the repository root:
+
+    python -m src [--config run.json] [--base-path PATH] [--set parse.workers=8] COMMAND
+
+    crawl      download profile sources (--companies: Sales Navigator employees)
+    parse      parse downloaded sources into CL_Profiles
+    index      load CL_Profiles into the sqlite profile index
+    extract    stream one field (headshot, company_ids) out of every saved source as JSON lines
+    merge      combine the outputs of --shard runs
+    bench      benchmarks: replay, matcher, canonicalizer, serializer, records, imports (parse
+               worker cold start), regression (parser golden outputs and speed per DOM layout), scan (extract
+               against full parses), stream (crawl-time parsing of the replay fixture)
+    config     print the resolved config as JSON
+
+Every run is described by its config, so several differently tuned pipelines can run side by
+side as long as their base_path (or output folders) differ.
+"""
+
+# Imports
+
+# stdlib
+import argparse
+import json
+from pathlib import Path
+import sys
+
+# Own
+
+try:
+    import Config
+    import Sharding
+except ModuleNotFoundError:
+    import src.Config as Config
+    import src.Sharding as Sharding
+
+# Globals
+
+REPLAY_FIXTURES = Path(__file__).resolve().parents[1] / "fixtures" / "replay"
+
+# Functions
+
+def default_base_path():
+    # setup_vars expects the repository three folders under BASE_PATH
+    try:
+        from setup_vars import BASE_PATH
+    except (ModuleNotFoundError, IndexError):
+        return None
+
+    return BASE_PATH
+
+def parse_set(value: str) -> tuple[str, str]:
+    key, sep, option = value.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"Expected key=value, got {value!r}.")
+
+    return key.strip(), option.strip()
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src", description="LinkedIn crawl / parse pipeline.")
+    parser.add_argument("--config", help="JSON config file, see src/Config.py")
+    parser.add_argument("--base-path", help="overrides base_path from the config")
+    parser.add_argument(
+        "--set",
+        type=parse_set,
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="override one config option, e.g. --set crawl.max_pages=200"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    crawl = subparsers.add_parser("crawl", help="download profile sources")
+    crawl.add_argument("--companies", action="store_true", help="crawl Sales Navigator employees")
+    crawl.add_argument("--chunk-size", type=int, help="sets crawl.chunk_min and crawl.chunk_max")
+    crawl.add_argument("--workers", type=int, help="stream parse workers, parse.workers")
+    Sharding.add_shard_argument(crawl)
+
+    parse = subparsers.add_parser("parse", help="parse downloaded sources")
+    parse.add_argument("--workers", type=int, help="parse.workers")
+    parse.add_argument("--chunk-size", type=int, help="parse.chunk_size")
+    Sharding.add_shard_argument(parse)
+
+    index = subparsers.add_parser("index", help="index parsed profiles")
+    Sharding.add_shard_argument(index)
+
+    extract = subparsers.add_parser("extract", help="stream one field out of the saved sources")
+    extract.add_argument("field", choices=["headshot", "company_ids"])
+    extract.add_argument("--output", help="JSON lines file, defaults to stdout")
+    Sharding.add_shard_argument(extract)
+
+    merge = subparsers.add_parser("merge", help="merge shard outputs")
+    merge.add_argument("count", type=int, help="number of shards")
+    merge.add_argument("--output", help="defaults to base_path/shards/merged")
+    merge.add_argument("--only", nargs="*", help="outputs to merge, e.g. CL_Profiles")
+
+    bench = subparsers.add_parser("bench", help="run a benchmark")
+    bench.add_argument("name", choices=["replay", "matcher", "canonicalizer", "serializer", "records", "imports", "regression", "scan", "stream"])
+    bench.add_argument("--rows", type=int, help="rows / records / repeats")
+
+    subparsers.add_parser("config", help="print the resolved config")
+
+    return parser
+
+def command_overrides(args: argparse.Namespace) -> dict:
+    overrides = dict(args.set)
+    if getattr(args, "workers", None) is not None:
+        overrides["parse.workers"] = args.workers
+    if getattr(args, "chunk_size", None) is not None:
+        if args.command == "crawl":
+            overrides["crawl.chunk_min"] = args.chunk_size
+            overrides["crawl.chunk_max"] = args.chunk_size
+        else:
+            overrides["parse.chunk_size"] = args.chunk_size
+
+    return overrides
+
+def fixture_profile():
+    """The replay fixture profile, parsed."""
+    try:
+        from LinkedinParser import parse_person
+        from ProfileReader import Person
+    except ModuleNotFoundError:
+        from src.LinkedinParser import parse_person
+        from src.ProfileReader import Person
+
+    person = Person(id="jane-doe", profile_url="https://www.linkedin.com/in/jane-doe")
+    person.page_source = (REPLAY_FIXTURES / "profile_jane_doe.html").read_text(encoding="utf-8")
+    person.exp_source = (REPLAY_FIXTURES / "experience_jane_doe.html").read_text(encoding="utf-8")
+
+    return parse_person(person)
+
+def run_bench(name: str, rows: int=None):
+    if name == "replay":
+        try:
+            from ReplayDriver import benchmark_crawler
+        except ModuleNotFoundError:
+            from src.ReplayDriver import benchmark_crawler
+        result = benchmark_crawler(REPLAY_FIXTURES, repeat=rows or 20)
+    elif name == "matcher":
+        try:
+            from CompanyMatcher import benchmark
+        except ModuleNotFoundError:
+            from src.CompanyMatcher import benchmark
+        result = benchmark(num_rows=rows or 2_000_000)
+    elif name == "canonicalizer":
+        try:
+            from Canonicalizer import benchmark
+        except ModuleNotFoundError:
+            from src.Canonicalizer import benchmark
+        result = benchmark(num_records=rows or 1_000_000)
+    elif name == "serializer":
+        try:
+            from ProfileSink import benchmark
+        except ModuleNotFoundError:
+            from src.ProfileSink import benchmark
+        result = benchmark(fixture_profile().to_dict(), num_records=rows or 20_000)
+    elif name == "records":
+        try:
+            from ProfileRecord import benchmark
+        except ModuleNotFoundError:
+            from src.ProfileRecord import benchmark
+        result = benchmark(fixture_profile(), num_profiles=rows or 50_000)
+    elif name == "scan":
+        try:
+            from FieldScan import benchmark
+        except ModuleNotFoundError:
+            from src.FieldScan import benchmark
+        result = benchmark(
+            (REPLAY_FIXTURES / "profile_jane_doe.html").read_text(encoding="utf-8"),
+            (REPLAY_FIXTURES / "experience_jane_doe.html").read_text(encoding="utf-8"),
+            num_sources=rows or 2_000
+        )
+    elif name == "stream":
+        try:
+            from ParseStream import check_stream
+        except ModuleNotFoundError:
+            from src.ParseStream import check_stream
+        result = check_stream(
+            (REPLAY_FIXTURES / "profile_jane_doe.html").read_text(encoding="utf-8"),
+            (REPLAY_FIXTURES / "experience_jane_doe.html").read_text(encoding="utf-8"),
+            num_people=rows or 40
+        )
+    elif name == "regression":
+        try:
+            from ParserRegression import run_regression
+        except ModuleNotFoundError:
+            from src.ParserRegression import run_regression
+        result = run_regression(repeat=rows or 50)
+    else:
+        try:
+            from ImportCheck import check_worker_imports
+        except ModuleNotFoundError:
+            from src.ImportCheck import check_worker_imports
+        result = check_worker_imports(repeat=rows or 3)
+
+    print(json.dumps(result, indent=4))
+    if result.get("failures"):
+        sys.exit(1)
+
+def main():
+    args = build_parser().parse_args()
+    if args.command == "bench":
+        # benchmarks run on fixtures and temporary folders, they need no config or base_path
+        run_bench(args.name, args.rows)
+        return
+
+    config = Config.load_config(
+        args.config,
+        overrides=command_overrides(args),
+        base_path=args.base_path,
+        default_base_path=default_base_path()
+    )
+    shard = getattr(args, "shard", None)
+
+    if args.command == "config":
+        print(json.dumps(Config.config_to_dict(config), indent=4))
+    elif args.command == "merge":
+        summary = Sharding.merge_shards(
+            Sharding.shard_roots(config.base_path, args.count),
+            args.output or Path(config.base_path) / Sharding.SHARDS_FOLDER / Sharding.MERGED_FOLDER,
+            names=args.only
+        )
+        print(summary)
+    else:
+        try:
+            import Pipeline
+        except ModuleNotFoundError:
+            import src.Pipeline as Pipeline
+
+        if args.command == "crawl" and args.companies:
+            Pipeline.crawl_companies(config, shard)
+        elif args.command == "crawl":
+            Pipeline.crawl_profiles(config, shard)
+        elif args.command == "parse":
+            print(Pipeline.parse_profiles(config, shard))
+        elif args.command == "index":
+            print(Pipeline.index_profiles(config, shard))
+        elif args.command == "extract":
+            summary = Pipeline.extract_field_values(config, args.field, shard, output=args.output)
+            print(summary, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()